@@ -1,13 +1,23 @@
 # backend/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
+import os
 import structlog
 
 from evo_core.orchestrator.orchestrator import KelnicOrchestrator
+from evo_core.orchestrator.scheduler import TaskScheduler, QueueFullError
 from evo_core.agents.agent_registry import register_all_agents
 from evo_core.memory.state_manager import StateManager
+from evo_core.memory.ledger import Ledger
+from evo_core.memory.reporting import ReportingEngine
+from evo_core.agents.bookkeeper_agent import BookkeeperAgent
+from evo_core.payments import WebhookIngestor
+from evo_core.telemetry import MetricsMiddleware, ResourceSampler
+from evo_core.mail import Mailer
+from evo_core.llm import LLMClient
 
 # Import routes
 from backend.routes import (
@@ -26,13 +36,59 @@ async def lifespan(app: FastAPI):
     app.state.orchestrator = KelnicOrchestrator()
     app.state.state_manager = StateManager()
 
-    # Register all agents
-    register_all_agents(app.state.orchestrator)
+    # Register all agents; they are imported on first use unless listed in AGENT_WARMUP
+    warm_up = [name.strip() for name in os.getenv("AGENT_WARMUP", "").split(",") if name.strip()]
+    register_all_agents(app.state.orchestrator, warm_up=warm_up)
+
+    # Double-entry books, fed by payment/payout events on the message bus
+    app.state.ledger = Ledger()
+    app.state.bookkeeper = BookkeeperAgent(app.state.orchestrator.message_bus, app.state.state_manager, app.state.ledger)
+    # Columnar copy of the journal behind FinancialAgent/AnalyticsAgent reports
+    app.state.reporting = ReportingEngine(app.state.ledger, snapshot_dir=os.getenv("REPORT_SNAPSHOT_DIR"))
+    app.state.orchestrator.reporting = app.state.reporting
+
+    await app.state.orchestrator.business_metrics.start()
+
+    # Provider webhooks: verified and queued by the routes, published by a consumer task
+    app.state.webhooks = WebhookIngestor(app.state.orchestrator.message_bus, ledger=app.state.ledger)
+    app.state.webhooks.start()
+
+    # Process/host resources and event-loop lag, sampled in the background
+    app.state.resources = ResourceSampler(interval=float(os.getenv("RESOURCE_SAMPLE_INTERVAL", "1.0")))
+    app.state.resources.start()
+    app.state.orchestrator.resources = app.state.resources
+
+    # Outbound mail over pooled SMTP connections; deferred messages are retried from the spool
+    app.state.mailer = Mailer()
+    await app.state.mailer.start()
+    app.state.orchestrator.mailer = app.state.mailer
+
+    # One LLM client for all agents: response cache, request coalescing, token budget.
+    # Only when an endpoint or key is configured; agents skip their LLM paths otherwise
+    llm_configured = any(os.getenv(name) for name in ("LLM_BASE_URL", "LLM_API_KEY", "OPENAI_API_KEY"))
+    app.state.llm = LLMClient() if llm_configured else None
+    app.state.orchestrator.llm = app.state.llm
+
+    # Priority scheduler and worker pool in front of process_task
+    app.state.scheduler = TaskScheduler(app.state.orchestrator)
+    app.state.scheduler.start()
 
     logger.info("✅ Kelnic System Ready with Multi-Agent Orchestration")
     yield
 
     logger.info("🛑 Shutting down Kelnic...")
+    await app.state.scheduler.stop()
+    await app.state.resources.stop()
+    await app.state.mailer.close()
+    if app.state.llm is not None:
+        await app.state.llm.close()
+    await app.state.webhooks.close()
+    await app.state.orchestrator.message_bus.drain()
+    await app.state.orchestrator.business_metrics.close()
+    await app.state.reporting.snapshot()
+    await app.state.ledger.close()
+    await app.state.orchestrator.state_manager.close()
+    await app.state.state_manager.close()
 
 app = FastAPI(
     title="Kelnic",
@@ -50,6 +106,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latency per route for /api/metrics
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # Include API Routes
 app.include_router(marketing.router, prefix="/api/marketing", tags=["marketing"])
 app.include_router(finance.router, prefix="/api/finance", tags=["finance"])
@@ -70,7 +137,7 @@ async def root():
         "message": "Welcome to Kelnic AI Business OS",
         "status": "running",
         "version": "0.2.0",
-        "agents_registered": len(app.state.orchestrator.agents) if hasattr(app.state, "orchestrator") else 0
+        "agents_registered": len(app.state.orchestrator.agents) + len(app.state.orchestrator.agent_specs) if hasattr(app.state, "orchestrator") else 0
     }
 
 @app.get("/health")
@@ -1,8 +1,14 @@
-# Example: backend/routes/books.py
+# backend/routes/books.py
 from fastapi import APIRouter
 
 router = APIRouter()
 
 @router.get("/")
 async def get_books():
-    return {"message": "Books endpoint - coming soon"}
+    from backend.main import app
+    return {"trial_balance": await app.state.ledger.get_trial_balance(), "journal": app.state.ledger.stats}
+
+@router.get("/balances/{account}")
+async def get_balance(account: str):
+    from backend.main import app
+    return {"account": account, "balance": await app.state.ledger.get_balance(account)}
@@ -1,6 +1,7 @@
 # backend/routes/finance.py
 from fastapi import APIRouter
 from .marketing import TaskRequest   # Reuse the same model
+from .streaming import add_stream_routes
 
 router = APIRouter()
 
@@ -8,10 +9,12 @@ router = APIRouter()
 async def run_finance_task(request: TaskRequest):
     # Same logic as marketing for now (we can customize later)
     from backend.main import app
-    orchestrator = app.state.orchestrator
-    result = await orchestrator.process_task(
+    result = await app.state.scheduler.run(
         task=request.task,
         session_id=request.session_id,
-        context=request.context
+        context=request.context,
+        priority=request.priority
     )
     return {"success": True, "result": result}
+
+add_stream_routes(router, TaskRequest)
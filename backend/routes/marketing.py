@@ -1,7 +1,9 @@
 # backend/routes/marketing.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any
+from evo_core.orchestrator.scheduler import QueueFullError
+from .streaming import add_stream_routes
 
 router = APIRouter()
 
@@ -9,19 +11,26 @@ class TaskRequest(BaseModel):
     task: str
     session_id: str
     context: Dict[str, Any] = {}
+    priority: int = 5
 
 @router.post("/run")
-async def run_marketing_task(request: TaskRequest, app_state=Depends(lambda: None)):
+async def run_marketing_task(request: TaskRequest):
+    from backend.main import app
     try:
-        orchestrator = app_state.orchestrator if app_state else None
-        if not orchestrator:
+        scheduler = getattr(app.state, "scheduler", None)
+        if not scheduler:
             raise HTTPException(status_code=500, detail="Orchestrator not initialized")
 
-        result = await orchestrator.process_task(
+        result = await scheduler.run(
             task=request.task,
             session_id=request.session_id,
-            context=request.context
+            context=request.context,
+            priority=request.priority
         )
         return {"success": True, "result": result}
+    except (HTTPException, QueueFullError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+add_stream_routes(router, TaskRequest)
@@ -1,13 +1,33 @@
 # backend/routes/metrics.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from evo_core.telemetry import REGISTRY
 
 router = APIRouter()
 
 @router.get("/")
-async def get_metrics():
+async def get_metrics(request: Request):
+    """Dashboard summary plus every metric as JSON; OpenMetrics text if the client asks for it."""
+    if "application/openmetrics-text" in request.headers.get("accept", ""):
+        return await get_openmetrics()
+
+    from backend.main import app
+    orchestrator = app.state.orchestrator
+    tasks = REGISTRY.get("kelnic_task_seconds")._default
+    open_circuits = [name for name, breaker in orchestrator.breakers.items() if breaker.state != "closed"]
     return {
-        "total_agents": 13,
-        "active_sessions": 4,
-        "tasks_processed_today": 87,
-        "system_health": "excellent"
+        "total_agents": len(orchestrator.agents) + len(orchestrator.agent_specs),
+        "agents_loaded": len(orchestrator.agents),
+        "tasks_processed": tasks.count,
+        "tasks_in_flight": REGISTRY.get("kelnic_tasks_in_flight")._default.value,
+        "task_errors": REGISTRY.get("kelnic_task_errors")._default.value,
+        "avg_task_seconds": round(tasks.sum / tasks.count, 4) if tasks.count else 0.0,
+        "scheduler": app.state.scheduler.get_status(),
+        "open_circuits": open_circuits,
+        "system_health": "degraded" if open_circuits else "healthy",
+        "metrics": REGISTRY.to_json()
     }
+
+@router.get("/openmetrics")
+async def get_openmetrics():
+    return PlainTextResponse(REGISTRY.to_openmetrics(), media_type=REGISTRY.CONTENT_TYPE)
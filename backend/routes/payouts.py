@@ -1,15 +1,19 @@
 # backend/routes/payouts.py
 from fastapi import APIRouter
 from .marketing import TaskRequest
+from .streaming import add_stream_routes
 
 router = APIRouter()
 
 @router.post("/run")
 async def run_payout_task(request: TaskRequest):
     from backend.main import app
-    result = await app.state.orchestrator.process_task(
+    result = await app.state.scheduler.run(
         task=request.task,
         session_id=request.session_id,
-        context=request.context
+        context=request.context,
+        priority=request.priority
     )
     return {"success": True, "result": result}
+
+add_stream_routes(router, TaskRequest)
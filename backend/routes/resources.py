@@ -1,6 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 router = APIRouter()
 
 @router.get("/")
-async def get_resources():
-    return {"cpu": 0, "memory": 0}
+async def get_resources(points: int = Query(60, ge=1, le=3600)):
+    """Latest resource sample plus downsampled history, read from the background sampler."""
+    from backend.main import app
+    return app.state.resources.snapshot(points)
@@ -0,0 +1,89 @@
+# backend/routes/streaming.py
+"""``/run/stream`` for the task routers: the plan as soon as the task is
+routed, then each agent's result as it completes, then the full result.
+
+- ``POST /run/stream`` answers with Server-Sent Events (``event: plan|step|done|error``).
+- ``WS /run/stream`` takes one task request as JSON and sends each event as a JSON message.
+"""
+import json
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from evo_core.orchestrator.scheduler import QueueFullError
+
+
+def _scheduler():
+    from backend.main import app
+    scheduler = getattr(app.state, "scheduler", None)
+    if not scheduler:
+        raise HTTPException(status_code=500, detail="Orchestrator not initialized")
+    return scheduler
+
+
+async def _events(stream):
+    """Relay scheduler events, turning a failure into a final ``error`` event."""
+    try:
+        async for event in stream:
+            yield event
+    except Exception as e:
+        yield {"event": "error", "error": str(e)}
+    finally:
+        await stream.aclose()
+
+
+def add_stream_routes(router: APIRouter, request_model):
+    @router.post("/run/stream")
+    async def run_task_stream(request: request_model):
+        # Admission happens before the response starts, so a full queue is still a 429
+        stream = await _scheduler().submit_stream(
+            task=request.task,
+            session_id=request.session_id,
+            context=request.context,
+            priority=request.priority
+        )
+
+        async def body():
+            async for event in _events(stream):
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+        return StreamingResponse(
+            body(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @router.websocket("/run/stream")
+    async def run_task_websocket(websocket: WebSocket):
+        await websocket.accept()
+        try:
+            request = request_model.model_validate(await websocket.receive_json())
+            stream = await _scheduler().submit_stream(
+                task=request.task,
+                session_id=request.session_id,
+                context=request.context,
+                priority=request.priority
+            )
+        except (ValidationError, ValueError, TypeError) as e:
+            # Not JSON, or JSON that is not a task request object (e.g. a list or a string)
+            await websocket.send_json({"event": "error", "error": str(e)})
+            await websocket.close(code=1003)
+            return
+        except QueueFullError as e:
+            await websocket.send_json({"event": "error", "error": str(e), "retry_after": e.retry_after})
+            # 1013: try again later
+            await websocket.close(code=1013)
+            return
+        except WebSocketDisconnect:
+            return
+
+        events = _events(stream)
+        try:
+            async for event in events:
+                await websocket.send_text(json.dumps(event, default=str))
+        except WebSocketDisconnect:
+            return
+        finally:
+            await events.aclose()
+        await websocket.close()
@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
+from evo_core.payments import SignatureError
 router = APIRouter()
 
+async def _ingest(provider: str, request: Request):
+    """Verify and queue the raw webhook, then acknowledge; payments are published by the consumer."""
+    from backend.main import app
+    try:
+        accepted = await app.state.webhooks.ingest(provider, await request.body(), request.headers)
+    except SignatureError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Duplicates still get a 2xx so the provider stops retrying
+    return {"status": "ok" if accepted else "duplicate"}
+
 @router.post("/stripe")
 async def stripe_webhook(request: Request):
-    return {"status": "ok"}
+    return await _ingest("stripe", request)
 
 @router.post("/paypal")
 async def paypal_webhook(request: Request):
-    return {"status": "ok"}
+    return await _ingest("paypal", request)
 
 @router.post("/payfast")
 async def payfast_webhook(request: Request):
-    return {"status": "ok"}
+    return await _ingest("payfast", request)
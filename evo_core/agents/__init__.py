@@ -1,14 +1,31 @@
 # evo_core/agents/__init__.py
+import importlib
+
 from .base_agent import BaseAgent
 from .meta_agent import MetaAgent
-from .marketing_engine_agent import MarketingEngineAgent
-from .financial_agent import FinancialAgent
-from .invoicing_agent import InvoicingAgent
-from .payout_agent import PayoutAgent
-from .content_creator_agent import ContentCreatorAgent
-from .self_healing_agent import SelfHealingAgent
-from .quality_assurance_agent import QualityAssuranceAgent
-from .support_agent import SupportAgent
+
+# Concrete agents are imported on first attribute access so importing the
+# package (or the registry) does not load every agent module up front
+_LAZY_AGENTS = {
+    "MarketingEngineAgent": ".marketing_engine_agent",
+    "FinancialAgent": ".financial_agent",
+    "InvoicingAgent": ".invoicing_agent",
+    "PayoutAgent": ".payout_agent",
+    "ContentCreatorAgent": ".content_creator_agent",
+    "SelfHealingAgent": ".self_healing_agent",
+    "QualityAssuranceAgent": ".quality_assurance_agent",
+    "SupportAgent": ".support_agent",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_AGENTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "BaseAgent",
@@ -1,44 +1,110 @@
 # evo_core/agents/agent_registry.py
-from evo_core.orchestrator.orchestrator import KelnicOrchestrator
-from .marketing_engine_agent import MarketingEngineAgent
-from .financial_agent import FinancialAgent
-from .invoicing_agent import InvoicingAgent
-from .payout_agent import PayoutAgent
-from .content_creator_agent import ContentCreatorAgent
-from .self_healing_agent import SelfHealingAgent
-from .quality_assurance_agent import QualityAssuranceAgent
-from .support_agent import SupportAgent
-from .payment_agent import PaymentAgent
-from .analytics_agent import AnalyticsAgent
-from .legal_agent import LegalAgent
-from .designer_agent import DesignerAgent
-from .monitoring_agent import MonitoringAgent
-
-def register_all_agents(orchestrator: KelnicOrchestrator):
-    """Register all agents with the orchestrator"""
-    
-    agents = [
-        MarketingEngineAgent(orchestrator),
-        FinancialAgent(orchestrator),
-        InvoicingAgent(orchestrator),
-        PayoutAgent(orchestrator),
-        ContentCreatorAgent(orchestrator),
-        SelfHealingAgent(orchestrator),
-        QualityAssuranceAgent(orchestrator),
-        SupportAgent(orchestrator),
-        PaymentAgent(orchestrator),
-        AnalyticsAgent(orchestrator),
-        LegalAgent(orchestrator),
-        DesignerAgent(orchestrator),
-        MonitoringAgent(orchestrator),
-    ]
-
-    for agent in agents:
-        orchestrator.register_agent(agent.name, agent)
-    
-    # Register MetaAgent separately
-    from .meta_agent import MetaAgent
-    meta = MetaAgent(orchestrator)
-    orchestrator.register_agent("MetaAgent", meta)
-    
-    orchestrator.logger.info(f"✅ Successfully registered {len(agents) + 1} agents")
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+import importlib
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """Everything routing needs to know about an agent without importing it.
+
+    This is the only place an agent's ``description`` and ``keywords`` are
+    written down: ``BaseAgent`` reads them from here by name. The module is
+    imported and the class instantiated on the first task routed to the
+    agent (or at startup if it is in the warm-up list).
+    """
+    name: str
+    module: str
+    description: str
+    keywords: List[str] = field(default_factory=list)
+    class_name: Optional[str] = None
+
+    def load(self, orchestrator):
+        module = importlib.import_module(self.module)
+        agent_class = getattr(module, self.class_name or self.name)
+        return agent_class(orchestrator)
+
+
+AGENT_SPECS = [
+    AgentSpec(
+        "MarketingEngineAgent", "evo_core.agents.marketing_engine_agent",
+        "Handles marketing campaigns, funnels, ads, and promotion strategies",
+        ["market", "campaign", "advertise", "promote", "social"],
+    ),
+    AgentSpec(
+        "FinancialAgent", "evo_core.agents.financial_agent",
+        "Manages budgeting, revenue tracking, forecasting and financial health",
+        ["finance", "budget", "expense", "revenue", "profit"],
+    ),
+    AgentSpec(
+        "InvoicingAgent", "evo_core.agents.invoicing_agent",
+        "Creates, sends and tracks invoices automatically",
+        ["invoice", "billing", "payment request"],
+    ),
+    AgentSpec(
+        "PayoutAgent", "evo_core.agents.payout_agent",
+        "Handles payouts, withdrawals, affiliate commissions and vendor payments",
+        ["pay", "payout", "transfer", "withdraw"],
+    ),
+    AgentSpec(
+        "ContentCreatorAgent", "evo_core.agents.content_creator_agent",
+        "Generates high-quality marketing content, emails, scripts, and social posts",
+        ["content", "write", "script", "blog", "email"],
+    ),
+    AgentSpec(
+        "SelfHealingAgent", "evo_core.agents.self_healing_agent",
+        "Monitors system health, detects failures and automatically recovers",
+    ),
+    AgentSpec(
+        "QualityAssuranceAgent", "evo_core.agents.quality_assurance_agent",
+        "Performs testing, validation and quality checks across all operations",
+    ),
+    AgentSpec(
+        "SupportAgent", "evo_core.agents.support_agent",
+        "Handles customer support, troubleshooting and general assistance",
+    ),
+    AgentSpec(
+        "PaymentAgent", "evo_core.agents.payment_agent",
+        "Processes customer payments, handles Stripe/PayPal integrations and receipts",
+    ),
+    AgentSpec(
+        "AnalyticsAgent", "evo_core.agents.analytics_agent",
+        "Provides business metrics, insights, reports and performance analysis",
+    ),
+    AgentSpec(
+        "LegalAgent", "evo_core.agents.legal_agent",
+        "Handles contracts, compliance, terms of service and legal reviews",
+    ),
+    AgentSpec(
+        "DesignerAgent", "evo_core.agents.designer_agent",
+        "Creates UI/UX designs, landing pages, branding and visual assets",
+    ),
+    AgentSpec(
+        "MonitoringAgent", "evo_core.agents.monitoring_agent",
+        "Real-time system monitoring, performance tracking and alerts",
+    ),
+]
+
+_SPECS_BY_NAME = {spec.name: spec for spec in AGENT_SPECS}
+
+
+def get_spec(name: str) -> Optional[AgentSpec]:
+    return _SPECS_BY_NAME.get(name)
+
+
+def register_all_agents(orchestrator, warm_up: Optional[Iterable[str]] = None):
+    """Register all agents with the orchestrator.
+
+    Agents are registered as specs and loaded on their first routed task;
+    names in ``warm_up`` are loaded immediately.
+    """
+    for spec in AGENT_SPECS:
+        orchestrator.register_agent_spec(spec)
+
+    # MetaAgent is always in memory; it routes every task
+    orchestrator.register_agent("MetaAgent", orchestrator.meta_agent)
+
+    if warm_up:
+        orchestrator.warm_up(warm_up)
+
+    orchestrator.logger.info(f"✅ Successfully registered {len(AGENT_SPECS) + 1} agents")
@@ -3,27 +3,45 @@ from evo_core.agents.base_agent import BaseAgent
 from typing import Dict, Any
 
 class AnalyticsAgent(BaseAgent):
+    # Not memoized (no cache_ttl): live_metrics must reflect the latest events
     def __init__(self, orchestrator=None):
         super().__init__(
             name="AnalyticsAgent",
-            description="Provides business metrics, insights, reports and performance analysis",
             orchestrator=orchestrator
         )
 
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         await self.log_execution(task, "started")
-        
-        result = {
-            "status": "success",
-            "key_metrics": {
-                "monthly_revenue": 12450,
-                "conversion_rate": "3.8%",
-                "customer_acquisition_cost": 42.50,
-                "churn_rate": "1.2%"
-            },
-            "insight": "Strong growth in organic traffic. Recommend scaling paid ads.",
-            "trend": "upward"
-        }
+
+        reporting = getattr(self.orchestrator, "reporting", None)
+        live = getattr(self.orchestrator, "business_metrics", None)
+        if reporting is None and live is None:
+            result = {"status": "error", "message": "Reporting engine is not configured"}
+            await self.log_execution(task, "failed", result)
+            return result
+
+        result = {"status": "success"}
+        if live is not None:
+            # Streaming aggregates over recent events; cheap to read on every call
+            result["live_metrics"] = live.snapshot()
+
+        if reporting is not None:
+            start, end = context.get("start"), context.get("end")
+            pnl = await reporting.profit_and_loss(context.get("period", "month"), start, end)
+            revenue = [p["total_income"] for p in pnl["periods"]]
+            current = revenue[-1] if revenue else 0.0
+            previous = revenue[-2] if len(revenue) > 1 else 0.0
+            result.update({
+                "key_metrics": {
+                    "period_revenue": current,
+                    "previous_period_revenue": previous,
+                    "revenue_growth": f"{(current - previous) / previous:.1%}" if previous else None,
+                    "net_income": pnl["net_income"]
+                },
+                "revenue_by_source": await reporting.revenue_by_source(start, end),
+                "revenue_trend": dict(zip((p["period"] for p in pnl["periods"]), revenue)),
+                "trend": "upward" if current > previous else "downward" if current < previous else "flat"
+            })
 
         await self.log_execution(task, "completed", result)
         return result
@@ -1,24 +1,73 @@
 # evo_core/agents/base_agent.py
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
 import structlog
+import time
 from datetime import datetime
+from evo_core.agents.agent_registry import get_spec
+from evo_core.memory.local_cache import LocalCache
+from evo_core.telemetry import REGISTRY
 
 logger = structlog.get_logger()
 
+_PER_REQUEST_CONTEXT_KEYS = ("deadline",)
+
+AGENT_SECONDS = REGISTRY.histogram("kelnic_agent_execute_seconds", "BaseAgent.execute latency", ("agent",))
+AGENT_ERRORS = REGISTRY.counter("kelnic_agent_execute_errors", "BaseAgent.execute calls that raised", ("agent",))
+AGENTS_IN_FLIGHT = REGISTRY.gauge("kelnic_agent_execute_in_flight", "BaseAgent.execute calls running", ("agent",))
+
 class BaseAgent(ABC):
-    def __init__(self, name: str, description: str, orchestrator=None):
+    # Opt-in result memoization: subclasses whose results depend only on
+    # (task, context) set cache_ttl > 0. Cached results are shared between
+    # callers and must be treated as read-only.
+    cache_ttl: float = 0.0
+    cache_size: int = 256
+
+    # Orchestrator limits: per-call timeout in seconds (None uses the
+    # orchestrator default), max concurrent calls (0 = unlimited), and for
+    # idempotent agents an optional hedge: a second attempt is started if the
+    # first has not finished after hedge_after seconds.
+    timeout: Optional[float] = None
+    max_concurrency: int = 0
+    idempotent: bool = False
+    hedge_after: Optional[float] = None
+
+    def __init__(self, name: str, description: Optional[str] = None, orchestrator=None, keywords: Optional[List[str]] = None):
+        """``description`` and ``keywords`` default to the agent's entry in ``AGENT_SPECS``."""
+        spec = get_spec(name)
         self.name = name
-        self.description = description
+        self.description = description if description is not None else (spec.description if spec else "")
+        # Trigger terms MetaAgent uses to route tasks to this agent
+        self.keywords = keywords if keywords is not None else (list(spec.keywords) if spec else [])
         self.orchestrator = orchestrator
         self.logger = logger.bind(agent=name)
         self.last_execution = None
+        self._result_cache = LocalCache(self.cache_size, self.cache_ttl) if self.cache_ttl > 0 else None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._cache_stats = {"coalesced": 0}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "execute" in cls.__dict__ and not getattr(cls.__dict__["execute"], "__isabstractmethod__", False):
+            cls.execute = _instrumented(_memoized(cls.__dict__["execute"]))
 
     @abstractmethod
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Main execution method for the agent"""
         pass
 
+    def cache_key(self, task: str, context: Dict[str, Any]) -> str:
+        """Stable hash of (agent, task, context)"""
+        # The request deadline differs per call but does not change the result
+        context = {k: v for k, v in context.items() if k not in _PER_REQUEST_CONTEXT_KEYS}
+        payload = json.dumps([self.name, task, context], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
     async def log_execution(self, task: str, status: str, result: Optional[Dict] = None):
         self.last_execution = {
             "timestamp": datetime.utcnow().isoformat(),
@@ -29,9 +78,88 @@ class BaseAgent(ABC):
         self.logger.info(f"Execution {status}", task=task)
 
     def get_status(self) -> Dict[str, Any]:
-        return {
+        status = {
             "name": self.name,
             "description": self.description,
             "last_execution": self.last_execution,
             "status": "active"
         }
+        if self._result_cache is not None:
+            status["cache"] = {
+                **self._result_cache.get_stats(),
+                **self._cache_stats,
+                "inflight": len(self._inflight),
+                "ttl": self.cache_ttl,
+            }
+        return status
+
+
+# Agents (by id) whose memoized execute is running in the current task, so a
+# subclass calling super().execute() bypasses the cache instead of waiting on itself
+_executing: contextvars.ContextVar[frozenset] = contextvars.ContextVar("_executing", default=frozenset())
+
+
+def _memoized(execute):
+    """Wrap an agent's execute with its TTL cache and single-flight deduplication:
+    concurrent calls with the same key share one in-flight execution."""
+
+    @functools.wraps(execute)
+    async def wrapper(self: BaseAgent, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        cache = getattr(self, "_result_cache", None)
+        if cache is None or id(self) in _executing.get():
+            return await execute(self, task, context)
+
+        key = self.cache_key(task, context)
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._cache_stats["coalesced"] += 1
+        else:
+            generation = cache.generation(key)
+
+            async def run():
+                _executing.set(_executing.get() | {id(self)})
+                return await execute(self, task, context)
+
+            inflight = asyncio.ensure_future(run())
+            self._inflight[key] = inflight
+
+            def _store(done: asyncio.Task):
+                self._inflight.pop(key, None)
+                # Error results are not cached: the next call should retry, not replay them
+                if done.cancelled() or done.exception() is not None:
+                    return
+                result = done.result()
+                if not (isinstance(result, dict) and result.get("status") == "error"):
+                    cache.put(key, result, generation)
+
+            inflight.add_done_callback(_store)
+
+        # Shield so one caller giving up does not cancel the shared execution
+        return await asyncio.shield(inflight)
+
+    return wrapper
+
+
+def _instrumented(execute):
+    """Record latency, errors and in-flight calls of an agent's execute, labelled by agent name."""
+
+    @functools.wraps(execute)
+    async def wrapper(self: BaseAgent, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        name = self.name
+        running = AGENTS_IN_FLIGHT.labels(name)
+        running.value += 1
+        started = time.perf_counter()
+        try:
+            return await execute(self, task, context)
+        except Exception:
+            AGENT_ERRORS.labels(name).inc()
+            raise
+        finally:
+            AGENT_SECONDS.labels(name).observe(time.perf_counter() - started)
+            running.value -= 1
+
+    return wrapper
@@ -1,10 +1,14 @@
 from datetime import datetime
+from typing import Any, Dict
 from ..memory.state_manager import StateManager
+from ..memory.ledger import Ledger
 
 class BookkeeperAgent:
-    def __init__(self, bus, state):
+    def __init__(self, bus, state, ledger: Ledger = None):
         self.bus = bus
         self.state = state
+        # Entries from all events are group-committed by the ledger's writer
+        self.ledger = ledger or Ledger()
         self._subscribe()
 
     def _subscribe(self):
@@ -20,7 +24,9 @@ class BookkeeperAgent:
             'source': event.get('provider', 'unknown'),
             'customer_email': event.get('email')
         }
-        self._double_entry(transaction, 'cash', 'revenue')
+        # Webhook payments can be re-delivered; book each provider event once
+        key = f"payment:{event.get('provider')}:{event['event_id']}" if event.get('event_id') else None
+        self._double_entry(transaction, 'cash', 'revenue', idempotency_key=key)
 
     def record_payout(self, event):
         transaction = {
@@ -29,6 +35,13 @@ class BookkeeperAgent:
             'amount': event['amount'],
             'bank': event['bank']
         }
+        if event.get('category') == 'commission':
+            # Affiliate/vendor commissions from a payout run are an expense, not an owner draw
+            transaction.update(type='commission_payout', payout_id=event.get('payout_id'), recipient=event.get('recipient'))
+            # A resumed run re-publishes its last chunk; book each payout_id once
+            key = f"payout:{event['payout_id']}" if event.get('payout_id') else None
+            self._double_entry(transaction, 'commission_expense', 'cash', idempotency_key=key)
+            return
         self._double_entry(transaction, 'owner_equity', 'cash')
 
     def record_upgrade_cost(self, event):
@@ -38,12 +51,24 @@ class BookkeeperAgent:
             'amount': event['cost'],
             'resource': event['resource']
         }
-        self._double_entry(transaction, 'cash', 'operating_expense')
-
-    def _double_entry(self, transaction, debit_account, credit_account):
-        self.state.save_journal_entry({
-            'transaction': transaction,
-            'debit': debit_account,
-            'credit': credit_account,
-            'amount': transaction['amount']
-        })
+        self._double_entry(transaction, 'operating_expense', 'cash')
+
+    def _double_entry(self, transaction, debit_account, credit_account, idempotency_key=None):
+        # Queued, not awaited: handlers return immediately (the bus would await
+        # a returned future) so entries from many events share one commit.
+        # Direct callers can await the returned future for durability.
+        return self.ledger.record(
+            debit_account,
+            credit_account,
+            transaction['amount'],
+            transaction['type'],
+            details=transaction,
+            source=transaction.get('source') or transaction.get('bank') or transaction.get('resource'),
+            idempotency_key=idempotency_key,
+        )
+
+    async def get_balance(self, account: str):
+        return await self.ledger.get_balance(account)
+
+    async def get_trial_balance(self) -> Dict[str, Any]:
+        return await self.ledger.get_trial_balance()
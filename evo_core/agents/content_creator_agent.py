@@ -1,16 +1,17 @@
 # evo_core/agents/content_creator_agent.py
 from evo_core.agents.base_agent import BaseAgent
+from evo_core.mail import build_message
 from typing import Dict, Any
 
 class ContentCreatorAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="ContentCreatorAgent",
-            description="Generates high-quality marketing content, emails, scripts, and social posts",
             orchestrator=orchestrator
         )
 
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """With ``recipients`` (email addresses) the email is also sent to each of them."""
         await self.log_execution(task, "started")
         
         result = {
@@ -25,5 +26,14 @@ class ContentCreatorAgent(BaseAgent):
             "platforms": ["email", "linkedin", "twitter"]
         }
 
+        mailer = getattr(self.orchestrator, "mailer", None)
+        if context.get("recipients") and mailer is not None:
+            content = result["generated_content"]
+            result["delivery"] = await mailer.send_many(
+                build_message(mailer.sender, [recipient], content["subject"],
+                              f"{content['body_preview']}\n\n{content['call_to_action']}")
+                for recipient in context["recipients"]
+            )
+
         await self.log_execution(task, "completed", result)
         return result
@@ -6,7 +6,6 @@ class DesignerAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="DesignerAgent",
-            description="Creates UI/UX designs, landing pages, branding and visual assets",
             orchestrator=orchestrator
         )
 
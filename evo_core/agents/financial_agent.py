@@ -3,21 +3,38 @@ from evo_core.agents.base_agent import BaseAgent
 from typing import Dict, Any
 
 class FinancialAgent(BaseAgent):
+    cache_ttl = 60.0
+
     def __init__(self, orchestrator=None):
         super().__init__(
             name="FinancialAgent",
-            description="Manages budgeting, revenue tracking, forecasting and financial health",
             orchestrator=orchestrator
         )
 
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         await self.log_execution(task, "started")
-        
+
+        reporting = getattr(self.orchestrator, "reporting", None)
+        if reporting is None:
+            result = {"status": "error", "message": "Reporting engine is not configured"}
+            await self.log_execution(task, "failed", result)
+            return result
+
+        period = context.get("period", "month")
+        start, end = context.get("start"), context.get("end")
+        pnl = await reporting.profit_and_loss(period, start, end)
+        cash_flow = await reporting.cash_flow(period, start, end)
+
+        alerts = [
+            f"Cash outflow exceeded inflow in {p['period']} by ${-p['net']:,.2f}"
+            for p in cash_flow["periods"][-3:] if p["net"] < 0
+        ]
         result = {
             "status": "success",
-            "financial_summary": "Current projected monthly revenue: $12,450",
-            "recommendation": "Reduce ad spend by 15% and focus on high-ROI channels",
-            "alerts": ["Cash flow positive for next 45 days"]
+            "financial_summary": f"Net income: ${pnl['net_income']:,.2f}; net cash change: ${cash_flow['net_change']:,.2f}",
+            "profit_and_loss": pnl,
+            "cash_flow": cash_flow,
+            "alerts": alerts
         }
 
         await self.log_execution(task, "completed", result)
@@ -1,25 +1,112 @@
 # evo_core/agents/invoicing_agent.py
 from evo_core.agents.base_agent import BaseAgent
+from evo_core.mail import build_message
+from evo_core.payments.invoices import (
+    DirectorySink, InvoiceBatchRenderer, ZipSink, document_name, group_line_items, prepare_invoice, render_invoices,
+)
 from typing import Dict, Any
+from datetime import datetime
+import asyncio
+import csv
+import json
+import os
+import uuid
 
 class InvoicingAgent(BaseAgent):
+    # Month-end bulk runs render tens of thousands of documents
+    timeout = 1800.0
+
     def __init__(self, orchestrator=None):
         super().__init__(
             name="InvoicingAgent",
-            description="Creates, sends and tracks invoices automatically",
             orchestrator=orchestrator
         )
 
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Bulk: ``invoices`` (invoice records) or ``input_path`` (JSON-lines invoices,
+        or a CSV of line items sorted by ``invoice_id``), written to ``output_zip``
+        or ``output_dir``. Single: ``lines`` plus the invoice fields; with ``send``
+        the PDF is emailed to the customer."""
         await self.log_execution(task, "started")
-        
+
+        if context.get("invoices") is not None or context.get("input_path"):
+            result = await self._bulk(context)
+        elif context.get("lines"):
+            result = await self._single(context)
+        else:
+            result = {"status": "error", "message": "Provide invoices or input_path (bulk), or lines (single invoice)"}
+
+        await self.log_execution(task, "completed", result)
+        return result
+
+    async def _single(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        invoice = {**context, "invoice_id": context.get("invoice_id") or f"INV-{datetime.utcnow():%Y%m%d}-{uuid.uuid4().hex[:6]}"}
+        formats = tuple(context.get("formats", ("html", "pdf")))
+        (invoice_id, documents, error, _), = await asyncio.to_thread(render_invoices, [invoice], formats)
+        if error:
+            return {"status": "error", "invoice_id": invoice_id, "message": error}
+        prepared = prepare_invoice(invoice)
+        sink = DirectorySink(context.get("output_dir") or os.getenv("INVOICE_OUTPUT_DIR", "invoices"))
+        await asyncio.to_thread(sink.write, invoice_id, documents)
         result = {
             "status": "success",
-            "invoice_id": "INV-20260429-001",
-            "message": "Invoice created and sent to client",
-            "amount": 1249.99,
-            "due_date": "2026-05-29"
+            "invoice_id": invoice_id,
+            "amount": prepared["total_cents"] / 100,
+            "currency": prepared["currency"],
+            "due_date": prepared["due_date"],
+            "documents": [sink.path(invoice_id, fmt) for fmt in documents],
         }
-
-        await self.log_execution(task, "completed", result)
+        if context.get("send"):
+            result["email"] = await self._send(prepared, documents)
         return result
+
+    async def _send(self, prepared: Dict[str, Any], documents: Dict[str, bytes]) -> Dict[str, Any]:
+        mailer = getattr(self.orchestrator, "mailer", None)
+        if mailer is None or not prepared["customer_email"]:
+            return {"sent": False, "reason": "no mailer" if mailer is None else "no customer email"}
+        message = build_message(
+            mailer.sender,
+            [prepared["customer_email"]],
+            f"Invoice {prepared['invoice_id']} from {prepared['seller_name']}",
+            f"Hi {prepared['customer_name']},\n\nPlease find invoice {prepared['invoice_id']} for "
+            f"{prepared['currency']} {prepared['total']} attached, due {prepared['due_date']}.\n",
+            html=documents["html"].decode() if "html" in documents else None,
+            attachments=[(f"{document_name(prepared['invoice_id'])}.pdf", documents["pdf"], "application/pdf")] if "pdf" in documents else (),
+        )
+        outcome = await mailer.send(message)
+        return {"sent": bool(outcome["delivered"]), **outcome}
+
+    async def _bulk(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        run_id = context.get("run_id") or f"INVRUN-{datetime.utcnow():%Y%m%d}-{uuid.uuid4().hex[:8]}"
+        if context.get("output_zip"):
+            sink = ZipSink(context["output_zip"])
+        else:
+            sink = DirectorySink(context.get("output_dir") or os.path.join(os.getenv("INVOICE_OUTPUT_DIR", "invoices"), run_id))
+
+        state = self.orchestrator.state_manager if self.orchestrator is not None else None
+
+        async def report(progress):
+            self.logger.info("Invoice run progress", run_id=run_id, **progress)
+            if state is not None:
+                await state.set_state(f"invoice_run:{run_id}", "progress", progress, ttl=86400)
+
+        renderer = InvoiceBatchRenderer(
+            sink,
+            formats=tuple(context.get("formats", ("html", "pdf"))),
+            workers=context.get("workers"),
+            on_progress=report,
+        )
+        source = context.get("invoices")
+        handle = None
+        if source is None:
+            handle = open(context["input_path"], newline="", encoding="utf-8")
+            if context["input_path"].endswith(".csv"):
+                source = group_line_items(csv.DictReader(handle))
+            else:
+                source = (json.loads(line) for line in handle if line.strip())
+        try:
+            summary = await renderer.run(source)
+        finally:
+            if handle is not None:
+                handle.close()
+        return {"status": "success", "run_id": run_id, **summary}
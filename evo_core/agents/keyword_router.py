@@ -0,0 +1,110 @@
+# evo_core/agents/keyword_router.py
+from typing import Dict, List, Iterable
+from collections import OrderedDict, deque
+import re
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over trigger terms.
+
+    Finds every term occurring anywhere in a text (including overlapping
+    ones, e.g. both "pay" and "payment request") in a single pass, so the
+    cost depends on the text length, not on how many terms are registered.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[set] = [set()]
+        self._compiled = True
+
+    def add(self, term: str, label: str):
+        state = 0
+        for char in term.lower():
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = nxt
+        self._output[state].add(label)
+        self._compiled = False
+
+    def compile(self):
+        """Build failure links breadth-first; called lazily before the first search."""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+        self._compiled = True
+
+    def search(self, text: str) -> set:
+        if not self._compiled:
+            self.compile()
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class KeywordRouter:
+    """Routes task text to the agents whose trigger terms it contains.
+
+    Agents are returned in registration order. Plans are cached per
+    normalized task text (LRU, ``cache_size`` entries); registering an agent
+    clears the cache.
+    """
+
+    _whitespace = re.compile(r"\s+")
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._order: Dict[str, int] = {}
+        self._automaton = KeywordAutomaton()
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def register(self, agent_name: str, keywords: Iterable[str]):
+        keywords = list(keywords)
+        if not keywords:
+            return
+        self._order.setdefault(agent_name, len(self._order))
+        for term in keywords:
+            self._automaton.add(term, agent_name)
+        self._cache.clear()
+
+    @classmethod
+    def normalize(cls, task: str) -> str:
+        return cls._whitespace.sub(" ", task.lower()).strip()
+
+    def match(self, task: str) -> List[str]:
+        key = self.normalize(task)
+        agents = self._cache.get(key)
+        if agents is not None:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return agents
+
+        self.stats["misses"] += 1
+        agents = sorted(self._automaton.search(key), key=self._order.__getitem__)
+        self._cache[key] = agents
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return agents
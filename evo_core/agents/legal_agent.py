@@ -6,7 +6,6 @@ class LegalAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="LegalAgent",
-            description="Handles contracts, compliance, terms of service and legal reviews",
             orchestrator=orchestrator
         )
 
@@ -1,30 +1,51 @@
 # evo_core/agents/marketing_engine_agent.py
 from evo_core.agents.base_agent import BaseAgent
-from typing import Dict, Any
+from evo_core.llm import LLMError
+from typing import Dict, Any, List, Optional
 
 class MarketingEngineAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="MarketingEngineAgent",
-            description="Handles marketing campaigns, funnels, ads, and promotion strategies",
             orchestrator=orchestrator
         )
 
+    DEFAULT_SUGGESTIONS = [
+        "Create targeted Facebook + Google Ads campaign",
+        "Build high-converting landing page",
+        "Develop email nurture sequence",
+        "Optimize social media content calendar"
+    ]
+
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         await self.log_execution(task, "started")
-        
-        # Placeholder for real LLM + tool calling logic
+
+        suggestions = await self._suggest(task, context)
         result = {
             "status": "success",
             "action": "marketing_strategy_generated",
-            "suggestions": [
-                "Create targeted Facebook + Google Ads campaign",
-                "Build high-converting landing page",
-                "Develop email nurture sequence",
-                "Optimize social media content calendar"
-            ],
+            "suggestions": suggestions or self.DEFAULT_SUGGESTIONS,
+            "source": "llm" if suggestions else "default",
             "estimated_impact": "Potential 3x lead increase in 30 days"
         }
 
         await self.log_execution(task, "completed", result)
         return result
+
+    async def _suggest(self, task: str, context: Dict[str, Any]) -> Optional[List[str]]:
+        """Four concrete actions from the shared LLM client; None without one or on failure."""
+        llm = getattr(self.orchestrator, "llm", None)
+        if llm is None:
+            return None
+        details = "\n".join(f"{k}: {v}" for k, v in context.items() if isinstance(v, (str, int, float)))
+        try:
+            text = await llm.text(
+                f"Task: {task}\n{details}\nGive four concrete marketing actions, one per line, no numbering.",
+                system="You are the marketing strategist of a small online business.",
+                max_tokens=200,
+            )
+        except LLMError as e:
+            self.logger.warning("LLM suggestions failed", error=str(e))
+            return None
+        lines = [line.strip(" -*\t") for line in text.splitlines() if line.strip(" -*\t")]
+        return lines[:4] or None
@@ -1,6 +1,10 @@
 # evo_core/agents/meta_agent.py
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import os
 from evo_core.agents.base_agent import BaseAgent
+from evo_core.agents.keyword_router import KeywordRouter
+from evo_core.agents.semantic_router import SemanticRouter
+from evo_core.llm import LLMError
 
 class MetaAgent(BaseAgent):
     def __init__(self, orchestrator):
@@ -10,47 +14,71 @@ class MetaAgent(BaseAgent):
             orchestrator=orchestrator
         )
         self.available_agents = {}
+        self.router = KeywordRouter()
+        self.semantic_router = SemanticRouter()
+        # LLM fallback routing is opt-in: it puts a model call on the request path
+        self.llm_routing = os.getenv("LLM_ROUTING", "false").lower() in ("1", "true", "yes")
 
-    def register_agent(self, name: str, description: str):
+    def register_agent(self, name: str, description: str, keywords: Optional[List[str]] = None):
         self.available_agents[name] = description
+        self.router.register(name, keywords or [])
+        self.semantic_router.register(name, description, keywords or [])
+
+    async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.route_task(task, context)
 
     async def route_task(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Decide which agent(s) should handle the task"""
-        
-        # Simple but effective routing logic (you can later replace with LLM call)
-        task_lower = task.lower()
-
-        plan = {"steps": []}
+        agents = self.router.match(task)
+        semantic = None if agents else self.semantic_router.route(task)
+        if not agents and not semantic and self.llm_routing:
+            # Neither keywords nor descriptions matched: ask the shared LLM before falling back
+            agent_name = await self._llm_route(task)
+            if agent_name:
+                plan = self._build_plan(task, [agent_name])
+                plan["reasoning"] = f"Routed by LLM for task: {task}"
+                return plan
+        return self._build_plan(task, agents, semantic)
 
-        if any(word in task_lower for word in ["market", "campaign", "advertise", "promote", "social"]):
-            plan["steps"].append({
-                "agent": "MarketingEngineAgent",
-                "task": task
-            })
-
-        if any(word in task_lower for word in ["finance", "budget", "expense", "revenue", "profit"]):
-            plan["steps"].append({
-                "agent": "FinancialAgent",
-                "task": task
-            })
+    async def _llm_route(self, task: str) -> Optional[str]:
+        llm = getattr(self.orchestrator, "llm", None)
+        if llm is None or not self.available_agents:
+            return None
+        catalogue = "\n".join(f"{name}: {description}" for name, description in self.available_agents.items())
+        try:
+            answer = await llm.text(
+                f"Agents:\n{catalogue}\n\nTask: {task}\nReply with the single best agent name only.",
+                max_tokens=20,
+            )
+        except LLMError as e:
+            self.logger.warning("LLM routing failed", error=str(e))
+            return None
+        answer = answer.strip().strip(".")
+        return answer if answer in self.available_agents else None
 
-        if any(word in task_lower for word in ["invoice", "billing", "payment request"]):
-            plan["steps"].append({
-                "agent": "InvoicingAgent",
-                "task": task
-            })
+    async def route_batch(self, tasks: List[str], context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Route many tasks at once; semantic fallbacks are scored in one matrix product"""
+        matches = [self.router.match(task) for task in tasks]
+        unmatched = [i for i, agents in enumerate(matches) if not agents]
+        semantic = dict(zip(unmatched, self.semantic_router.route_batch([tasks[i] for i in unmatched])))
+        return [
+            self._build_plan(task, agents, semantic.get(i))
+            for i, (task, agents) in enumerate(zip(tasks, matches))
+        ]
 
-        if any(word in task_lower for word in ["pay", "payout", "transfer", "withdraw"]):
-            plan["steps"].append({
-                "agent": "PayoutAgent",
-                "task": task
-            })
+    def _build_plan(self, task: str, agents: List[str], semantic: Optional[List] = None) -> Dict[str, Any]:
+        # Keyword routing over registered trigger terms first
+        plan = {"steps": [{"agent": agent_name, "task": task} for agent_name in agents]}
+        reasoning = f"Routed based on keyword analysis for task: {task}"
 
-        if any(word in task_lower for word in ["content", "write", "script", "blog", "email"]):
-            plan["steps"].append({
-                "agent": "ContentCreatorAgent",
-                "task": task
-            })
+        # No keyword hit: rank agents by similarity of their descriptions to the task
+        if not plan["steps"]:
+            if semantic is None:
+                semantic = self.semantic_router.route(task)
+            plan["steps"] = [{"agent": agent_name, "task": task} for agent_name, _ in semantic]
+            if semantic:
+                scores = ", ".join(f"{agent_name}={score:.2f}" for agent_name, score in semantic)
+                reasoning = f"Routed based on description similarity ({scores}) for task: {task}"
 
         # Default fallback
         if not plan["steps"]:
@@ -59,7 +87,7 @@ class MetaAgent(BaseAgent):
                 "task": f"General assistance for: {task}"
             })
 
-        plan["reasoning"] = f"Routed based on keyword analysis for task: {task}"
+        plan["reasoning"] = reasoning
         plan["priority"] = 5
 
         return plan
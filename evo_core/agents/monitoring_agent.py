@@ -1,25 +1,73 @@
 # evo_core/agents/monitoring_agent.py
 from evo_core.agents.base_agent import BaseAgent
-from typing import Dict, Any
+from evo_core.telemetry import REGISTRY
+from evo_core.telemetry.resources import fd_limit
+from typing import Dict, Any, List
+
+# Alert thresholds
+CPU_ALERT_PERCENT = 85.0
+MEMORY_ALERT_PERCENT = 90.0
+LOOP_LAG_ALERT_MS = 100.0
+FD_ALERT_RATIO = 0.8
+
+
+def resource_alerts(current: Dict[str, Any]) -> List[str]:
+    """Threshold alerts for one ResourceSampler sample."""
+    alerts = []
+    cpu = current.get("process_cpu_percent")
+    if cpu is not None and cpu > CPU_ALERT_PERCENT:
+        alerts.append(f"Process CPU at {cpu:.0f}%")
+    memory = current.get("host_memory_percent")
+    if memory is not None and memory > MEMORY_ALERT_PERCENT:
+        alerts.append(f"Host memory at {memory:.0f}%")
+    lag = current.get("loop_lag_ms")
+    if lag is not None and lag > LOOP_LAG_ALERT_MS:
+        alerts.append(f"Event loop lag {lag:.0f}ms")
+    fds, limit = current.get("open_fds"), fd_limit()
+    if fds is not None and limit and fds > FD_ALERT_RATIO * limit:
+        alerts.append(f"{fds:.0f} of {limit} file descriptors open")
+    return alerts
+
 
 class MonitoringAgent(BaseAgent):
+    cache_ttl = 5.0
+
     def __init__(self, orchestrator=None):
         super().__init__(
             name="MonitoringAgent",
-            description="Real-time system monitoring, performance tracking and alerts",
             orchestrator=orchestrator
         )
 
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         await self.log_execution(task, "started")
-        
+
+        sampler = getattr(self.orchestrator, "resources", None)
+        if sampler is None or not sampler.latest:
+            result = {"status": "error", "message": "Resource sampler is not running"}
+            await self.log_execution(task, "failed", result)
+            return result
+
+        current = sampler.latest
+        last_minute = sampler.history(points=1, seconds=60)
+        alerts = resource_alerts(current)
+        open_circuits = [name for name, breaker in self.orchestrator.breakers.items() if breaker.state != "closed"]
+        alerts.extend(f"Circuit open for {name}" for name in open_circuits)
+        errors = REGISTRY.get("kelnic_task_errors")
+
         result = {
             "status": "success",
-            "cpu_usage": "23%",
-            "memory_usage": "41%",
-            "active_agents": 14,
-            "errors_last_24h": 2,
-            "overall_health": "Excellent"
+            "cpu_usage": current["process_cpu_percent"],
+            "host_cpu_usage": current["host_cpu_percent"],
+            "memory_rss_bytes": current["rss_bytes"],
+            "host_memory_usage": current["host_memory_percent"],
+            "open_fds": current["open_fds"],
+            "event_loop_lag_ms": current["loop_lag_ms"],
+            "event_loop_lag_ms_1m_avg": last_minute["loop_lag_ms"][0] if last_minute["loop_lag_ms"] else None,
+            "asyncio_tasks": current["asyncio_tasks"],
+            "active_agents": len(self.orchestrator.agents),
+            "task_errors": errors._default.value if errors is not None else 0,
+            "alerts": alerts,
+            "overall_health": "Degraded" if alerts else "Healthy"
         }
 
         await self.log_execution(task, "completed", result)
@@ -6,7 +6,6 @@ class PaymentAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="PaymentAgent",
-            description="Processes customer payments, handles Stripe/PayPal integrations and receipts",
             orchestrator=orchestrator
         )
 
@@ -1,26 +1,49 @@
 # evo_core/agents/payout_agent.py
 from evo_core.agents.base_agent import BaseAgent
+from evo_core.payments.payout_runs import PayoutRunError, PayoutRunner
 from typing import Dict, Any
+from datetime import datetime
+import uuid
 
 class PayoutAgent(BaseAgent):
+    # Batch runs over many recipients take longer than the orchestrator default
+    timeout = 600.0
+
     def __init__(self, orchestrator=None):
         super().__init__(
             name="PayoutAgent",
-            description="Handles payouts, withdrawals, affiliate commissions and vendor payments",
             orchestrator=orchestrator
         )
+        self.runner = None
+        if orchestrator is not None:
+            self.runner = PayoutRunner(orchestrator.message_bus, orchestrator.state_manager)
 
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Batch run: ``context["commissions"]`` (a period's commission events) with
+        an optional ``run_id``/``period``; passing only ``run_id`` resumes or
+        reports that run. Single payout: ``recipient`` and ``amount``."""
         await self.log_execution(task, "started")
-        
-        result = {
-            "status": "success",
-            "payout_id": "PO-20260429-078",
-            "amount": 850.00,
-            "recipient": context.get("recipient", "Affiliate Partner"),
-            "method": "Bank Transfer / Stripe",
-            "message": "Payout processed successfully. Expected arrival: 2-3 business days."
-        }
 
+        if self.runner is None:
+            return {"status": "error", "message": "PayoutAgent needs an orchestrator"}
+
+        commissions = context.get("commissions")
+        one_off = False
+        if commissions is None and context.get("amount") is not None and context.get("recipient"):
+            # A one-off payout is paid in full, whatever the batch threshold, outside the carry-forward
+            commissions = [{field: context.get(field) for field in ("recipient", "amount", "beneficiary", "bank", "account", "branch_code", "currency")}]
+            one_off = True
+        run_id = context.get("run_id")
+        if run_id is None:
+            if commissions is None:
+                return {"status": "error", "message": "Provide commissions (batch run), run_id (resume) or recipient and amount"}
+            run_id = f"PO-{datetime.utcnow():%Y%m%d}-{uuid.uuid4().hex[:8]}"
+
+        try:
+            summary = await self.runner.run(run_id, commissions, context.get("period"), one_off)
+        except PayoutRunError as e:
+            return {"status": "error", "run_id": run_id, "message": str(e)}
+
+        result = {**summary, "status": "success"}
         await self.log_execution(task, "completed", result)
         return result
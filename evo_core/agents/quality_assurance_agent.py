@@ -6,7 +6,6 @@ class QualityAssuranceAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="QualityAssuranceAgent",
-            description="Performs testing, validation and quality checks across all operations",
             orchestrator=orchestrator
         )
 
@@ -1,24 +1,52 @@
 # evo_core/agents/self_healing_agent.py
 from evo_core.agents.base_agent import BaseAgent
+from evo_core.agents.monitoring_agent import MEMORY_ALERT_PERCENT, resource_alerts
 from typing import Dict, Any
 
 class SelfHealingAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="SelfHealingAgent",
-            description="Monitors system health, detects failures and automatically recovers",
             orchestrator=orchestrator
         )
 
     async def execute(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         await self.log_execution(task, "started")
-        
+
+        sampler = getattr(self.orchestrator, "resources", None)
+        if sampler is None or not sampler.latest:
+            result = {"status": "error", "message": "Resource sampler is not running"}
+            await self.log_execution(task, "failed", result)
+            return result
+
+        current = sampler.latest
+        issues = resource_alerts(current)
+        recovered = []
+
+        # Memory pressure: drop memoized agent results, the one cache we own
+        memory = current.get("host_memory_percent")
+        if memory is not None and memory > MEMORY_ALERT_PERCENT:
+            cleared = 0
+            for agent in self.orchestrator.agents.values():
+                cache = getattr(agent, "_result_cache", None)
+                if cache is not None and len(cache):
+                    cleared += len(cache)
+                    cache.clear()
+            if cleared:
+                recovered.append(f"Cleared {cleared} cached agent results")
+
+        # An open breaker lets one probe call through after reset_timeout and closes
+        # only when a call to that agent succeeds, so it stays reported until then
+        for name, status in self.orchestrator.get_agent_health().items():
+            if status["state"] != "closed":
+                issues.append(f"Circuit {status['state']} for {name}")
+
         result = {
             "status": "success",
-            "health_check": "All systems operational",
-            "recovered_issues": ["Fixed stuck message bus queue", "Restarted slow agent instance"],
-            "preventive_actions": "Increased Redis connection pool size",
-            "system_status": "Stable"
+            "health_check": "; ".join(issues) if issues else "All systems operational",
+            "issues": issues,
+            "recovered_issues": recovered,
+            "system_status": "Degraded" if issues else "Stable"
         }
 
         await self.log_execution(task, "completed", result)
@@ -0,0 +1,148 @@
+# evo_core/agents/semantic_router.py
+from typing import Dict, List, Optional, Tuple, Sequence
+import re
+import zlib
+import numpy as np
+
+
+class HashingVectorizer:
+    """Offline text embedding: hashed word unigrams plus character n-grams.
+
+    Features are hashed into ``dim`` signed buckets, weighted by sublinear
+    term frequency and L2 normalized, so a dot product is a cosine
+    similarity. Features are hashed with CRC-32 rather than Python's salted
+    ``hash``, so vectors are the same in every process and across restarts.
+    """
+
+    _token = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dim: int = 4096, ngram_range: Tuple[int, int] = (3, 5), token_cache_size: int = 50000):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.token_cache_size = token_cache_size
+        self._token_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def token_features(self, token: str) -> List[str]:
+        features = [f"w:{token}"]
+        padded = f" {token} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def _token_vector(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        vector = self._token_cache.get(token)
+        if vector is None:
+            counts: Dict[int, float] = {}
+            for feature in self.token_features(token):
+                h = zlib.crc32(feature.encode())
+                index = h % self.dim
+                # Sign from the top bit: the low bits already pick the bucket
+                counts[index] = counts.get(index, 0.0) + (1.0 if h >> 31 else -1.0)
+            vector = (
+                np.fromiter(counts.keys(), dtype=np.int64, count=len(counts)),
+                np.fromiter(counts.values(), dtype=np.float32, count=len(counts)),
+            )
+            if len(self._token_cache) >= self.token_cache_size:
+                self._token_cache.clear()
+            self._token_cache[token] = vector
+        return vector
+
+    def transform(self, texts: Sequence[str], weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Embed ``texts`` into L2-normalized rows, optionally scaling features by ``weights`` first."""
+        # Token vectors are cached, so a batch is assembled with one scatter-add
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for token in self._token.findall(text.lower()):
+                indices, signs = self._token_vector(token)
+                rows.append(np.full(len(indices), row, dtype=np.int64))
+                cols.append(indices)
+                values.append(signs)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.concatenate(rows), np.concatenate(cols)), np.concatenate(values))
+        magnitude = np.abs(matrix)
+        np.log1p(magnitude, out=magnitude)
+        np.copysign(magnitude, matrix, out=matrix)
+        if weights is not None:
+            matrix *= weights
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class SemanticRouter:
+    """Scores tasks against agent descriptions with one matrix product.
+
+    Each agent's name, description and keywords are embedded once into a row
+    of ``self.matrix``; a task vector (or a batch of them) is multiplied by
+    the matrix and up to ``top_k`` agents scoring at least ``threshold``
+    (and ``relative_threshold`` of the best score) are returned. Rows are
+    IDF-weighted across agents so terms every description shares carry
+    little weight.
+    """
+
+    _camel = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+    def __init__(self, dim: int = 4096, threshold: float = 0.12, top_k: int = 2, relative_threshold: float = 0.6):
+        self.vectorizer = HashingVectorizer(dim)
+        self.threshold = threshold
+        self.top_k = top_k
+        # Runners-up must score at least this fraction of the best agent's score
+        self.relative_threshold = relative_threshold
+        self.block_size = 64
+        self.names: List[str] = []
+        self._texts: Dict[str, str] = {}
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self._idf = np.ones(dim, dtype=np.float32)
+        self._dirty = False
+
+    def register(self, agent_name: str, description: str, keywords: Sequence[str] = ()):
+        readable_name = self._camel.sub(" ", agent_name).replace("Agent", "")
+        self._texts[agent_name] = " ".join([readable_name, description, *keywords])
+        self._dirty = True
+
+    def _build(self):
+        self.names = list(self._texts)
+        raw = self.vectorizer.transform([self._texts[name] for name in self.names])
+        document_frequency = np.count_nonzero(raw, axis=0)
+        self._idf = np.log((1 + len(self.names)) / (1 + document_frequency)).astype(np.float32) + 1.0
+        self.matrix = self._normalize(raw * self._idf)
+        self._dirty = False
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def scores(self, tasks: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of every task to every agent, shape (len(tasks), len(agents))."""
+        if self._dirty:
+            self._build()
+        if not self.names:
+            return np.zeros((len(tasks), 0), dtype=np.float32)
+        # Score in blocks so the dense task vectors stay cache-sized
+        return np.vstack([
+            self.vectorizer.transform(tasks[start:start + self.block_size], self._idf) @ self.matrix.T
+            for start in range(0, len(tasks), self.block_size)
+        ]) if len(tasks) else np.zeros((0, len(self.names)), dtype=np.float32)
+
+    def route_batch(self, tasks: Sequence[str]) -> List[List[Tuple[str, float]]]:
+        scores = self.scores(tasks)
+        k = min(self.top_k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in tasks]
+        # argpartition picks the top-k per row without sorting every agent
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        routed = []
+        for row, candidates in enumerate(top):
+            ranked = sorted(candidates, key=lambda col: -scores[row, col])
+            cutoff = max(self.threshold, self.relative_threshold * scores[row, ranked[0]])
+            routed.append([
+                (self.names[col], float(scores[row, col]))
+                for col in ranked if scores[row, col] >= cutoff
+            ])
+        return routed
+
+    def route(self, task: str) -> List[Tuple[str, float]]:
+        return self.route_batch([task])[0]
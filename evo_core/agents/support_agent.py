@@ -6,7 +6,6 @@ class SupportAgent(BaseAgent):
     def __init__(self, orchestrator=None):
         super().__init__(
             name="SupportAgent",
-            description="Handles customer support, troubleshooting and general assistance",
             orchestrator=orchestrator
         )
 
@@ -0,0 +1,3 @@
+from .backends import LLMBackend, LLMError, OpenAICompatibleBackend
+from .cache import PromptCache, request_key
+from .client import LLMClient, estimate_tokens
@@ -0,0 +1,143 @@
+# evo_core/llm/backends.py
+"""Model backends behind ``LLMClient``.
+
+``OpenAICompatibleBackend`` talks to any server implementing the OpenAI
+``/chat/completions`` and ``/completions`` endpoints: OpenAI itself, vLLM,
+llama.cpp, Ollama, or ``scripts/fake_llm_server.py`` for offline work.
+With ``batch=True`` several plain-prompt requests that share parameters are
+sent as one ``/completions`` call with a list of prompts.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+Request = Dict[str, Any]
+Response = Dict[str, Any]
+
+
+class LLMError(RuntimeError):
+    pass
+
+
+def retry_after(value: Optional[str], default: float) -> float:
+    """Seconds to wait from a Retry-After header (delay-seconds or an HTTP
+    date); ``default`` if it is missing or unparseable."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class LLMBackend(ABC):
+    supports_batch = False
+
+    @abstractmethod
+    async def complete(self, request: Request) -> Response:
+        """``{"text", "model", "usage": {"prompt_tokens", "completion_tokens"}, "finish_reason"}``."""
+
+    @abstractmethod
+    def stream(self, request: Request) -> AsyncIterator[str]:
+        """Yield the completion text as it is generated."""
+
+    async def complete_batch(self, requests: List[Request]) -> List[Response]:
+        return list(await asyncio.gather(*(self.complete(r) for r in requests)))
+
+    async def close(self):
+        pass
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, base_url: str, api_key: str = "", timeout: float = 60.0, batch: bool = False, max_retries: int = 3):
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        self.supports_batch = batch
+        self.max_retries = max_retries
+
+    @staticmethod
+    def _endpoint(request: Request):
+        return "/completions" if "prompt" in request else "/chat/completions"
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post(path, json=body)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"LLM request failed: {e!r}") from e
+                await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+            if response.status_code in self.RETRY_STATUS and attempt < self.max_retries:
+                delay = retry_after(response.headers.get("retry-after"), 0.5 * 2 ** attempt)
+                await asyncio.sleep(min(delay, 30.0))
+                continue
+            if response.status_code >= 400:
+                raise LLMError(f"LLM request failed with {response.status_code}: {response.text[:200]}")
+            return response.json()
+
+    @staticmethod
+    def _response(data: Dict[str, Any], choice: Dict[str, Any]) -> Response:
+        text = choice["message"]["content"] if "message" in choice else choice.get("text", "")
+        usage = data.get("usage") or {}
+        return {
+            "text": text or "",
+            "model": data.get("model"),
+            "usage": {"prompt_tokens": usage.get("prompt_tokens", 0), "completion_tokens": usage.get("completion_tokens", 0)},
+            "finish_reason": choice.get("finish_reason"),
+        }
+
+    async def complete(self, request: Request) -> Response:
+        data = await self._post(self._endpoint(request), request)
+        return self._response(data, data["choices"][0])
+
+    async def complete_batch(self, requests: List[Request]) -> List[Response]:
+        if not self.supports_batch or any("prompt" not in r for r in requests):
+            return await super().complete_batch(requests)
+        data = await self._post("/completions", {**requests[0], "prompt": [r["prompt"] for r in requests]})
+        choices = sorted(data["choices"], key=lambda c: c.get("index", 0))
+        # Usage is reported for the whole batch; split it evenly
+        usage = data.get("usage") or {}
+        share = {k: usage.get(k, 0) // len(requests) for k in ("prompt_tokens", "completion_tokens")}
+        return [{**self._response(data, choice), "usage": dict(share)} for choice in choices]
+
+    async def stream(self, request: Request) -> AsyncIterator[str]:
+        async with self.client.stream("POST", self._endpoint(request), json={**request, "stream": True}) as response:
+            if response.status_code >= 400:
+                body = await response.aread()
+                raise LLMError(f"LLM stream failed with {response.status_code}: {body[:200]!r}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
+                choice = json.loads(payload)["choices"][0]
+                text = (choice.get("delta") or {}).get("content") if "delta" in choice else choice.get("text")
+                if text:
+                    yield text
+
+    async def close(self):
+        await self.client.aclose()
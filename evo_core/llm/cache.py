@@ -0,0 +1,100 @@
+# evo_core/llm/cache.py
+"""Exact-match cache of LLM responses.
+
+Keys are SHA-256 digests of the canonical request (model, messages or
+prompt, sampling parameters). Hot entries live in a ``LocalCache``; with a
+``path`` every entry is also written to a SQLite file, so the cache
+survives restarts and can hold more than fits in memory. Disk lookups and
+writes run on one dedicated thread, as in ``SQLiteBackend``.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Mapping, Optional
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from evo_core.memory.local_cache import LocalCache
+
+
+def request_key(request: Mapping[str, Any]) -> str:
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class PromptCache:
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 86400.0, max_entries: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.memory = LocalCache(max_entries, ttl)
+        self.stats = {"disk_hits": 0, "writes": 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache") if path else None
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _put_sync(self, key: str, value: str):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT INTO responses (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, value, now + self.ttl),
+            )
+            if self.stats["writes"] % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.memory.get(key)
+        if value is not None or self._executor is None:
+            return value
+        raw = await self._run(self._get_sync, key)
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.memory.put(key, value)
+        self.stats["disk_hits"] += 1
+        return value
+
+    async def put(self, key: str, value: Dict[str, Any]):
+        self.memory.put(key, value)
+        self.stats["writes"] += 1
+        if self._executor is not None:
+            await self._run(self._put_sync, key, json.dumps(value))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.memory.get_stats(), **self.stats, "persistent": self.path is not None}
+
+    async def close(self):
+        if self._executor is None:
+            return
+
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(_close)
+        self._executor.shutdown(wait=True)
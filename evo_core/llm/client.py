@@ -0,0 +1,236 @@
+# evo_core/llm/client.py
+"""Shared async LLM client for all agents.
+
+``LLMClient.complete`` layers, in order:
+
+1. an exact-match ``PromptCache`` (deterministic requests only, i.e.
+   ``temperature`` 0 unless the caller passes ``cache=True``);
+2. coalescing: identical cacheable requests already in flight share one
+   backend call instead of each making their own;
+3. a limiter: at most ``max_concurrency`` backend calls at once and a
+   token bucket of ``tokens_per_minute`` (prompt estimate plus
+   ``max_tokens``, charged before the call);
+4. micro-batching: when the backend supports it, plain-prompt requests
+   arriving within ``batch_window`` seconds of each other with the same
+   parameters go out as one call of up to ``max_batch`` prompts.
+
+``stream`` yields text as it is generated and caches the finished answer.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import time
+
+import structlog
+
+from evo_core.llm.backends import LLMBackend, LLMError, OpenAICompatibleBackend
+from evo_core.llm.cache import PromptCache, request_key
+from evo_core.orchestrator.resilience import RateLimiter
+from evo_core.telemetry import REGISTRY
+
+logger = structlog.get_logger()
+
+LLM_REQUESTS = REGISTRY.counter("kelnic_llm_requests", "LLM requests by how they were served", ("source",))
+LLM_TOKENS = REGISTRY.counter("kelnic_llm_tokens", "Tokens used by backend calls", ("kind",))
+LLM_CALL_SECONDS = REGISTRY.histogram("kelnic_llm_call_seconds", "LLM backend call latency")
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Rough budget charge: ~4 characters per prompt token plus the completion limit."""
+    if "prompt" in request:
+        chars = len(request["prompt"])
+    else:
+        chars = sum(len(str(m.get("content", ""))) for m in request.get("messages", ()))
+    return chars // 4 + 1 + int(request.get("max_tokens") or 256)
+
+
+class LLMClient:
+    def __init__(
+        self,
+        backend: Optional[LLMBackend] = None,
+        model: Optional[str] = None,
+        cache: Optional[PromptCache] = None,
+        max_concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        batch_window: Optional[float] = None,
+        max_batch: int = 16,
+    ):
+        """Defaults come from ``LLM_BASE_URL``, ``LLM_API_KEY`` (or ``OPENAI_API_KEY``),
+        ``LLM_BATCH``, ``LLM_MODEL``, ``LLM_CACHE_PATH``, ``LLM_CACHE_TTL``,
+        ``LLM_MAX_CONCURRENCY``, ``LLM_TOKENS_PER_MINUTE`` (0 = unlimited) and
+        ``LLM_BATCH_WINDOW_MS``."""
+        self.backend = backend or OpenAICompatibleBackend(
+            os.getenv("LLM_BASE_URL", "https://api.openai.com/v1"),
+            os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY", ""),
+            batch=os.getenv("LLM_BATCH", "false").lower() in ("1", "true", "yes"),
+        )
+        self.model = model or os.getenv("LLM_MODEL", "gpt-4o-mini")
+        self.cache = cache or PromptCache(
+            os.getenv("LLM_CACHE_PATH") or None, ttl=float(os.getenv("LLM_CACHE_TTL", "86400"))
+        )
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        tpm = tokens_per_minute if tokens_per_minute is not None else int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+        self.limiter = RateLimiter(tpm / 60.0, burst=tpm) if tpm else None
+        self.batch_window = batch_window if batch_window is not None else float(os.getenv("LLM_BATCH_WINDOW_MS", "10")) / 1000
+        self.max_batch = max_batch
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._batches: Dict[str, Tuple[List[Tuple[Dict[str, Any], asyncio.Future]], Optional[asyncio.TimerHandle]]] = {}
+        self._batch_tasks = set()
+        self.stats = {"cache_hits": 0, "coalesced": 0, "backend_calls": 0, "batched_requests": 0, "errors": 0}
+        self.logger = logger.bind(component="LLMClient")
+
+    def build_request(self, prompt: Optional[str] = None, messages: Optional[List[Dict[str, str]]] = None,
+                      system: Optional[str] = None, **params) -> Dict[str, Any]:
+        """``messages`` (chat), or ``prompt`` with an optional ``system`` message (chat),
+        or ``prompt`` alone with ``raw=True`` (plain completion, batchable)."""
+        params.setdefault("temperature", 0)
+        params.setdefault("max_tokens", 256)
+        model = params.pop("model", None) or self.model
+        if params.pop("raw", False):
+            return {"model": model, "prompt": prompt, **params}
+        if messages is None:
+            messages = ([{"role": "system", "content": system}] if system else []) + [{"role": "user", "content": prompt}]
+        return {"model": model, "messages": messages, **params}
+
+    @staticmethod
+    def _cacheable(request: Dict[str, Any], cache: Optional[bool]) -> bool:
+        return cache if cache is not None else not request.get("temperature")
+
+    async def complete(self, prompt: Optional[str] = None, cache: Optional[bool] = None, **kwargs) -> Dict[str, Any]:
+        """Response dict: ``text``, ``model``, ``usage``, ``finish_reason`` and ``cached``."""
+        request = self.build_request(prompt, **kwargs)
+        if not self._cacheable(request, cache):
+            LLM_REQUESTS.labels("backend").inc()
+            return {**await self._call(request), "cached": False}
+
+        key = request_key(request)
+        hit = await self.cache.get(key)
+        if hit is not None:
+            self.stats["cache_hits"] += 1
+            LLM_REQUESTS.labels("cache").inc()
+            return {**hit, "cached": True}
+        task = self._inflight.get(key)
+        if task is None:
+            LLM_REQUESTS.labels("backend").inc()
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, request))
+            # Reading the exception keeps asyncio quiet if every waiter was cancelled
+            task.add_done_callback(lambda t: (self._inflight.pop(key, None), t.cancelled() or t.exception()))
+        else:
+            self.stats["coalesced"] += 1
+            LLM_REQUESTS.labels("coalesced").inc()
+        # Shielded: one waiter giving up must not cancel the call for the others
+        return {**await asyncio.shield(task), "cached": False}
+
+    async def text(self, prompt: Optional[str] = None, **kwargs) -> str:
+        return (await self.complete(prompt, **kwargs))["text"]
+
+    async def stream(self, prompt: Optional[str] = None, cache: Optional[bool] = None, **kwargs) -> AsyncIterator[str]:
+        request = self.build_request(prompt, **kwargs)
+        cacheable = self._cacheable(request, cache)
+        key = request_key(request) if cacheable else None
+        if cacheable:
+            hit = await self.cache.get(key)
+            if hit is not None:
+                self.stats["cache_hits"] += 1
+                LLM_REQUESTS.labels("cache").inc()
+                yield hit["text"]
+                return
+        LLM_REQUESTS.labels("backend").inc()
+        if self.limiter is not None:
+            await self.limiter.acquire(estimate_tokens(request))
+        parts = []
+        async with self._slots:
+            self.stats["backend_calls"] += 1
+            async for chunk in self.backend.stream(request):
+                parts.append(chunk)
+                yield chunk
+        if cacheable:
+            await self.cache.put(key, {"text": "".join(parts), "model": request["model"], "usage": {}, "finish_reason": "stop"})
+
+    async def _fetch(self, key: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._call(request)
+        await self.cache.put(key, response)
+        return response
+
+    async def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self.limiter is not None:
+            await self.limiter.acquire(estimate_tokens(request))
+        if self.backend.supports_batch and "prompt" in request and self.batch_window > 0:
+            return await self._batched(request)
+        async with self._slots:
+            return await self._invoke(self.backend.complete, request)
+
+    async def _invoke(self, fn, arg):
+        self.stats["backend_calls"] += 1
+        started = time.perf_counter()
+        try:
+            result = await fn(arg)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started)
+        for response in result if isinstance(result, list) else [result]:
+            for kind in ("prompt_tokens", "completion_tokens"):
+                LLM_TOKENS.labels(kind.split("_")[0]).inc(response["usage"].get(kind, 0))
+        return result
+
+    async def _batched(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        group = json.dumps({k: v for k, v in request.items() if k != "prompt"}, sort_keys=True, default=str)
+        future = loop.create_future()
+        if group in self._batches:
+            pending, timer = self._batches[group]
+        else:
+            pending, timer = [], None
+            self._batches[group] = (pending, timer)
+        pending.append((request, future))
+        if len(pending) >= self.max_batch:
+            if timer is not None:
+                timer.cancel()
+            self._flush(group)
+        elif timer is None:
+            self._batches[group] = (pending, loop.call_later(self.batch_window, self._flush, group))
+        return await future
+
+    def _flush(self, group: str):
+        pending, _ = self._batches.pop(group, ([], None))
+        if pending:
+            task = asyncio.ensure_future(self._send_batch(pending))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, pending: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            async with self._slots:
+                responses = await self._invoke(self.backend.complete_batch, [request for request, _ in pending])
+            self.stats["batched_requests"] += len(pending)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(pending, responses):
+            if not future.done():
+                future.set_result(response)
+        if len(responses) < len(pending):
+            self.stats["errors"] += 1
+            error = LLMError(f"Batch of {len(pending)} prompts returned {len(responses)} completions")
+            for _, future in pending[len(responses):]:
+                if not future.done():
+                    future.set_exception(error)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "model": self.model,
+            "in_flight": len(self._inflight),
+            "cache": self.cache.get_stats(),
+            "token_budget": self.limiter.get_status() if self.limiter is not None else None,
+        }
+
+    async def close(self):
+        await self.backend.close()
+        await self.cache.close()
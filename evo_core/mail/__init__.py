@@ -0,0 +1,2 @@
+from .smtp import SMTPConnection, SMTPError
+from .mailer import Mailer, MailSpool, SMTPPool, build_message, parse_smtp_url
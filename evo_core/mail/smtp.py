@@ -0,0 +1,238 @@
+# evo_core/mail/smtp.py
+"""Minimal asyncio SMTP client (RFC 5321) for the outbound mail pool.
+
+One ``SMTPConnection`` stays open across many messages. With the server's
+PIPELINING extension, ``MAIL FROM``, every ``RCPT TO`` and ``DATA`` go out
+in a single write and their replies are read together, so a message costs
+two round trips instead of three plus one per recipient. Supports implicit
+TLS, STARTTLS and AUTH PLAIN/LOGIN; credentials are only sent over an
+encrypted connection unless ``allow_insecure_auth`` is set.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import base64
+import re
+import socket
+import ssl
+import time
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class SMTPError(Exception):
+    """A negative server reply (``code`` >= 400) or a broken connection (``code`` 0)."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}" if code else message)
+        self.code = code
+        self.message = message
+
+    @property
+    def transient(self) -> bool:
+        # 4xx replies and lost connections are worth retrying; 5xx are final
+        return self.code < 500
+
+
+@lru_cache(maxsize=None)
+def _local_fqdn() -> str:
+    # getfqdn can block on a DNS lookup; do it once per process, not per connection
+    return socket.getfqdn()
+
+
+def _dot_stuff(data: bytes) -> bytes:
+    data = re.sub(rb"(?<!\r)\n", b"\r\n", data)
+    if data.startswith(b"."):
+        data = b"." + data
+    data = data.replace(b"\r\n.", b"\r\n..")
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return data + b".\r\n"
+
+
+class SMTPConnection:
+    def __init__(
+        self,
+        host: str,
+        port: int = 25,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        starttls: bool = True,
+        timeout: float = 30.0,
+        local_hostname: Optional[str] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        allow_insecure_auth: bool = False,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.starttls = starttls
+        self.timeout = timeout
+        self.local_hostname = local_hostname or _local_fqdn()
+        self.ssl_context = ssl_context
+        self.allow_insecure_auth = allow_insecure_auth
+        self.encrypted = False
+        self.extensions: Dict[str, str] = {}
+        self.messages_sent = 0
+        self.connected_at = 0.0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        context = self.ssl_context or ssl.create_default_context()
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=context if self.use_tls else None),
+                self.timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise SMTPError(0, f"Cannot connect to {self.host}:{self.port}: {e}") from e
+        self.connected_at = time.monotonic()
+        self.messages_sent = 0
+        self.encrypted = self.use_tls
+        await self._expect(await self._reply(), 220)
+        await self._ehlo()
+        if self.starttls and not self.use_tls and "starttls" in self.extensions:
+            await self._command(b"STARTTLS", 220)
+            await self._writer.start_tls(context, server_hostname=self.host)
+            self.encrypted = True
+            await self._ehlo()
+        if self.username:
+            if not self.encrypted and not self.allow_insecure_auth:
+                # Includes a relay that stopped offering STARTTLS: never fall back to plaintext credentials
+                self._abort()
+                raise SMTPError(530, f"Refusing to authenticate to {self.host}:{self.port} without TLS")
+            await self._login()
+
+    async def _ehlo(self):
+        code, lines = await self._command(f"EHLO {self.local_hostname}".encode(), 250)
+        self.extensions = {}
+        for line in lines[1:]:
+            keyword, _, params = line.partition(" ")
+            self.extensions[keyword.lower()] = params
+
+    async def _login(self):
+        methods = self.extensions.get("auth", "").upper().split()
+        if "PLAIN" in methods or not methods:
+            token = base64.b64encode(f"\0{self.username}\0{self.password}".encode()).decode()
+            await self._command(f"AUTH PLAIN {token}".encode(), 235)
+        else:
+            await self._command(b"AUTH LOGIN", 334)
+            await self._command(base64.b64encode(self.username.encode()), 334)
+            await self._command(base64.b64encode(self.password.encode()), 235)
+
+    async def send(self, sender: str, recipients: List[str], data: bytes) -> Dict[str, Tuple[int, str]]:
+        """Deliver one message. Returns the recipients the server refused (the
+        message went to the rest); raises ``SMTPError`` if nobody accepted it
+        or the transaction failed."""
+        commands = [f"MAIL FROM:<{sender}>".encode()]
+        commands += [f"RCPT TO:<{rcpt}>".encode() for rcpt in recipients]
+        commands.append(b"DATA")
+        if "pipelining" in self.extensions:
+            self._write(b"".join(c + b"\r\n" for c in commands))
+            replies = [await self._reply() for _ in commands]
+        else:
+            replies = []
+            for command in commands:
+                self._write(command + b"\r\n")
+                replies.append(await self._reply())
+                if replies[-1][0] >= 400 and command.startswith(b"MAIL"):
+                    break
+
+        mail_reply, rcpt_replies = replies[0], replies[1:1 + len(recipients)]
+        refused = {rcpt: (code, " ".join(lines)) for rcpt, (code, lines) in zip(recipients, rcpt_replies) if code >= 300}
+        data_reply = replies[-1] if len(replies) == len(commands) else None
+        if mail_reply[0] >= 300 or len(refused) == len(recipients) or data_reply is None or data_reply[0] != 354:
+            if data_reply is not None and data_reply[0] == 354:
+                # Pipelined DATA was accepted though every recipient failed; abort it with an empty body
+                self._write(b".\r\n")
+                await self._reply()
+            if mail_reply[0] >= 300:
+                code, text = mail_reply[0], " ".join(mail_reply[1])
+            elif refused:
+                code, text = min(refused.values())
+            else:
+                code, text = data_reply[0], " ".join(data_reply[1])
+            if self.is_connected:
+                try:
+                    await self.reset()
+                except SMTPError:
+                    pass
+            raise SMTPError(code, text)
+
+        self._write(_dot_stuff(data))
+        await self._expect(await self._reply(), 250)
+        self.messages_sent += 1
+        return refused
+
+    async def reset(self):
+        await self._command(b"RSET", 250)
+
+    async def noop(self):
+        await self._command(b"NOOP", 250)
+
+    async def close(self):
+        if self._writer is None:
+            return
+        try:
+            if not self._writer.is_closing():
+                self._write(b"QUIT\r\n")
+                await asyncio.wait_for(self._reply(), 2.0)
+        except (SMTPError, OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            self._abort()
+
+    def _write(self, data: bytes):
+        if self._writer is None:
+            raise SMTPError(0, "Not connected")
+        self._writer.write(data)
+
+    async def _command(self, command: bytes, expected: int) -> Tuple[int, List[str]]:
+        self._write(command + b"\r\n")
+        return await self._expect(await self._reply(), expected)
+
+    async def _expect(self, reply: Tuple[int, List[str]], expected: int) -> Tuple[int, List[str]]:
+        if reply[0] != expected:
+            raise SMTPError(reply[0], " ".join(reply[1]))
+        return reply
+
+    async def _reply(self) -> Tuple[int, List[str]]:
+        if self._writer is None:
+            raise SMTPError(0, "Not connected")
+        lines = []
+        try:
+            await self._writer.drain()
+            while True:
+                line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+                if not line:
+                    raise SMTPError(0, "Connection closed by server")
+                text = line.decode("utf-8", "replace").rstrip("\r\n")
+                lines.append(text[4:])
+                if text[3:4] != "-":
+                    break
+            code = int(text[:3])
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            self._abort()
+            raise SMTPError(0, f"Connection to {self.host} failed: {e!r}") from e
+        except SMTPError:
+            self._abort()
+            raise
+        if code == 421:
+            # Service closing: the server hangs up after this reply
+            self._abort()
+        return code, lines
+
+    def _abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,307 @@
+# evo_core/memory/backends.py
+"""Storage backends for StateManager.
+
+A backend stores hashes of ``field -> bytes`` under a key, with a TTL per key.
+``create_backend`` picks one from the state URL:
+
+- ``redis://`` / ``rediss://`` / ``unix://`` - shared Redis (default)
+- ``memory://`` - in-process dicts, no network hop; single process only
+- ``sqlite:///path/to/state.db`` - local file, survives restarts
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+import asyncio
+import os
+import sqlite3
+import time
+
+import redis.asyncio as redis
+
+Write = Tuple[str, Dict[str, bytes], int]
+
+
+class StateBackend(ABC):
+    # Whether other processes share this store and can send invalidations
+    supports_invalidation = False
+
+    @abstractmethod
+    async def write(self, writes: List[Write], notify: Optional[str] = None):
+        """Atomically set fields and refresh TTLs; publish the keys on ``notify`` if supported."""
+
+    @abstractmethod
+    async def get(self, key: str, field: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def get_fields(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        ...
+
+    @abstractmethod
+    async def get_many(self, keys: List[str], field: str) -> List[Optional[bytes]]:
+        ...
+
+    @abstractmethod
+    async def get_all(self, key: str) -> Dict[str, bytes]:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str, notify: Optional[str] = None):
+        ...
+
+    async def listen(self, channel: str) -> AsyncIterator[List[str]]:
+        """Yield batches of invalidated keys published on ``channel``."""
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    async def close(self):
+        pass
+
+
+class RedisBackend(StateBackend):
+    supports_invalidation = True
+
+    def __init__(self, url: str):
+        self.redis = redis.from_url(url)
+
+    async def write(self, writes: List[Write], notify: Optional[str] = None):
+        # Field writes and TTL refresh go out as one MULTI/EXEC round-trip
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key, fields, ttl in writes:
+                pipe.hset(key, mapping=fields)
+                pipe.expire(key, ttl)
+            if notify:
+                pipe.publish(notify, "\n".join(key for key, _, _ in writes))
+            await pipe.execute()
+
+    async def get(self, key: str, field: str) -> Optional[bytes]:
+        return await self.redis.hget(key, field)
+
+    async def get_fields(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        return await self.redis.hmget(key, fields)
+
+    async def get_many(self, keys: List[str], field: str) -> List[Optional[bytes]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hget(key, field)
+            return await pipe.execute()
+
+    async def get_all(self, key: str) -> Dict[str, bytes]:
+        return {k.decode(): v for k, v in (await self.redis.hgetall(key)).items()}
+
+    async def delete(self, key: str, notify: Optional[str] = None):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if notify:
+                pipe.publish(notify, key)
+            await pipe.execute()
+
+    async def listen(self, channel: str) -> AsyncIterator[List[str]]:
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"].decode().split("\n")
+        finally:
+            await pubsub.aclose()
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class MemoryBackend(StateBackend):
+    """Hash-of-hashes in process memory.
+
+    Expiry uses a hashed timing wheel with one-second slots: a key is filed
+    under the slot of its deadline and checked when the wheel passes that
+    slot, so expiring keys costs nothing per read. Reads also check the
+    deadline, so an expired key is never returned between ticks.
+    """
+
+    def __init__(self, wheel_slots: int = 3600):
+        self._data: Dict[str, Dict[str, bytes]] = {}
+        self._expires: Dict[str, float] = {}
+        self._wheel: List[Set[str]] = [set() for _ in range(wheel_slots)]
+        self._tick = int(time.monotonic())
+
+    def _advance(self, now: float):
+        current = int(now)
+        if current <= self._tick:
+            return
+        # A full turn visits every slot; further ticks would only repeat them
+        for tick in range(self._tick + 1, min(current, self._tick + len(self._wheel)) + 1):
+            index = tick % len(self._wheel)
+            slot = self._wheel[index]
+            for key in list(slot):
+                deadline = self._expires.get(key)
+                if deadline is None or deadline <= now:
+                    slot.discard(key)
+                    self._drop(key)
+                elif self._slot(deadline) != index:
+                    # TTL was refreshed and the key is filed under another slot
+                    slot.discard(key)
+        self._tick = current
+
+    def _slot(self, deadline: float) -> int:
+        # File under the first whole second after the deadline so the key has
+        # always expired by the time the wheel reaches its slot
+        return (int(deadline) + 1) % len(self._wheel)
+
+    def _drop(self, key: str):
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+
+    def _live(self, key: str) -> Optional[Dict[str, bytes]]:
+        now = time.monotonic()
+        self._advance(now)
+        fields = self._data.get(key)
+        if fields is not None and self._expires.get(key, float("inf")) <= now:
+            self._drop(key)
+            return None
+        return fields
+
+    async def write(self, writes: List[Write], notify: Optional[str] = None):
+        now = time.monotonic()
+        self._advance(now)
+        for key, fields, ttl in writes:
+            self._data.setdefault(key, {}).update(fields)
+            deadline = now + ttl
+            self._expires[key] = deadline
+            # Keys whose deadline is more than one turn away stay filed and are re-checked
+            self._wheel[self._slot(deadline)].add(key)
+
+    async def get(self, key: str, field: str) -> Optional[bytes]:
+        fields = self._live(key)
+        return fields.get(field) if fields else None
+
+    async def get_fields(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        data = self._live(key) or {}
+        return [data.get(field) for field in fields]
+
+    async def get_many(self, keys: List[str], field: str) -> List[Optional[bytes]]:
+        return [await self.get(key, field) for key in keys]
+
+    async def get_all(self, key: str) -> Dict[str, bytes]:
+        return dict(self._live(key) or {})
+
+    async def delete(self, key: str, notify: Optional[str] = None):
+        self._drop(key)
+
+
+class SQLiteBackend(StateBackend):
+    """Persistent single-node store in a SQLite file (WAL mode).
+
+    Queries run on one dedicated thread so the event loop never blocks and
+    the connection is never shared between threads.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-state")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS state ("
+                "key TEXT NOT NULL, field TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (key, field))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS state_expires ON state (expires_at)")
+        return self._conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _write_sync(self, writes: List[Write]):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            for key, fields, ttl in writes:
+                deadline = now + ttl
+                conn.executemany(
+                    "INSERT INTO state (key, field, value, expires_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key, field) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                    [(key, field, value, deadline) for field, value in fields.items()],
+                )
+                conn.execute("UPDATE state SET expires_at = ? WHERE key = ?", (deadline, key))
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM state WHERE expires_at <= ?", (now,))
+
+    def _select_sync(self, sql: str, params: tuple) -> List[tuple]:
+        return self._connect().execute(sql, params).fetchall()
+
+    async def write(self, writes: List[Write], notify: Optional[str] = None):
+        await self._run(self._write_sync, writes)
+
+    async def get(self, key: str, field: str) -> Optional[bytes]:
+        rows = await self._run(
+            self._select_sync,
+            "SELECT value FROM state WHERE key = ? AND field = ? AND expires_at > ?",
+            (key, field, time.time()),
+        )
+        return rows[0][0] if rows else None
+
+    async def get_fields(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        data = await self.get_all(key)
+        return [data.get(field) for field in fields]
+
+    async def get_many(self, keys: List[str], field: str) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        rows = await self._run(
+            self._select_sync,
+            f"SELECT key, value FROM state WHERE key IN ({placeholders}) AND field = ? AND expires_at > ?",
+            (*keys, field, time.time()),
+        )
+        found = dict(rows)
+        return [found.get(key) for key in keys]
+
+    async def get_all(self, key: str) -> Dict[str, bytes]:
+        rows = await self._run(
+            self._select_sync,
+            "SELECT field, value FROM state WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        )
+        return dict(rows)
+
+    async def delete(self, key: str, notify: Optional[str] = None):
+        def _delete():
+            with self._connect() as conn:
+                conn.execute("DELETE FROM state WHERE key = ?", (key,))
+        await self._run(_delete)
+
+    async def close(self):
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(_close)
+        self._executor.shutdown(wait=True)
+
+
+def create_backend(url: str) -> StateBackend:
+    scheme = urlparse(url).scheme
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBackend(url)
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "sqlite":
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        path = url[len("sqlite:///"):]
+        if not path:
+            raise ValueError("sqlite state URL needs a file path, e.g. sqlite:///./kelnic_state.db")
+        return SQLiteBackend(path)
+    raise ValueError(f"Unsupported state backend URL: {url}")
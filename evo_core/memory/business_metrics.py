@@ -0,0 +1,175 @@
+# evo_core/memory/business_metrics.py
+from typing import Any, Dict, Optional
+import asyncio
+import time
+
+import structlog
+
+from evo_core.memory.sketches import HyperLogLog, QuantileSketch, SlidingHyperLogLog, SlidingWindowCounter
+
+logger = structlog.get_logger()
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# Sliding windows kept for revenue and payouts
+WINDOWS = {"1h": (HOUR, 60), "24h": (DAY, 96), "30d": (30 * DAY, 120)}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+class BusinessMetricsAggregator:
+    """Live business metrics fed by MessageBus events.
+
+    Every structure is fixed-size (see ``sketches``), so memory is bounded
+    and ``snapshot`` costs the same after ten events or ten million:
+    revenue and payout totals over sliding windows, approximate distinct
+    customers (all time and last 24h), order value quantiles, and per-agent
+    completion counts. State is checkpointed to the state store and restored
+    on start.
+    """
+
+    def __init__(self, bus=None, state=None, checkpoint_interval: float = 60.0, session_id: str = "metrics:business"):
+        self.state = state
+        self.checkpoint_interval = checkpoint_interval
+        self.session_id = session_id
+        self._checkpoint_task: Optional[asyncio.Task] = None
+        self.logger = logger.bind(component="BusinessMetricsAggregator")
+        self._reset()
+        if bus is not None:
+            self.subscribe(bus)
+
+    def _reset(self):
+        self.revenue = {name: SlidingWindowCounter(window, buckets) for name, (window, buckets) in WINDOWS.items()}
+        self.payouts = {name: SlidingWindowCounter(window, buckets) for name, (window, buckets) in WINDOWS.items()}
+        self.customers = HyperLogLog(12)
+        self.customers_24h = SlidingHyperLogLog(DAY, 24, 11)
+        self.order_values = QuantileSketch(0.01)
+        self.agent_completions: Dict[str, SlidingWindowCounter] = {}
+        self.totals = {"payments": 0, "revenue": 0.0, "payouts": 0, "payout_amount": 0.0, "agent_completions": 0}
+
+    def subscribe(self, bus):
+        bus.subscribe("payment_success", self.on_payment)
+        bus.subscribe("payout_executed", self.on_payout)
+        bus.subscribe("*.completed", self.on_agent_completed)
+
+    # -- event handlers (sync: O(1) work per event) -----------------------
+
+    def on_payment(self, event: Dict[str, Any]):
+        amount = float(event.get("amount") or 0.0)
+        now = time.time()
+        for counter in self.revenue.values():
+            counter.add(amount, now)
+        self.order_values.add(amount)
+        customer = event.get("email") or event.get("customer_id")
+        if customer:
+            self.customers.add(str(customer).lower())
+            self.customers_24h.add(str(customer).lower(), now)
+        self.totals["payments"] += 1
+        self.totals["revenue"] += amount
+
+    def on_payout(self, event: Dict[str, Any]):
+        amount = float(event.get("amount") or 0.0)
+        now = time.time()
+        for counter in self.payouts.values():
+            counter.add(amount, now)
+        self.totals["payouts"] += 1
+        self.totals["payout_amount"] += amount
+
+    def on_agent_completed(self, event: Dict[str, Any]):
+        agent = event.get("event_type", "").rsplit(".", 1)[0] or "unknown"
+        counter = self.agent_completions.get(agent)
+        if counter is None:
+            counter = self.agent_completions[agent] = SlidingWindowCounter(HOUR, 60)
+        counter.add()
+        self.totals["agent_completions"] += 1
+
+    # -- queries ----------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        revenue = {name: counter.totals(now) for name, counter in self.revenue.items()}
+        payouts = {name: counter.totals(now) for name, counter in self.payouts.items()}
+        orders_24h, revenue_24h = revenue["24h"]
+        return {
+            "revenue": {name: round(total, 2) for name, (_, total) in revenue.items()},
+            "orders": {name: count for name, (count, _) in revenue.items()},
+            "payouts": {name: round(total, 2) for name, (_, total) in payouts.items()},
+            "average_order_value_24h": round(revenue_24h / orders_24h, 2) if orders_24h else 0.0,
+            "order_value_quantiles": {
+                f"p{int(q * 100)}": _round(self.order_values.quantile(q)) for q in (0.5, 0.9, 0.99)
+            },
+            "distinct_customers": self.customers.count(),
+            "distinct_customers_24h": self.customers_24h.count(now),
+            "agent_completions_1h": {agent: counter.totals(now)[0] for agent, counter in self.agent_completions.items()},
+            "totals": dict(self.totals),
+        }
+
+    # -- checkpointing ----------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "revenue": {name: counter.to_dict() for name, counter in self.revenue.items()},
+            "payouts": {name: counter.to_dict() for name, counter in self.payouts.items()},
+            "customers": self.customers.to_dict(),
+            "customers_24h": self.customers_24h.to_dict(),
+            "order_values": self.order_values.to_dict(),
+            "agent_completions": {agent: counter.to_dict() for agent, counter in self.agent_completions.items()},
+            "totals": self.totals,
+        }
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.revenue = {name: SlidingWindowCounter.from_dict(d) for name, d in data["revenue"].items()}
+        self.payouts = {name: SlidingWindowCounter.from_dict(d) for name, d in data["payouts"].items()}
+        self.customers = HyperLogLog.from_dict(data["customers"])
+        self.customers_24h = SlidingHyperLogLog.from_dict(data["customers_24h"])
+        self.order_values = QuantileSketch.from_dict(data["order_values"])
+        self.agent_completions = {agent: SlidingWindowCounter.from_dict(d) for agent, d in data["agent_completions"].items()}
+        self.totals = dict(data["totals"])
+
+    async def checkpoint(self):
+        if self.state is None:
+            return
+        # Kept for a week so a restart after a long outage still finds it
+        await self.state.set_state(self.session_id, "aggregator", self.to_dict(), ttl=7 * 24 * 3600)
+
+    async def restore(self) -> bool:
+        if self.state is None:
+            return False
+        data = await self.state.get_state(self.session_id, "aggregator")
+        if not data:
+            return False
+        try:
+            self.load_dict(data)
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.error("Ignoring unreadable metrics checkpoint", error=str(e))
+            self._reset()
+            return False
+        self.logger.info("Business metrics restored", payments=self.totals["payments"])
+        return True
+
+    async def start(self):
+        """Restore the last checkpoint and checkpoint every ``checkpoint_interval`` seconds."""
+        await self.restore()
+        if self.state is not None and self._checkpoint_task is None:
+            self._checkpoint_task = asyncio.ensure_future(self._checkpoint_loop())
+
+    async def _checkpoint_loop(self):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                self.logger.error("Metrics checkpoint failed", error=str(e))
+
+    async def close(self):
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            try:
+                await self._checkpoint_task
+            except asyncio.CancelledError:
+                pass
+            self._checkpoint_task = None
+        await self.checkpoint()
@@ -0,0 +1,157 @@
+# evo_core/memory/codecs.py
+"""Value codecs and compression for StateManager.
+
+Encoded values are framed as ``[version][codec id][compression id][payload]``.
+Values written before framing existed are plain JSON text starting with
+``{`` and are still decoded. orjson, msgpack, zstandard and lz4 are
+optional and only imported when a codec or compression that needs one is
+first selected (or a value written with it is decoded); selecting one that
+is not installed raises ``ValueError``.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import importlib
+import json
+
+FORMAT_VERSION = 1
+LEGACY_JSON_PREFIX = b"{"
+
+_MODULES: Dict[str, Any] = {}
+
+
+def _import(module: str):
+    """Import an optional package once; ``None`` if it is not installed."""
+    if module not in _MODULES:
+        try:
+            _MODULES[module] = importlib.import_module(module)
+        except ImportError:
+            _MODULES[module] = None
+    return _MODULES[module]
+
+
+class _Plugin:
+    """A pair of functions built from an optional package. The package is
+    imported by ``load``, on first selection or first use; ``load`` binds the
+    functions on the instance so later calls go straight to them."""
+    _functions: Tuple[str, str] = ()
+
+    def __init__(self, name: str, plugin_id: int, build: Callable[[Any], Tuple[Callable, Callable]], requires: Optional[str] = None):
+        self.name = name
+        self.id = plugin_id
+        self.requires = requires
+        self.package = requires.partition(".")[0] if requires else None
+        self._build = build
+
+    @property
+    def available(self) -> bool:
+        return self.requires is None or _import(self.requires) is not None
+
+    def load(self):
+        if self._functions[0] not in self.__dict__:
+            module = _import(self.requires) if self.requires else None
+            for attr, function in zip(self._functions, self._build(module)):
+                setattr(self, attr, function)
+        return self
+
+
+class Codec(_Plugin):
+    _functions = ("dumps", "loads")
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.load().dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.load().loads(data)
+
+
+class Compression(_Plugin):
+    _functions = ("compress", "decompress")
+
+    def compress(self, data: bytes) -> bytes:
+        return self.load().compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.load().decompress(data)
+
+
+def _zstd(zstandard):
+    return zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec("json", 0, lambda _: (lambda obj: json.dumps(obj, separators=(",", ":")).encode(), json.loads)),
+    "orjson": Codec("orjson", 1, lambda orjson: (orjson.dumps, orjson.loads), requires="orjson"),
+    "msgpack": Codec(
+        "msgpack", 2,
+        lambda msgpack: (lambda obj: msgpack.packb(obj, use_bin_type=True), lambda data: msgpack.unpackb(data, raw=False)),
+        requires="msgpack",
+    ),
+}
+
+COMPRESSIONS: Dict[str, Compression] = {
+    "none": Compression("none", 0, lambda _: (lambda data: data, lambda data: data)),
+    "zstd": Compression("zstd", 1, _zstd, requires="zstandard"),
+    "lz4": Compression("lz4", 2, lambda lz4_frame: (lz4_frame.compress, lz4_frame.decompress), requires="lz4.frame"),
+}
+
+_CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+_COMPRESSIONS_BY_ID = {compression.id: compression for compression in COMPRESSIONS.values()}
+
+
+def get_codec(name: str) -> Codec:
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown codec: {name}")
+    if not codec.available:
+        raise ValueError(f"Codec {name} requires the '{codec.package}' package to be installed")
+    return codec.load()
+
+
+def get_compression(name: Optional[str]) -> Compression:
+    compression = COMPRESSIONS.get(name or "none")
+    if compression is None:
+        raise ValueError(f"Unknown compression: {name}")
+    if not compression.available:
+        raise ValueError(f"Compression {name} requires the '{compression.package}' package to be installed")
+    return compression.load()
+
+
+class ValueSerializer:
+    """Encodes state values with a global codec, optionally overridden per key,
+    compressing payloads larger than ``compress_threshold`` bytes."""
+
+    def __init__(
+        self,
+        codec: str = "json",
+        compression: Optional[str] = None,
+        compress_threshold: int = 1024,
+        key_codecs: Optional[Dict[str, str]] = None,
+    ):
+        self.codec = get_codec(codec)
+        self.compression = get_compression(compression)
+        self.compress_threshold = compress_threshold
+        self.key_codecs = {key: get_codec(name) for key, name in (key_codecs or {}).items()}
+
+    def encode(self, key: str, obj: Any) -> bytes:
+        codec = self.key_codecs.get(key, self.codec)
+        payload = codec.dumps(obj)
+        compression = _COMPRESSIONS_BY_ID[0]
+        if self.compression.id and len(payload) > self.compress_threshold:
+            compressed = self.compression.compress(payload)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        return bytes((FORMAT_VERSION, codec.id, compression.id)) + payload
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        if isinstance(data, str):
+            data = data.encode()
+        if data[:1] == LEGACY_JSON_PREFIX:
+            return json.loads(data)
+        version, codec_id, compression_id = data[0], data[1], data[2]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported state format version: {version}")
+        codec = _CODECS_BY_ID[codec_id]
+        compression = _COMPRESSIONS_BY_ID[compression_id]
+        if not codec.available or not compression.available:
+            raise ValueError(f"Missing optional package for codec {codec.name} / compression {compression.name}")
+        return codec.loads(compression.decompress(data[3:]))
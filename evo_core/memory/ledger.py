@@ -0,0 +1,341 @@
+# evo_core/memory/ledger.py
+"""Append-only double-entry journal with group commit.
+
+Entries are queued by ``record`` and a single writer task commits them in
+batches: the journal rows and the per-account balance deltas of a whole
+batch go into one transaction, so the cost of a commit (an fsync on SQLite)
+is shared by every entry in it. Balances are kept materialized in the
+``account_balances`` table and mirrored in memory, so reading one is a dict
+lookup instead of a journal scan.
+
+Entries recorded with an ``idempotency_key`` are booked at most once: keys
+are stored in ``journal_idempotency`` in the same transaction as the entry,
+and a repeated key is skipped, so re-delivered events (e.g. a resumed
+payout run re-publishing a chunk) do not double-book.
+
+A batch whose commit fails on a transient database error (lost connection,
+locked SQLite file, ...) is retried with capped exponential backoff; its
+futures stay pending until it lands, so ``flush`` still means committed.
+Any other error is taken to be caused by the data: the batch is retried one
+entry at a time and only the offending entries fail.
+
+The URL defaults to ``LEDGER_URL``, then ``DATABASE_URL``. Plain
+``sqlite:///`` and ``postgresql://`` URLs are mapped to their async drivers
+(aiosqlite, asyncpg).
+"""
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import os
+
+import structlog
+from sqlalchemy import BigInteger, Column, DateTime, Integer, JSON, MetaData, String, Table, select
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+logger = structlog.get_logger()
+
+metadata = MetaData()
+
+journal_entries = Table(
+    "journal_entries",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("entry_date", DateTime, nullable=False),
+    Column("entry_type", String(64), nullable=False),
+    Column("debit_account", String(64), nullable=False, index=True),
+    Column("credit_account", String(64), nullable=False, index=True),
+    Column("amount_cents", BigInteger, nullable=False),
+    # Where the money came from (payment provider, bank, ...), for reporting
+    Column("source", String(64), nullable=True),
+    Column("details", JSON, nullable=False),
+)
+
+account_balances = Table(
+    "account_balances",
+    metadata,
+    Column("account", String(64), primary_key=True),
+    # Debits minus credits, in cents
+    Column("balance_cents", BigInteger, nullable=False),
+    Column("entry_count", BigInteger, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+journal_idempotency = Table(
+    "journal_idempotency",
+    metadata,
+    Column("key", String(128), primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+)
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+_CENT = Decimal("0.01")
+
+
+def to_cents(amount: Any) -> int:
+    return int((Decimal(str(amount)).quantize(_CENT, rounding=ROUND_HALF_UP) * 100))
+
+
+def from_cents(cents: int) -> Decimal:
+    return (Decimal(cents) / 100).quantize(_CENT)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Database errors worth retrying as-is, as opposed to ones caused by the rows."""
+    if isinstance(error, (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+def async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+class Ledger:
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_batch: int = 5000,
+        max_delay: float = 0.002,
+        retry_base: float = 0.05,
+        retry_max: float = 30.0,
+    ):
+        """``max_batch`` caps the entries per transaction. After the first
+        entry arrives the writer waits up to ``max_delay`` seconds for more to
+        join the batch; under load the queue already holds a batch and the
+        writer never waits. Failed commits are retried after ``retry_base``
+        seconds, doubling up to ``retry_max``."""
+        self.url = url or os.getenv("LEDGER_URL") or os.getenv("DATABASE_URL", "sqlite:///./kelnic.db")
+        self.engine: AsyncEngine = create_async_engine(async_url(self.url))
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._queue: "asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]" = asyncio.Queue()
+        self._balances: Dict[str, int] = {}
+        self._started: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.stats = {"entries": 0, "commits": 0, "failed": 0, "duplicates": 0, "retries": 0}
+        self.logger = logger.bind(component="Ledger")
+
+    async def start(self):
+        """Create the tables and load balances; called automatically on first use."""
+        if self._started is None:
+            self._started = asyncio.ensure_future(self._load())
+        try:
+            await self._started
+        except Exception:
+            # Let the next call retry instead of caching the failure
+            self._started = None
+            raise
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._write_loop())
+
+    async def _load(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            rows = await conn.execute(select(account_balances.c.account, account_balances.c.balance_cents))
+            self._balances = {account: cents for account, cents in rows}
+
+    def record(
+        self,
+        debit_account: str,
+        credit_account: str,
+        amount: Any,
+        entry_type: str,
+        details: Optional[Dict[str, Any]] = None,
+        entry_date: Optional[datetime] = None,
+        source: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> asyncio.Future:
+        """Queue one journal entry; the returned future resolves once it is committed.
+
+        An entry whose ``idempotency_key`` was already booked is skipped (its
+        future still resolves).
+
+        Safe to call from synchronous code running on the event loop (e.g. a
+        sync message bus handler); callers that need durability await the future.
+        """
+        cents = to_cents(amount)
+        if cents <= 0:
+            raise ValueError(f"Journal amount must be positive, got {amount}")
+        if debit_account == credit_account:
+            raise ValueError("Debit and credit accounts must differ")
+        future = asyncio.get_running_loop().create_future()
+        # Failures are logged by the writer; don't warn about futures nobody awaited
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._queue.put_nowait(({
+            "entry_date": entry_date or datetime.utcnow(),
+            "entry_type": entry_type,
+            "debit_account": debit_account,
+            "credit_account": credit_account,
+            "amount_cents": cents,
+            "source": source,
+            "details": details or {},
+            "idempotency_key": idempotency_key,
+        }, future))
+        if self._writer is None:
+            asyncio.ensure_future(self.start()).add_done_callback(self._log_start_failure)
+        return future
+
+    def _log_start_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error("Ledger failed to start", error=str(task.exception()))
+
+    async def _next_batch(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        if self._queue.empty() and self.max_delay > 0:
+            await asyncio.sleep(self.max_delay)
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write_loop(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        attempt = 0
+        while True:
+            try:
+                deltas, duplicates = await self._commit([row for row, _ in batch])
+                break
+            except Exception as e:
+                if is_transient(e):
+                    # The transaction rolled back as a whole, so the same batch can go again
+                    delay = min(self.retry_base * 2 ** attempt, self.retry_max)
+                    attempt += 1
+                    self.stats["retries"] += 1
+                    self.logger.warning("Journal commit failed, retrying", entries=len(batch),
+                                        attempt=attempt, delay=delay, error=str(e))
+                    await asyncio.sleep(delay)
+                    continue
+                if len(batch) > 1:
+                    # Don't let one bad entry take the rest of the batch with it
+                    for item in batch:
+                        await self._commit_batch([item])
+                    return
+                self.stats["failed"] += 1
+                self.logger.error("Journal entry rejected", entry_type=batch[0][0]["entry_type"], error=str(e))
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+        for account, (delta, _) in deltas.items():
+            self._balances[account] = self._balances.get(account, 0) + delta
+        self.stats["entries"] += len(batch) - duplicates
+        self.stats["duplicates"] += duplicates
+        self.stats["commits"] += 1
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def _commit(self, rows: List[Dict[str, Any]]) -> Tuple[Dict[str, Tuple[int, int]], int]:
+        """Write one batch; returns the balance deltas and how many entries were skipped as duplicates."""
+        async with self.engine.begin() as conn:
+            unique = await self._drop_duplicates(conn, rows)
+            if not unique:
+                return {}, len(rows)
+            return await self._write_rows(conn, unique), len(rows) - len(unique)
+
+    async def _drop_duplicates(self, conn, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        keys = [row["idempotency_key"] for row in rows if row["idempotency_key"] is not None]
+        if not keys:
+            return [{k: v for k, v in row.items() if k != "idempotency_key"} for row in rows]
+        seen = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            result = await conn.execute(select(journal_idempotency.c.key).where(journal_idempotency.c.key.in_(chunk)))
+            seen.update(key for key, in result)
+        unique, new_keys = [], []
+        for row in rows:
+            row = dict(row)
+            key = row.pop("idempotency_key")
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append({"key": key, "created_at": row["entry_date"]})
+            unique.append(row)
+        if new_keys:
+            await conn.execute(journal_idempotency.insert(), new_keys)
+        return unique
+
+    async def _write_rows(self, conn, rows: List[Dict[str, Any]]) -> Dict[str, Tuple[int, int]]:
+        # Net the whole batch per account so each balance row is written once
+        deltas: Dict[str, Tuple[int, int]] = {}
+        for row in rows:
+            for account, sign in ((row["debit_account"], 1), (row["credit_account"], -1)):
+                delta, count = deltas.get(account, (0, 0))
+                deltas[account] = (delta + sign * row["amount_cents"], count + 1)
+
+        now = datetime.utcnow()
+        await conn.execute(journal_entries.insert(), rows)
+        insert = self._insert(account_balances)
+        upsert = insert.on_conflict_do_update(
+            index_elements=[account_balances.c.account],
+            set_={
+                "balance_cents": account_balances.c.balance_cents + insert.excluded.balance_cents,
+                "entry_count": account_balances.c.entry_count + insert.excluded.entry_count,
+                "updated_at": insert.excluded.updated_at,
+            },
+        )
+        await conn.execute(upsert, [
+            {"account": account, "balance_cents": delta, "entry_count": count, "updated_at": now}
+            for account, (delta, count) in deltas.items()
+        ])
+        return deltas
+
+    def _insert(self, table: Table):
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif self.engine.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise ValueError(f"Unsupported ledger database: {self.engine.dialect.name}")
+        return insert(table)
+
+    async def flush(self):
+        """Wait until every queued entry has been committed (or failed)."""
+        if self._started is None and self._queue.empty():
+            return
+        await self.start()
+        await self._queue.join()
+
+    async def get_balance(self, account: str) -> Decimal:
+        """Debits minus credits for ``account``, from the materialized balances."""
+        await self.start()
+        return from_cents(self._balances.get(account, 0))
+
+    async def get_trial_balance(self) -> Dict[str, Any]:
+        await self.start()
+        balances = {account: from_cents(cents) for account, cents in sorted(self._balances.items())}
+        # Every entry debits and credits the same amount, so this is zero unless the books are broken
+        return {"accounts": balances, "total": from_cents(sum(self._balances.values()))}
+
+    async def close(self, timeout: float = 30.0):
+        """Flush and stop; entries still uncommitted after ``timeout`` seconds
+        (the database is down) are logged and dropped."""
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.error("Ledger closed with uncommitted entries", queued=self._queue.qsize(),
+                              retries=self.stats["retries"])
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+        await self.engine.dispose()
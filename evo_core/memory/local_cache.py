@@ -0,0 +1,92 @@
+# evo_core/memory/local_cache.py
+from typing import Dict, Any, Optional, Hashable
+from collections import OrderedDict
+import time
+
+
+class LocalCache:
+    """Size-bounded LRU with a per-entry TTL.
+
+    ``generation`` hands out a token from a counter that every ``invalidate``
+    advances, so a reader that started a fetch before an invalidation can tell
+    that its result is stale and must not be stored (see ``generation``/``put``).
+    Invalidation times are remembered for at most ``max_entries`` keys; past
+    that the oldest are forgotten and fetches begun before them are treated as
+    stale, which costs a cache fill but never serves an old value.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._clock = 0
+        # key -> clock value at its last invalidation, oldest first
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        # Tokens older than this may predate a forgotten invalidation
+        self._floor = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like ``get`` but without touching LRU order or stats."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def generation(self, key: Hashable) -> int:
+        """Token to pass to ``put``; call before fetching the value of ``key``."""
+        return self._clock
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> bool:
+        """Store ``value``; if ``generation`` is given and the key was invalidated since, skip it."""
+        if generation is not None and (generation < self._floor or self._invalidated.get(key, -1) >= generation):
+            return False
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return True
+
+    def invalidate(self, key: Hashable):
+        if self._entries.pop(key, None) is not None:
+            self.stats["invalidations"] += 1
+        self._invalidated[key] = self._clock
+        self._invalidated.move_to_end(key)
+        self._clock += 1
+        while len(self._invalidated) > self.max_entries:
+            _, stamp = self._invalidated.popitem(last=False)
+            self._floor = stamp + 1
+
+    def clear(self):
+        self.stats["invalidations"] += len(self._entries)
+        self._entries.clear()
+        self._invalidated.clear()
+        self._clock += 1
+        self._floor = self._clock
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,323 @@
+# evo_core/memory/reporting.py
+"""Columnar, in-memory copy of the journal for financial reports.
+
+``ColumnarJournal`` keeps one NumPy array per field (dates, debit and credit
+account codes, amounts in cents, source codes) with strings
+dictionary-encoded, so a report is a masked ``np.bincount`` over a few
+arrays instead of a loop over rows. ``ReportingEngine`` keeps it in sync
+with a ``Ledger`` by reading only entries newer than the last one seen, and
+snapshots the columns to ``.npy`` files that are memory-mapped on the next
+start, so a restart only reads what was journaled since the snapshot.
+"""
+from datetime import date
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import os
+
+import numpy as np
+import structlog
+from sqlalchemy import select
+
+from evo_core.memory.ledger import Ledger, journal_entries
+
+logger = structlog.get_logger()
+
+# Account -> category; other accounts are classified by name (see account_category)
+ACCOUNT_CATEGORIES = {
+    "cash": "asset",
+    "revenue": "income",
+    "operating_expense": "expense",
+    "owner_equity": "equity",
+}
+
+PERIODS = ("day", "month", "quarter", "year")
+
+_COLUMNS = {
+    "ids": np.int64,
+    "days": np.int32,       # days since 1970-01-01
+    "months": np.int32,     # months since 1970-01
+    "debit": np.int32,      # index into accounts
+    "credit": np.int32,
+    "amount": np.int64,     # cents
+    "source": np.int32,     # index into sources
+}
+
+
+def account_category(account: str) -> str:
+    if account in ACCOUNT_CATEGORIES:
+        return ACCOUNT_CATEGORIES[account]
+    for suffix, category in (("expense", "expense"), ("cost", "expense"), ("revenue", "income"), ("income", "income")):
+        if account.endswith(suffix):
+            return category
+    return "asset"
+
+
+def _day_number(value) -> int:
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+class ColumnarJournal:
+    def __init__(self, capacity: int = 1 << 16):
+        self.size = 0
+        self.last_id = 0
+        self.accounts: List[str] = []
+        self.sources: List[str] = [""]
+        self._account_codes: Dict[str, int] = {}
+        self._source_codes: Dict[Optional[str], int] = {None: 0, "": 0}
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in _COLUMNS.items()}
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name][:self.size]
+
+    def _code(self, value: str, codes: Dict, names: List[str]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        capacity = len(self._columns["ids"])
+        # Memory-mapped snapshot columns are read-only; copying them here is the first write
+        if needed <= capacity and self._columns["ids"].flags.writeable:
+            return
+        capacity = max(needed, capacity * 2, 1 << 16)
+        for name, array in self._columns.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self._columns[name] = grown
+
+    def append(self, rows: List[tuple]):
+        """Append ``(id, entry_date, debit_account, credit_account, amount_cents, source)`` rows in id order."""
+        if not rows:
+            return
+        ids, dates, debits, credits, amounts, sources = zip(*rows)
+        self._reserve(len(rows))
+        start, end = self.size, self.size + len(rows)
+        days = np.array(dates, dtype="datetime64[D]")
+        columns = self._columns
+        columns["ids"][start:end] = ids
+        columns["days"][start:end] = days.astype(np.int64)
+        columns["months"][start:end] = days.astype("datetime64[M]").astype(np.int64)
+        columns["debit"][start:end] = [self._code(a, self._account_codes, self.accounts) for a in debits]
+        columns["credit"][start:end] = [self._code(a, self._account_codes, self.accounts) for a in credits]
+        columns["amount"][start:end] = amounts
+        columns["source"][start:end] = [self._code(s, self._source_codes, self.sources) for s in sources]
+        self.size = end
+        self.last_id = int(ids[-1])
+
+    # -- reports ---------------------------------------------------------
+
+    def _mask(self, start: Optional[date], end: Optional[date]) -> Optional[np.ndarray]:
+        """Rows with start <= date < end, or None for all rows."""
+        if start is None and end is None:
+            return None
+        days = self.column("days")
+        mask = np.ones(self.size, dtype=bool)
+        if start is not None:
+            mask &= days >= _day_number(start)
+        if end is not None:
+            mask &= days < _day_number(end)
+        return mask
+
+    def _periods(self, period: str, mask: Optional[np.ndarray]):
+        """Period index per selected row (0-based) and the period labels."""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}, expected one of {PERIODS}")
+        raw = self.column("days" if period == "day" else "months")
+        if mask is not None:
+            raw = raw[mask]
+        if period == "quarter":
+            raw = raw // 3
+        elif period == "year":
+            raw = raw // 12
+        if not len(raw):
+            return raw, []
+        first = int(raw.min())
+        index = raw - first
+        labels = [self._period_label(period, first + i) for i in range(int(index.max()) + 1)]
+        return index, labels
+
+    @staticmethod
+    def _period_label(period: str, value: int) -> str:
+        if period == "day":
+            return str(np.datetime64(value, "D"))
+        if period == "month":
+            return str(np.datetime64(value, "M"))
+        if period == "quarter":
+            return f"{1970 + value // 4}-Q{value % 4 + 1}"
+        return str(1970 + value)
+
+    def _selected(self, name: str, mask: Optional[np.ndarray]) -> np.ndarray:
+        column = self.column(name)
+        return column if mask is None else column[mask]
+
+    def _net_by_period_account(self, period: str, start, end):
+        """Debits minus credits in cents, shape (periods, accounts)."""
+        mask = self._mask(start, end)
+        index, labels = self._periods(period, mask)
+        n_accounts = len(self.accounts)
+        amount = self._selected("amount", mask)
+        size = len(labels) * n_accounts
+        net = (
+            np.bincount(index * n_accounts + self._selected("debit", mask), weights=amount, minlength=size)
+            - np.bincount(index * n_accounts + self._selected("credit", mask), weights=amount, minlength=size)
+        )
+        return net.reshape(len(labels), n_accounts), labels
+
+    def profit_and_loss(self, period: str = "month", start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, Any]:
+        net, labels = self._net_by_period_account(period, start, end)
+        categories = [account_category(account) for account in self.accounts]
+        income_cols = [i for i, c in enumerate(categories) if c == "income"]
+        expense_cols = [i for i, c in enumerate(categories) if c == "expense"]
+        # Income accounts are credit-normal, so their net debit is negated
+        income = -net[:, income_cols]
+        expenses = net[:, expense_cols]
+        total_income = income.sum(axis=1)
+        total_expenses = expenses.sum(axis=1)
+        return {
+            "period": period,
+            "periods": [
+                {
+                    "period": label,
+                    "income": {self.accounts[c]: _money(income[row, j]) for j, c in enumerate(income_cols)},
+                    "expenses": {self.accounts[c]: _money(expenses[row, j]) for j, c in enumerate(expense_cols)},
+                    "total_income": _money(total_income[row]),
+                    "total_expenses": _money(total_expenses[row]),
+                    "net_income": _money(total_income[row] - total_expenses[row]),
+                }
+                for row, label in enumerate(labels)
+            ],
+            "net_income": _money(total_income.sum() - total_expenses.sum()),
+        }
+
+    def cash_flow(self, period: str = "month", start: Optional[date] = None, end: Optional[date] = None, account: str = "cash") -> Dict[str, Any]:
+        code = self._account_codes.get(account)
+        if code is None:
+            return {"period": period, "account": account, "periods": [], "net_change": 0.0}
+        mask = self._mask(start, end)
+        index, labels = self._periods(period, mask)
+        amount = self._selected("amount", mask)
+        inflow = np.bincount(index, weights=amount * (self._selected("debit", mask) == code), minlength=len(labels))
+        outflow = np.bincount(index, weights=amount * (self._selected("credit", mask) == code), minlength=len(labels))
+        return {
+            "period": period,
+            "account": account,
+            "periods": [
+                {"period": label, "inflow": _money(inflow[i]), "outflow": _money(outflow[i]), "net": _money(inflow[i] - outflow[i])}
+                for i, label in enumerate(labels)
+            ],
+            "net_change": _money(inflow.sum() - outflow.sum()),
+        }
+
+    def revenue_by_source(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, float]:
+        # Lookup table indexed by account code instead of np.isin over every row
+        is_income = np.array([account_category(account) == "income" for account in self.accounts], dtype=bool)
+        mask = self._mask(start, end)
+        revenue = is_income[self._selected("credit", mask)]
+        totals = np.bincount(self._selected("source", mask)[revenue], weights=self._selected("amount", mask)[revenue], minlength=len(self.sources))
+        ranked = np.argsort(-totals)
+        return {self.sources[i] or "unknown": _money(totals[i]) for i in ranked if totals[i]}
+
+    # -- snapshots -------------------------------------------------------
+
+    def save(self, directory: str):
+        """Write columns as .npy files plus a meta.json; meta is replaced last so a
+        crash mid-save leaves the previous snapshot readable."""
+        os.makedirs(directory, exist_ok=True)
+        for name in _COLUMNS:
+            tmp = os.path.join(directory, f"{name}.tmp.npy")
+            np.save(tmp, self.column(name))
+            os.replace(tmp, os.path.join(directory, f"{name}.{self.last_id}.npy"))
+        meta = {"size": self.size, "last_id": self.last_id, "accounts": self.accounts, "sources": self.sources}
+        tmp = os.path.join(directory, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+        # Column files of older snapshots are no longer referenced
+        for filename in os.listdir(directory):
+            if filename.endswith(".npy") and not filename.endswith(f".{self.last_id}.npy"):
+                os.remove(os.path.join(directory, filename))
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["ColumnarJournal"]:
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        journal = cls(capacity=0)
+        for name in _COLUMNS:
+            # Memory-mapped: pages are read on demand and shared with the page cache
+            journal._columns[name] = np.load(os.path.join(directory, f"{name}.{meta['last_id']}.npy"), mmap_mode="r")
+        journal.size = meta["size"]
+        journal.last_id = meta["last_id"]
+        journal.accounts = meta["accounts"]
+        journal.sources = meta["sources"]
+        journal._account_codes = {account: i for i, account in enumerate(journal.accounts)}
+        journal._source_codes = {None: 0, **{source: i for i, source in enumerate(journal.sources)}}
+        return journal
+
+
+def _money(cents) -> float:
+    return round(float(cents) / 100, 2)
+
+
+class ReportingEngine:
+    def __init__(self, ledger: Ledger, snapshot_dir: Optional[str] = None, chunk_size: int = 100000, snapshot_every: int = 500000):
+        """``snapshot_dir`` enables snapshots, written after a refresh once
+        ``snapshot_every`` new entries have been read since the last one."""
+        self.ledger = ledger
+        self.snapshot_dir = snapshot_dir
+        self.chunk_size = chunk_size
+        self.snapshot_every = snapshot_every
+        self.journal = (ColumnarJournal.load(snapshot_dir) if snapshot_dir else None) or ColumnarJournal()
+        self._snapshot_id = self.journal.last_id
+        self._lock = asyncio.Lock()
+        self.logger = logger.bind(component="ReportingEngine")
+
+    async def refresh(self) -> int:
+        """Read journal entries newer than the last one loaded; returns how many."""
+        async with self._lock:
+            await self.ledger.start()
+            loaded = 0
+            columns = journal_entries.c
+            while True:
+                query = (
+                    select(columns.id, columns.entry_date, columns.debit_account, columns.credit_account, columns.amount_cents, columns.source)
+                    .where(columns.id > self.journal.last_id)
+                    .order_by(columns.id)
+                    .limit(self.chunk_size)
+                )
+                async with self.ledger.engine.connect() as conn:
+                    rows = (await conn.execute(query)).all()
+                self.journal.append(rows)
+                loaded += len(rows)
+                if len(rows) < self.chunk_size:
+                    break
+            if self.snapshot_dir and self.journal.last_id - self._snapshot_id >= self.snapshot_every:
+                await asyncio.to_thread(self.journal.save, self.snapshot_dir)
+                self._snapshot_id = self.journal.last_id
+            if loaded:
+                self.logger.info("Journal refreshed", entries=loaded, total=self.journal.size)
+            return loaded
+
+    async def snapshot(self):
+        if self.snapshot_dir:
+            async with self._lock:
+                await asyncio.to_thread(self.journal.save, self.snapshot_dir)
+                self._snapshot_id = self.journal.last_id
+
+    async def profit_and_loss(self, period: str = "month", start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, Any]:
+        await self.refresh()
+        return self.journal.profit_and_loss(period, start, end)
+
+    async def cash_flow(self, period: str = "month", start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, Any]:
+        await self.refresh()
+        return self.journal.cash_flow(period, start, end)
+
+    async def revenue_by_source(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, float]:
+        await self.refresh()
+        return self.journal.revenue_by_source(start, end)
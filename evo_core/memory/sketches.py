@@ -0,0 +1,245 @@
+# evo_core/memory/sketches.py
+"""Bounded-memory summaries for streaming metrics.
+
+Each structure has a fixed size chosen at construction, so memory and
+query cost do not grow with the number of events, and each serializes to a
+JSON-friendly dict (``to_dict`` / ``from_dict``) for checkpointing.
+"""
+from typing import Any, Dict, Optional, Tuple
+import base64
+import hashlib
+import math
+import time
+
+import numpy as np
+
+
+class SlidingWindowCounter:
+    """Event count and value sum over the last ``window`` seconds.
+
+    The window is split into ``buckets`` slots; totals are kept as running
+    sums and expired slots are subtracted as time moves on, so reading the
+    totals touches at most ``buckets`` slots however many events arrived.
+    Resolution is one slot: an event leaves the window up to
+    ``window / buckets`` seconds late.
+    """
+
+    def __init__(self, window: float, buckets: int = 60):
+        self.window = window
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.sums = [0.0] * buckets
+        self.count = 0
+        self.sum = 0.0
+        self.head = int(time.time() // self.width)
+
+    def _advance(self, now: float):
+        current = int(now // self.width)
+        if current <= self.head:
+            return
+        n = len(self.counts)
+        for step in range(1, min(current - self.head, n) + 1):
+            slot = (self.head + step) % n
+            self.count -= self.counts[slot]
+            self.sum -= self.sums[slot]
+            self.counts[slot] = 0
+            self.sums[slot] = 0.0
+        if self.count == 0:
+            # Clear float drift from repeated add/subtract
+            self.sum = 0.0
+        self.head = current
+
+    def add(self, value: float = 0.0, now: Optional[float] = None):
+        self._advance(now or time.time())
+        slot = self.head % len(self.counts)
+        self.counts[slot] += 1
+        self.sums[slot] += value
+        self.count += 1
+        self.sum += value
+
+    def totals(self, now: Optional[float] = None) -> Tuple[int, float]:
+        self._advance(now or time.time())
+        return self.count, self.sum
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"window": self.window, "head": self.head, "counts": self.counts, "sums": self.sums}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SlidingWindowCounter":
+        counter = cls(data["window"], len(data["counts"]))
+        counter.head = data["head"]
+        counter.counts = list(data["counts"])
+        counter.sums = list(data["sums"])
+        counter.count = sum(counter.counts)
+        counter.sum = sum(counter.sums)
+        return counter
+
+
+def _hash64(item: str) -> int:
+    # Stable across processes (unlike hash()), so checkpoints stay valid after a restart
+    return int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Approximate distinct count in ``2 ** p`` bytes (standard error ~1.04 / sqrt(2 ** p))."""
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, item: str):
+        h = _hash64(item)
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    @classmethod
+    def estimate(cls, registers: np.ndarray) -> int:
+        m = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    def count(self) -> int:
+        return self.estimate(self.registers)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p": self.p, "registers": base64.b64encode(self.registers.tobytes()).decode()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(data["p"])
+        sketch.registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8).copy()
+        return sketch
+
+
+class SlidingHyperLogLog:
+    """Distinct count over the last ``window`` seconds: one small HyperLogLog
+    per bucket, merged (element-wise max) when queried."""
+
+    def __init__(self, window: float, buckets: int = 24, p: int = 10):
+        self.window = window
+        self.width = window / buckets
+        self.p = p
+        self.registers = np.zeros((buckets, 1 << p), dtype=np.uint8)
+        self.head = int(time.time() // self.width)
+        self._hll = HyperLogLog(p)
+
+    def _advance(self, now: float):
+        current = int(now // self.width)
+        if current <= self.head:
+            return
+        n = len(self.registers)
+        for step in range(1, min(current - self.head, n) + 1):
+            self.registers[(self.head + step) % n] = 0
+        self.head = current
+
+    def add(self, item: str, now: Optional[float] = None):
+        self._advance(now or time.time())
+        self._hll.registers = self.registers[self.head % len(self.registers)]
+        self._hll.add(item)
+
+    def count(self, now: Optional[float] = None) -> int:
+        self._advance(now or time.time())
+        return HyperLogLog.estimate(self.registers.max(axis=0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "p": self.p,
+            "head": self.head,
+            "registers": base64.b64encode(self.registers.tobytes()).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SlidingHyperLogLog":
+        raw = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8)
+        buckets = len(raw) >> data["p"]
+        sketch = cls(data["window"], buckets, data["p"])
+        sketch.registers = raw.reshape(buckets, 1 << data["p"]).copy()
+        sketch.head = data["head"]
+        return sketch
+
+
+class QuantileSketch:
+    """Quantiles with bounded relative error (a DDSketch).
+
+    Positive values fall into logarithmic buckets ``gamma ** (k-1) < v <= gamma ** k``
+    with ``gamma = (1 + a) / (1 - a)``, so any quantile is returned within
+    ``relative_accuracy`` of the true value. Past ``max_buckets`` the lowest
+    buckets are merged, which only affects the smallest quantiles. Values
+    <= 0 are counted in a single zero bucket.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            lowest, second = sorted(self.buckets)[:2]
+            self.buckets[second] += self.buckets.pop(lowest)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.buckets = {int(k): v for k, v in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
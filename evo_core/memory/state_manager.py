@@ -1,49 +1,322 @@
 # evo_core/memory/state_manager.py
-import json
-import redis.asyncio as redis
-from typing import Dict, Any, Optional
+import asyncio
+import os
+from typing import Dict, Any, Optional, List, Iterable, Tuple
 from datetime import datetime
 import structlog
+from evo_core.memory.local_cache import LocalCache
+from evo_core.memory.codecs import ValueSerializer
+from evo_core.memory.backends import StateBackend, create_backend
+from evo_core.telemetry import REGISTRY, timed
 
 logger = structlog.get_logger()
 
+STATE_SECONDS = REGISTRY.histogram("kelnic_state_seconds", "StateManager call latency", ("op",))
+
 class StateManager:
-    def __init__(self, redis_url: str = "redis://localhost:6379/0"):
-        self.redis = redis.from_url(redis_url, decode_responses=True)
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        write_behind: float = 0.0,
+        cache_size: int = 0,
+        cache_ttl: float = 5.0,
+        invalidation_channel: str = "kelnic:state:invalidate",
+        codec: str = "json",
+        compression: Optional[str] = None,
+        compress_threshold: int = 1024,
+        key_codecs: Optional[Dict[str, str]] = None,
+    ):
+        """``url`` selects the backend by scheme (redis://, memory://, sqlite:///path)
+        and defaults to ``STATE_URL``, then ``REDIS_URL``, then local Redis.
+
+        ``write_behind`` > 0 buffers ``set_state`` calls for that many seconds and
+        flushes them in one pipeline, keeping only the latest value per field.
+
+        ``cache_size`` > 0 keeps up to that many decoded sessions in process for
+        ``cache_ttl`` seconds. Every write publishes the touched session ids on
+        ``invalidation_channel`` so other workers drop their copies; cached
+        values are shared and must be treated as read-only.
+
+        ``codec`` (json, orjson, msgpack) and ``key_codecs`` pick the value
+        encoding; with ``compression`` (zstd, lz4) set, encoded values larger
+        than ``compress_threshold`` bytes are compressed. See ``codecs``."""
+        self.url = url or os.getenv("STATE_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.backend: StateBackend = create_backend(self.url)
+        self.serializer = ValueSerializer(codec, compression, compress_threshold, key_codecs)
+        self.write_behind = write_behind
+        self._pending: Dict[str, Dict[str, bytes]] = {}
+        self._pending_ttl: Dict[str, int] = {}
+        # Buffered writes taken by a flush that is still in flight
+        self._flushing: Dict[str, Dict[str, bytes]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # An in-process backend is already local, so there is nothing to cache
+        use_cache = cache_size > 0 and self.backend.supports_invalidation
+        self.cache = LocalCache(cache_size, cache_ttl) if use_cache else None
+        self.invalidation_channel = invalidation_channel
+        self._listener_task: Optional[asyncio.Task] = None
         self.logger = logger.bind(component="StateManager")
 
-    async def set_state(self, session_id: str, key: str, value: Any, ttl: int = 3600):
-        """Save state with TTL (default 1 hour)"""
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    def _encode(self, key: str, value: Any) -> bytes:
+        return self.serializer.encode(key, {
+            "value": value,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+    def _decode(self, data: Optional[bytes]) -> Optional[Any]:
+        if data is None:
+            return None
+        return self.serializer.decode(data)["value"]
+
+    @timed(STATE_SECONDS, "set_state")
+    async def set_state(self, session_id: str, key: str, value: Any, ttl: int = 3600, strict: bool = False):
+        """Save state with TTL (default 1 hour).
+
+        Errors are logged and swallowed unless ``strict``; a strict write also
+        skips the write-behind buffer, so it is stored once this returns."""
         try:
-            data = {
-                "value": value,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            await self.redis.hset(f"session:{session_id}", key, json.dumps(data))
-            await self.redis.expire(f"session:{session_id}", ttl)
+            if self.write_behind > 0 and not strict:
+                self._buffer(session_id, {key: self._encode(key, value)}, ttl)
+                return
+            self._unbuffer(session_id, [key])
+            await self._write([(session_id, {key: self._encode(key, value)}, ttl)])
             self.logger.info("State saved", session_id=session_id, key=key)
         except Exception as e:
             self.logger.error("Failed to save state", error=str(e))
+            if strict:
+                raise
 
-    async def get_state(self, session_id: str, key: str) -> Optional[Any]:
-        """Retrieve state"""
+    @timed(STATE_SECONDS, "set_many")
+    async def set_many(self, items: Dict[str, Dict[str, Any]], ttl: int = 3600, strict: bool = False):
+        """Save ``{session_id: {key: value}}`` for many sessions in one round-trip;
+        ``strict`` as in ``set_state``"""
         try:
-            data = await self.redis.hget(f"session:{session_id}", key)
-            if data:
-                return json.loads(data)["value"]
-            return None
+            encoded = {
+                session_id: {key: self._encode(key, value) for key, value in fields.items()}
+                for session_id, fields in items.items() if fields
+            }
+            if self.write_behind > 0 and not strict:
+                for session_id, fields in encoded.items():
+                    self._buffer(session_id, fields, ttl)
+                return
+            for session_id, fields in encoded.items():
+                self._unbuffer(session_id, fields)
+            await self._write([(session_id, fields, ttl) for session_id, fields in encoded.items()])
+            self.logger.info("State saved", sessions=len(encoded))
+        except Exception as e:
+            self.logger.error("Failed to save state", error=str(e))
+            if strict:
+                raise
+
+    @timed(STATE_SECONDS, "get_state")
+    async def get_state(self, session_id: str, key: str, strict: bool = False) -> Optional[Any]:
+        """Retrieve state; errors read as ``None`` unless ``strict``"""
+        try:
+            pending = self._pending.get(session_id, {})
+            if key in pending:
+                return self._decode(pending[key])
+            if self.cache is None:
+                return self._decode(await self.backend.get(self._key(session_id), key))
+
+            self._ensure_listener()
+            entry = self.cache.get(session_id)
+            if entry is not None and (key in entry["fields"] or entry["complete"]):
+                return entry["fields"].get(key)
+            generation = self.cache.generation(session_id)
+            value = self._decode(await self.backend.get(self._key(session_id), key))
+            self._cache_fields(session_id, {key: value}, generation)
+            return value
         except Exception as e:
             self.logger.error("Failed to get state", error=str(e))
+            if strict:
+                raise
             return None
 
+    @timed(STATE_SECONDS, "get_fields")
+    async def get_fields(self, session_id: str, keys: List[str]) -> Dict[str, Any]:
+        """Retrieve several keys of one session in one round-trip"""
+        try:
+            values = await self.backend.get_fields(self._key(session_id), keys)
+            pending = self._pending.get(session_id, {})
+            return {
+                key: self._decode(pending.get(key, data))
+                for key, data in zip(keys, values)
+            }
+        except Exception as e:
+            self.logger.error("Failed to get state", error=str(e))
+            return {key: None for key in keys}
+
+    @timed(STATE_SECONDS, "get_many")
+    async def get_many(self, session_ids: Iterable[str], key: str) -> Dict[str, Any]:
+        """Retrieve one key across many sessions in one round-trip"""
+        session_ids = list(session_ids)
+        try:
+            values = await self.backend.get_many([self._key(session_id) for session_id in session_ids], key)
+            return {
+                session_id: self._decode(self._pending.get(session_id, {}).get(key, data))
+                for session_id, data in zip(session_ids, values)
+            }
+        except Exception as e:
+            self.logger.error("Failed to get state", error=str(e))
+            return {session_id: None for session_id in session_ids}
+
+    @timed(STATE_SECONDS, "get_full_session")
     async def get_full_session(self, session_id: str) -> Dict[str, Any]:
         """Get entire session state"""
         try:
-            data = await self.redis.hgetall(f"session:{session_id}")
-            return {k: json.loads(v)["value"] for k, v in data.items()}
+            pending = {k: self._decode(v) for k, v in self._pending.get(session_id, {}).items()}
+            if self.cache is not None:
+                self._ensure_listener()
+                entry = self.cache.get(session_id)
+                if entry is not None and entry["complete"]:
+                    return {**entry["fields"], **pending}
+                generation = self.cache.generation(session_id)
+
+            data = {k: self._decode(v) for k, v in (await self.backend.get_all(self._key(session_id))).items()}
+            if self.cache is not None:
+                self._cache_fields(session_id, data, generation, complete=True)
+            return {**data, **pending}
         except Exception:
             return {}
 
+    @timed(STATE_SECONDS, "clear_session")
     async def clear_session(self, session_id: str):
-        await self.redis.delete(f"session:{session_id}")
+        self._pending.pop(session_id, None)
+        self._pending_ttl.pop(session_id, None)
+        self._flushing.pop(session_id, None)
+        if self.cache is None:
+            await self.backend.delete(self._key(session_id))
+        else:
+            self.cache.invalidate(session_id)
+            await self.backend.delete(self._key(session_id), notify=self.invalidation_channel)
+            self.cache.invalidate(session_id)
         self.logger.info("Session cleared", session_id=session_id)
+
+    async def flush(self):
+        """Write out any buffered write-behind state now"""
+        if not self._pending:
+            return
+        pending, ttls = self._pending, self._pending_ttl
+        self._pending, self._pending_ttl = {}, {}
+        self._flushing = pending
+        try:
+            await self._write([(session_id, fields, ttls[session_id]) for session_id, fields in pending.items()])
+            self.logger.info("Write-behind flushed", sessions=len(pending))
+        except asyncio.CancelledError:
+            self._requeue(pending, ttls)
+            raise
+        except Exception as e:
+            self.logger.error("Failed to flush state, will retry", sessions=len(pending), error=str(e))
+            self._requeue(pending, ttls)
+            if self._flush_task is None or self._flush_task.done() or self._flush_task is asyncio.current_task():
+                self._flush_task = asyncio.create_task(self._flush_later())
+        finally:
+            self._flushing = {}
+
+    def _requeue(self, pending: Dict[str, Dict[str, bytes]], ttls: Dict[str, int]):
+        # Put unwritten writes back; anything buffered since the flush started is newer and wins
+        for session_id, fields in pending.items():
+            if not fields:
+                continue
+            current = self._pending.setdefault(session_id, {})
+            for key, value in fields.items():
+                current.setdefault(key, value)
+            self._pending_ttl.setdefault(session_id, ttls[session_id])
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+
+    async def close(self):
+        task = self._flush_task
+        if task is not None and not task.done():
+            # A flush that is already writing (_flushing is set) is left to
+            # finish; one still waiting out the write-behind delay is cancelled
+            if not self._flushing:
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+        if self._flush_task is not None and not self._flush_task.done():
+            # Rescheduled by a failed flush; nothing will run it now
+            self._flush_task.cancel()
+        if self._pending:
+            self.logger.error("Closing with unflushed state", sessions=len(self._pending))
+        if self._listener_task:
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+            self._listener_task = None
+        await self.backend.close()
+
+    async def _write(self, writes: List[Tuple[str, Dict[str, bytes], int]]):
+        if self.cache is None:
+            await self.backend.write([(self._key(session_id), fields, ttl) for session_id, fields, ttl in writes])
+            return
+
+        for session_id, _, _ in writes:
+            self.cache.invalidate(session_id)
+        await self.backend.write(
+            [(self._key(session_id), fields, ttl) for session_id, fields, ttl in writes],
+            notify=self.invalidation_channel,
+        )
+        if self.cache is not None:
+            # Drop anything a concurrent reader cached while the write was in flight
+            for session_id, _, _ in writes:
+                self.cache.invalidate(session_id)
+
+    def _cache_fields(self, session_id: str, fields: Dict[str, Any], generation: int, complete: bool = False):
+        entry = self.cache.peek(session_id)
+        if entry is None or complete:
+            entry = {"fields": {}, "complete": complete}
+        else:
+            entry = {"fields": dict(entry["fields"]), "complete": entry["complete"]}
+        entry["fields"].update(fields)
+        self.cache.put(session_id, entry, generation)
+
+    def _ensure_listener(self):
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen_invalidations())
+
+    async def _listen_invalidations(self):
+        """Drop locally cached sessions written by any worker sharing the backend"""
+        prefix = len(self._key(""))
+        while True:
+            try:
+                async for keys in self.backend.listen(self.invalidation_channel):
+                    for key in keys:
+                        self.cache.invalidate(key[prefix:])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Invalidation listener disconnected", error=str(e))
+                await asyncio.sleep(1.0)
+            finally:
+                # Invalidations may have been missed while disconnected
+                self.cache.clear()
+
+    def _unbuffer(self, session_id: str, keys: Iterable[str]):
+        # A direct write supersedes buffered values that would otherwise land after it
+        in_flight = self._flushing.get(session_id)
+        if in_flight:
+            for key in keys:
+                in_flight.pop(key, None)
+        pending = self._pending.get(session_id)
+        if pending:
+            for key in keys:
+                pending.pop(key, None)
+            if not pending:
+                del self._pending[session_id]
+                self._pending_ttl.pop(session_id, None)
+
+    def _buffer(self, session_id: str, fields: Dict[str, bytes], ttl: int):
+        self._pending.setdefault(session_id, {}).update(fields)
+        self._pending_ttl[session_id] = ttl
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.write_behind)
+        await self.flush()
@@ -0,0 +1,465 @@
+# evo_core/memory/webhook_queue.py
+"""Durable queues for raw payment-provider webhooks.
+
+``append`` stores one received webhook and returns once it is durable, or
+returns False if the same provider event id was already accepted within
+``dedupe_ttl`` seconds (providers retry until they get a 2xx, and also
+re-send on their own). A consumer ``read``s batches and ``ack``s them once
+processed; anything read but not acknowledged is delivered again after a
+restart. ``create_webhook_queue`` picks the backend from the URL:
+
+- ``redis://`` / ``rediss://`` / ``unix://`` - a Redis Stream with a consumer group
+- ``file:///path/to/webhooks.log`` - a local append-only log, single process only
+
+The dedupe index is an exact set with a TTL rather than a Bloom filter: a
+false positive there would silently drop a real payment. Both backends keep
+it for the full ``dedupe_ttl``, however many webhooks arrive in that time.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+
+import redis.asyncio as redis
+import structlog
+
+from evo_core.memory.local_cache import LocalCache
+
+logger = structlog.get_logger()
+
+# Stripe and PayPal both retry failed deliveries for up to three days
+DEFAULT_DEDUPE_TTL = 3 * 24 * 3600
+
+Record = Dict[str, Any]
+
+
+def make_record(provider: str, event_id: str, body: bytes, received_at: Optional[float] = None) -> Record:
+    return {
+        "provider": provider,
+        "event_id": event_id,
+        "received_at": received_at or time.time(),
+        "body": body.decode("utf-8", errors="replace"),
+    }
+
+
+class WebhookQueue(ABC):
+    @abstractmethod
+    async def append(self, record: Record) -> bool:
+        """Store ``record`` durably; False if its event id is a duplicate."""
+
+    @abstractmethod
+    async def read(self, max_items: int = 500, timeout: float = 1.0) -> List[Tuple[Any, Record]]:
+        """Up to ``max_items`` unacknowledged records as ``(position, record)``,
+        oldest first; waits up to ``timeout`` seconds when there are none."""
+
+    @abstractmethod
+    async def ack(self, positions: List[Any]):
+        """Mark records returned by ``read`` as processed."""
+
+    @abstractmethod
+    async def rewind(self):
+        """Deliver every unacknowledged record again from the next ``read``."""
+
+    async def close(self):
+        pass
+
+
+class RedisStreamQueue(WebhookQueue):
+    """Records go to a Redis Stream, read through a consumer group so several
+    app instances share the work. Dedupe marker and XADD run in one Lua script,
+    so a record is never marked seen without being queued.
+
+    The consumer name comes from ``WEBHOOK_CONSUMER`` (default: the host name)
+    and should stay the same across restarts of an instance. Entries another
+    consumer read but has not acknowledged for ``claim_idle`` seconds (it
+    crashed, or was replaced under a new name) are claimed with XAUTOCLAIM on
+    start and every ``claim_idle`` seconds after, so they are not stranded.
+    """
+
+    _APPEND = """
+    if redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[1]) then
+        return redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], '*',
+            'provider', ARGV[3], 'event_id', ARGV[4], 'received_at', ARGV[5], 'body', ARGV[6])
+    end
+    return false
+    """
+
+    def __init__(
+        self,
+        url: str,
+        stream: str = "kelnic:webhooks",
+        group: str = "webhook-consumers",
+        consumer: Optional[str] = None,
+        dedupe_ttl: int = DEFAULT_DEDUPE_TTL,
+        max_length: int = 1_000_000,
+        claim_idle: float = 300.0,
+    ):
+        self.redis = redis.from_url(url)
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or os.getenv("WEBHOOK_CONSUMER") or socket.gethostname()
+        self.claim_idle = claim_idle
+        self._next_claim = 0.0
+        self.dedupe_ttl = dedupe_ttl
+        # Approximate cap on the stream; keep it well above any expected consumer backlog
+        self.max_length = max_length
+        self._append = self.redis.register_script(self._APPEND)
+        self._group_ready = False
+        # Our own pending entries (read before a crash, never acked) are re-read first
+        self._pending_checked = False
+
+    async def append(self, record: Record) -> bool:
+        entry_id = await self._append(
+            keys=[f"{self.stream}:seen:{record['provider']}:{record['event_id']}", self.stream],
+            args=[self.dedupe_ttl, self.max_length, record["provider"], record["event_id"], record["received_at"], record["body"]],
+        )
+        return entry_id is not None
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def _claim_idle(self):
+        """Move entries left unacknowledged by other consumers into our pending list."""
+        start, claimed = "0-0", 0
+        while True:
+            response = await self.redis.xautoclaim(
+                self.stream, self.group, self.consumer, int(self.claim_idle * 1000), start_id=start, count=1000
+            )
+            start = response[0]
+            claimed += len(response[1])
+            if start in (b"0-0", "0-0"):
+                break
+        if claimed:
+            logger.warning("Claimed idle webhook entries", consumer=self.consumer, entries=claimed)
+            self._pending_checked = False
+
+    async def read(self, max_items: int = 500, timeout: float = 1.0) -> List[Tuple[Any, Record]]:
+        await self._ensure_group()
+        if time.monotonic() >= self._next_claim:
+            self._next_claim = time.monotonic() + self.claim_idle
+            await self._claim_idle()
+        if not self._pending_checked:
+            response = await self.redis.xreadgroup(self.group, self.consumer, {self.stream: "0"}, count=max_items)
+            entries = response[0][1] if response else []
+            if entries:
+                return await self._decode_pending(entries)
+            self._pending_checked = True
+        response = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=max_items, block=int(timeout * 1000)
+        )
+        entries = response[0][1] if response else []
+        return [(entry_id, self._decode(fields)) for entry_id, fields in entries]
+
+    async def _decode_pending(self, entries) -> List[Tuple[Any, Record]]:
+        # Pending entries trimmed from the stream since come back without fields
+        trimmed = [entry_id for entry_id, fields in entries if not fields]
+        if trimmed:
+            logger.error("Pending webhook entries were trimmed from the stream", entries=len(trimmed))
+            await self.ack(trimmed)
+        return [(entry_id, self._decode(fields)) for entry_id, fields in entries if fields]
+
+    @staticmethod
+    def _decode(fields: Dict[bytes, bytes]) -> Record:
+        record = {key.decode(): value.decode() for key, value in fields.items()}
+        record["received_at"] = float(record["received_at"])
+        return record
+
+    async def ack(self, positions: List[Any]):
+        if positions:
+            await self.redis.xack(self.stream, self.group, *positions)
+
+    async def rewind(self):
+        self._pending_checked = False
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class LogWebhookQueue(WebhookQueue):
+    """Newline-delimited JSON appended to a local file with group commit.
+
+    ``append`` hands the record to a writer task that writes and fsyncs every
+    record queued in the meantime in one go, so many concurrent webhooks share
+    one fsync. The consumer's acknowledged byte offset is kept next to the log
+    (``<path>.offset``). Once everything is acknowledged and the log has grown
+    past ``segment_bytes`` it is rotated to ``<path>.1``.
+
+    Seen event ids are kept in SQLite (``<path>.seen``) for ``dedupe_ttl``,
+    checked and inserted by the writer for each batch after the log write.
+    The log is the source of truth: both segments are replayed into the
+    index on start, covering ids written just before a crash. Up to
+    ``dedupe_size`` recent ids are also held in memory, so retries that
+    arrive while the first delivery is still queued are caught early.
+
+    All file operations run on one dedicated thread, so they never block the
+    event loop and never race each other.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dedupe_ttl: int = DEFAULT_DEDUPE_TTL,
+        dedupe_size: int = 200_000,
+        max_batch: int = 1000,
+        max_delay: float = 0.001,
+        segment_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.path = path
+        self.dedupe_ttl = dedupe_ttl
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.segment_bytes = segment_bytes
+        # Front cache of the on-disk index; a miss here is checked against SQLite
+        self._seen = LocalCache(dedupe_size, dedupe_ttl)
+        self._index: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webhook-log")
+        self._queue: "asyncio.Queue[Tuple[bytes, str, float, asyncio.Future]]" = asyncio.Queue()
+        self._available = asyncio.Event()
+        self._writer_file = None
+        self._reader_file = None
+        self._size = 0
+        self._read_pos = 0
+        self._acked = 0
+        self._started: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.stats = {"appended": 0, "duplicates": 0, "commits": 0}
+        self.logger = logger.bind(component="LogWebhookQueue")
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def start(self):
+        """Open the log and rebuild the dedupe index; called automatically on first use."""
+        if self._started is None:
+            self._started = asyncio.ensure_future(self._run(self._open_sync))
+        try:
+            await self._started
+        except Exception:
+            self._started = None
+            raise
+        if self._writer is None:
+            self._writer = asyncio.ensure_future(self._write_loop())
+            if self._acked < self._size:
+                self._available.set()
+
+    def _open_sync(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._writer_file = open(self.path, "ab")
+        self._size = self._writer_file.tell()
+        # Drop a torn final record; it was never acknowledged to the provider, who will retry
+        if self._size:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                self._writer_file.truncate(end)
+                self._size = end
+        try:
+            with open(self.path + ".offset") as f:
+                self._acked = min(int(f.read().strip() or 0), self._size)
+        except FileNotFoundError:
+            self._acked = 0
+        self._read_pos = self._acked
+
+        self._index = sqlite3.connect(self.path + ".seen", check_same_thread=False)
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("PRAGMA synchronous=NORMAL")
+        self._index.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, received_at REAL NOT NULL)")
+        self._index.execute("CREATE INDEX IF NOT EXISTS seen_received_at ON seen (received_at)")
+
+        cutoff = time.time() - self.dedupe_ttl
+        seen = []
+        for segment in (self.path + ".1", self.path):
+            try:
+                with open(segment, "rb") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if record["received_at"] > cutoff:
+                            seen.append((f"{record['provider']}:{record['event_id']}", record["received_at"]))
+            except FileNotFoundError:
+                continue
+        with self._index:
+            self._index.executemany("INSERT OR IGNORE INTO seen (key, received_at) VALUES (?, ?)", seen)
+            self._index.execute("DELETE FROM seen WHERE received_at <= ?", (cutoff,))
+
+    async def append(self, record: Record) -> bool:
+        await self.start()
+        key = f"{record['provider']}:{record['event_id']}"
+        # Marked before the write completes so a retry arriving meanwhile is dropped too
+        if self._seen.peek(key) is not None:
+            self.stats["duplicates"] += 1
+            return False
+        self._seen.put(key, True)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((json.dumps(record).encode() + b"\n", key, record["received_at"], future))
+        try:
+            stored = await future
+        except Exception:
+            # Not stored: let the provider's retry through
+            self._seen.invalidate(key)
+            raise
+        if not stored:
+            self.stats["duplicates"] += 1
+        return stored
+
+    async def _next_batch(self) -> List[Tuple[bytes, str, float, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        if self._queue.empty() and self.max_delay > 0:
+            await asyncio.sleep(self.max_delay)
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write_loop(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                stored = await self._run(self._write_sync, [(line, key, received_at) for line, key, received_at, _ in batch])
+            except Exception as e:
+                self.logger.error("Webhook log write failed", records=len(batch), error=str(e))
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                self.stats["appended"] += sum(stored)
+                self.stats["commits"] += 1
+                self._available.set()
+                for (_, _, _, future), ok in zip(batch, stored):
+                    if not future.done():
+                        future.set_result(ok)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_sync(self, entries: List[Tuple[bytes, str, float]]) -> List[bool]:
+        """Append the entries not already in the index; returns which were stored."""
+        keys = [key for _, key, _ in entries]
+        cutoff = time.time() - self.dedupe_ttl
+        seen = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            seen.update(key for key, in self._index.execute(
+                f"SELECT key FROM seen WHERE received_at > ? AND key IN ({','.join('?' * len(chunk))})", (cutoff, *chunk)
+            ))
+        new = [(line, key, received_at) for line, key, received_at in entries if key not in seen]
+        if not new:
+            return [False] * len(entries)
+        data = b"".join(line for line, _, _ in new)
+        try:
+            self._writer_file.write(data)
+            self._writer_file.flush()
+            os.fsync(self._writer_file.fileno())
+        except Exception:
+            # Cut a partial write so the next record starts on a fresh line
+            self._writer_file.truncate(self._size)
+            raise
+        self._size += len(data)
+        try:
+            with self._index:
+                self._index.executemany(
+                    "INSERT OR REPLACE INTO seen (key, received_at) VALUES (?, ?)", [(key, at) for _, key, at in new]
+                )
+                if self.stats["commits"] % 1000 == 0:
+                    self._index.execute("DELETE FROM seen WHERE received_at <= ?", (cutoff,))
+        except sqlite3.Error as e:
+            # The records are stored; the index catches up from the log on the next start
+            self.logger.error("Webhook dedupe index update failed", records=len(new), error=str(e))
+        return [key not in seen for key in keys]
+
+    async def read(self, max_items: int = 500, timeout: float = 1.0) -> List[Tuple[Any, Record]]:
+        await self.start()
+        if self._read_pos >= self._size:
+            self._available.clear()
+            try:
+                await asyncio.wait_for(self._available.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return await self._run(self._read_sync, max_items)
+
+    def _read_sync(self, max_items: int) -> List[Tuple[int, Record]]:
+        if self._reader_file is None:
+            self._reader_file = open(self.path, "rb")
+        self._reader_file.seek(self._read_pos)
+        records = []
+        while len(records) < max_items and self._read_pos < self._size:
+            line = self._reader_file.readline()
+            self._read_pos += len(line)
+            records.append((self._read_pos, json.loads(line)))
+        return records
+
+    async def ack(self, positions: List[Any]):
+        if positions:
+            await self._run(self._ack_sync, max(positions))
+
+    async def rewind(self):
+        def _rewind():
+            self._read_pos = self._acked
+        await self._run(_rewind)
+
+    def _ack_sync(self, offset: int):
+        self._acked = max(self._acked, offset)
+        if self._acked >= self._size >= self.segment_bytes and self._read_pos >= self._size:
+            self._rotate_sync()
+        tmp = self.path + ".offset.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(self._acked))
+        os.replace(tmp, self.path + ".offset")
+
+    def _rotate_sync(self):
+        self._writer_file.close()
+        if self._reader_file is not None:
+            self._reader_file.close()
+            self._reader_file = None
+        os.replace(self.path, self.path + ".1")
+        self._writer_file = open(self.path, "ab")
+        self._size = self._read_pos = self._acked = 0
+
+    async def flush(self):
+        """Wait until every queued record has been written (or failed)."""
+        await self._queue.join()
+
+    async def close(self):
+        if self._writer is not None:
+            await self.flush()
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+        def _close():
+            for f in (self._writer_file, self._reader_file, self._index):
+                if f is not None:
+                    f.close()
+        await self._run(_close)
+        self._executor.shutdown(wait=True)
+
+
+def create_webhook_queue(url: str, **kwargs) -> WebhookQueue:
+    scheme = url.partition("://")[0]
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisStreamQueue(url, **kwargs)
+    if scheme == "file":
+        # file:///relative.log or file:////absolute/path.log, as for sqlite state URLs
+        path = url[len("file:///"):]
+        if not path:
+            raise ValueError("file webhook queue URL needs a path, e.g. file:///./kelnic_webhooks.log")
+        return LogWebhookQueue(path, **kwargs)
+    raise ValueError(f"Unsupported webhook queue URL: {url}")
@@ -1,3 +1,19 @@
-from .orchestrator import Orchestrator
-from .message_bus import MessageBus
-from .api import app
+import importlib
+
+from .message_bus import MessageBus, DeliveryMode, OverflowPolicy
+from .api import router
+from .scheduler import TaskScheduler, QueueFullError
+from .topic_trie import TopicTrie
+
+# orchestrator.py imports the agents, and agents import leaf modules of this
+# package (resilience); loading it on first access keeps that from being a cycle
+_LAZY = {"KelnicOrchestrator": ".orchestrator"}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
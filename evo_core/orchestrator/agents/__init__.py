@@ -1,42 +1,60 @@
-from .strategist_agent import StrategistAgent
-from .designer_agent import DesignerAgent
-from .scriptwriter_agent import ScriptwriterAgent
-from .voice_artist_agent import VoiceArtistAgent
-from .funnel_builder_agent import FunnelBuilderAgent
-from .optimizer_agent import OptimizerAgent
-from .feedback_analyzer_agent import FeedbackAnalyzerAgent
-from .meta_agent import MetaAgent
-from .code_verifier_agent import CodeVerifierAgent
-from .compliance_agent import ComplianceAgent
-from .payment_agent import PaymentAgent
-from .marketplace_agent import MarketplaceAgent
-from .support_agent import SupportAgent
-from .legal_agent import LegalAgent
-from .monitoring_agent import MonitoringAgent
-from .chatbot_agent import ChatbotAgent
-from .customization_agent import CustomizationAgent
-from .analytics_agent import AnalyticsAgent
-from .affiliate_agent import AffiliateAgent
-from .social_agent import SocialAgent
-from .white_label_agent import WhiteLabelAgent
-from .community_agent import CommunityAgent
-from .personalization_agent import PersonalizationAgent
-from .blockchain_agent import BlockchainAgent
-from .predictive_agent import PredictiveAgent
-from .voice_control_agent import VoiceControlAgent
-from .ar_preview_agent import ARPreviewAgent
-from .gap_detector_agent import GapDetectorAgent
-from .marketing_engine_agent import MarketingEngineAgent
-from .revenue_tracker_agent import RevenueTrackerAgent
-from .content_creator_agent import ContentCreatorAgent
-from .landing_page_agent import LandingPageAgent
-from .promotion_agent import PromotionAgent
-from .quality_assurance_agent import QualityAssuranceAgent
-from .alex_monitoring_agent import AlexMonitoringAgent
-from .financial_agent import FinancialAgent
-from .self_healing_agent import SelfHealingAgent
-from .reporting_agent import ReportingAgent
-from .upgrade_agent import UpgradeAgent
-from .bookkeeper_agent import BookkeeperAgent
-from .invoicing_agent import InvoicingAgent
-from .payout_agent import PayoutAgent
+import importlib
+
+# Agent classes are imported on first attribute access; importing this
+# package no longer loads every module (and their SDK dependencies) up front
+_LAZY_AGENTS = {
+    "StrategistAgent": ".strategist_agent",
+    "DesignerAgent": ".designer_agent",
+    "ScriptwriterAgent": ".scriptwriter_agent",
+    "VoiceArtistAgent": ".voice_artist_agent",
+    "FunnelBuilderAgent": ".funnel_builder_agent",
+    "OptimizerAgent": ".optimizer_agent",
+    "FeedbackAnalyzerAgent": ".feedback_analyzer_agent",
+    "MetaAgent": ".meta_agent",
+    "CodeVerifierAgent": ".code_verifier_agent",
+    "ComplianceAgent": ".compliance_agent",
+    "PaymentAgent": ".payment_agent",
+    "MarketplaceAgent": ".marketplace_agent",
+    "SupportAgent": ".support_agent",
+    "LegalAgent": ".legal_agent",
+    "MonitoringAgent": ".monitoring_agent",
+    "ChatbotAgent": ".chatbot_agent",
+    "CustomizationAgent": ".customization_agent",
+    "AnalyticsAgent": ".analytics_agent",
+    "AffiliateAgent": ".affiliate_agent",
+    "SocialAgent": ".social_agent",
+    "WhiteLabelAgent": ".white_label_agent",
+    "CommunityAgent": ".community_agent",
+    "PersonalizationAgent": ".personalization_agent",
+    "BlockchainAgent": ".blockchain_agent",
+    "PredictiveAgent": ".predictive_agent",
+    "VoiceControlAgent": ".voice_control_agent",
+    "ARPreviewAgent": ".ar_preview_agent",
+    "GapDetectorAgent": ".gap_detector_agent",
+    "MarketingEngineAgent": ".marketing_engine_agent",
+    "RevenueTrackerAgent": ".revenue_tracker_agent",
+    "ContentCreatorAgent": ".content_creator_agent",
+    "LandingPageAgent": ".landing_page_agent",
+    "PromotionAgent": ".promotion_agent",
+    "QualityAssuranceAgent": ".quality_assurance_agent",
+    "AlexMonitoringAgent": ".alex_monitoring_agent",
+    "FinancialAgent": ".financial_agent",
+    "SelfHealingAgent": ".self_healing_agent",
+    "ReportingAgent": ".reporting_agent",
+    "UpgradeAgent": ".upgrade_agent",
+    "BookkeeperAgent": ".bookkeeper_agent",
+    "InvoicingAgent": ".invoicing_agent",
+    "PayoutAgent": ".payout_agent",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_AGENTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = list(_LAZY_AGENTS)
@@ -1,22 +1,23 @@
-import tweepy
-import praw
-import openai
 import time
 import random
 import threading
 import os
 from datetime import datetime
 from ..memory.state_manager import StateManager
+from ..llm import LLMClient
 
 class AlexMonitoringAgent:
-    def __init__(self, bus, state):
+    def __init__(self, bus, state, llm=None):
         self.bus = bus
         self.state = state
-        self.llm = openai.ChatCompletion
+        # Share the application's LLMClient when given one
+        self.llm = llm or LLMClient()
         self.setup_apis()
         self._start_monitor()
 
     def setup_apis(self):
+        import tweepy
+        import praw
         # Twitter (v1.1 for posting)
         auth = tweepy.OAuth1UserHandler(
             os.getenv("TWITTER_CONSUMER_KEY"),
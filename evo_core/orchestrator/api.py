@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
+from evo_core.orchestrator.scheduler import TaskScheduler, QueueFullError
 
 router = APIRouter(prefix="/orchestrator", tags=["orchestrator"])
 
@@ -12,19 +13,32 @@ class TaskRequest(BaseModel):
     priority: int = 5
 
 class OrchestratorAPI:
-    def __init__(self, orchestrator):
+    def __init__(self, orchestrator, scheduler: Optional[TaskScheduler] = None):
+        """Pass the application's running scheduler; without one, this API
+        creates its own, starts it on first use and stops it in ``close``."""
         self.orchestrator = orchestrator
+        self._owns_scheduler = scheduler is None
+        self.scheduler = scheduler or TaskScheduler(orchestrator)
 
     async def handle_task(self, request: TaskRequest):
+        if self._owns_scheduler:
+            # Workers need a running loop, so they cannot be started in __init__
+            self.scheduler.start()
         try:
-            result = await self.orchestrator.process_task(
+            result = await self.scheduler.run(
                 task=request.task,
                 session_id=request.session_id,
                 context=request.context or {},
                 priority=request.priority
             )
             return {"status": "success", "result": result}
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def close(self):
+        if self._owns_scheduler:
+            await self.scheduler.stop()
+
 # This will be attached in main.py later
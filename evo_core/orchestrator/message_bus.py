@@ -1,31 +1,232 @@
 # evo_core/orchestrator/message_bus.py
-from typing import Dict, Any, Callable, Awaitable
+from typing import Dict, Any, Callable, Awaitable, Optional, List
+from dataclasses import dataclass, field
+from enum import Enum
 import asyncio
+import inspect
+import itertools
 import structlog
 from datetime import datetime
+from evo_core.orchestrator.topic_trie import TopicTrie
+from evo_core.telemetry import REGISTRY, timed
 
 logger = structlog.get_logger()
 
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+PUBLISHED = REGISTRY.counter("kelnic_bus_published", "Events published on the message bus", ("event_type",))
+PUBLISH_SECONDS = REGISTRY.histogram("kelnic_bus_publish_seconds", "MessageBus.publish latency")
+
+
+class DeliveryMode(str, Enum):
+    INLINE = "inline"   # publish awaits every handler in turn
+    QUEUED = "queued"   # publish enqueues once; each subscriber drains its own queue
+
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+@dataclass
+class Subscription:
+    event_type: str
+    handler: Handler
+    queue_size: int
+    overflow: OverflowPolicy
+    concurrency: int
+    seq: int = 0
+    queue: Optional[asyncio.Queue] = None
+    workers: List[asyncio.Task] = field(default_factory=list)
+    delivered: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+
 class MessageBus:
-    def __init__(self):
-        self.subscribers: Dict[str, list[Callable[[Dict[str, Any]], Awaitable[None]]]] = {}
+    def __init__(
+        self,
+        mode: DeliveryMode = DeliveryMode.INLINE,
+        inbox_size: int = 10000,
+        queue_size: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        concurrency: int = 1,
+    ):
+        self.subscribers: Dict[str, list[Handler]] = {}
+        self.subscriptions: Dict[str, list[Subscription]] = {}
+        self.mode = DeliveryMode(mode)
+        self.inbox_size = inbox_size
+        self.queue_size = queue_size
+        self.overflow = OverflowPolicy(overflow)
+        self.concurrency = concurrency
+        self._topics = TopicTrie(key=lambda s: s.seq)
+        self._seq = itertools.count()
+        self._inbox: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
         self.logger = logger.bind(component="MessageBus")
+        REGISTRY.callback_gauge("kelnic_bus_inbox_depth", "Events waiting for dispatch", self._inbox_depth)
+        REGISTRY.callback_gauge(
+            "kelnic_bus_queue_depth", "Events waiting in each subscriber queue", self._queue_depths, ("event_type", "handler")
+        )
 
-    def subscribe(self, event_type: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]):
+    def _inbox_depth(self) -> int:
+        return self._inbox.qsize() if self._inbox else 0
+
+    def _queue_depths(self) -> Dict[tuple, int]:
+        return {
+            (s.event_type, getattr(s.handler, "__qualname__", repr(s.handler))): s.queue.qsize() if s.queue else 0
+            for s in self._all_subscriptions()
+        }
+
+    def subscribe(
+        self,
+        event_type: str,
+        handler: Handler,
+        queue_size: Optional[int] = None,
+        overflow: Optional[OverflowPolicy] = None,
+        concurrency: Optional[int] = None,
+    ):
         if event_type not in self.subscribers:
             self.subscribers[event_type] = []
+            self.subscriptions[event_type] = []
         self.subscribers[event_type].append(handler)
+        subscription = Subscription(
+            event_type=event_type,
+            handler=handler,
+            queue_size=queue_size or self.queue_size,
+            overflow=OverflowPolicy(overflow or self.overflow),
+            concurrency=concurrency or self.concurrency,
+            seq=next(self._seq),
+        )
+        self.subscriptions[event_type].append(subscription)
+        self._topics.insert(event_type, subscription)
+        if self._dispatcher is not None:
+            self._start_subscription(subscription)
         self.logger.info(f"Handler subscribed to {event_type}")
 
+    @timed(PUBLISH_SECONDS)
     async def publish(self, event_type: str, payload: Dict[str, Any]):
         payload["timestamp"] = datetime.utcnow().isoformat()
         payload["event_type"] = event_type
 
         self.logger.info(f"Event published: {event_type}", payload=payload)
+        PUBLISHED.labels(event_type).inc()
+
+        if self.mode is DeliveryMode.QUEUED:
+            self._ensure_started()
+            await self._inbox.put((event_type, payload))
+            return
+
+        for subscription in self.match(event_type):
+            try:
+                await self._call(subscription.handler, payload)
+            except Exception as e:
+                self.logger.error(f"Handler failed for {event_type}", error=str(e))
+
+    def match(self, event_type: str) -> List[Subscription]:
+        """Subscriptions whose pattern matches ``event_type``, in subscription order.
+
+        Patterns are dotted: ``*`` matches one segment, ``#`` any number of
+        segments, and globs like ``Payment*`` match within a segment.
+        """
+        return self._topics.match(event_type)
+
+    async def flush(self):
+        """Wait until every event published so far has been handled."""
+        if self._inbox is None:
+            return
+        await self._inbox.join()
+        for subscription in self._all_subscriptions():
+            await subscription.queue.join()
+
+    async def drain(self):
+        """Flush outstanding events, then stop the dispatcher and subscriber workers."""
+        await self.flush()
+        tasks = [self._dispatcher] if self._dispatcher else []
+        for subscription in self._all_subscriptions():
+            tasks.extend(subscription.workers)
+            subscription.workers = []
+            subscription.queue = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._inbox = None
+        self.logger.info("Message bus drained")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode.value,
+            "inbox_depth": self._inbox.qsize() if self._inbox else 0,
+            "subscribers": [
+                {
+                    "event_type": s.event_type,
+                    "handler": getattr(s.handler, "__qualname__", repr(s.handler)),
+                    "queue_depth": s.queue.qsize() if s.queue else 0,
+                    "delivered": s.delivered,
+                    "dropped": s.dropped,
+                    "failed": s.failed,
+                }
+                for s in self._all_subscriptions()
+            ],
+        }
+
+    def _all_subscriptions(self) -> List[Subscription]:
+        return [s for subs in self.subscriptions.values() for s in subs]
+
+    def _ensure_started(self):
+        if self._dispatcher is not None:
+            return
+        self._inbox = asyncio.Queue(maxsize=self.inbox_size)
+        for subscription in self._all_subscriptions():
+            self._start_subscription(subscription)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _start_subscription(self, subscription: Subscription):
+        subscription.queue = asyncio.Queue(maxsize=subscription.queue_size)
+        subscription.workers = [
+            asyncio.create_task(self._consume(subscription))
+            for _ in range(subscription.concurrency)
+        ]
+
+    async def _dispatch(self):
+        while True:
+            event_type, payload = await self._inbox.get()
+            try:
+                for subscription in self.match(event_type):
+                    await self._enqueue(subscription, payload)
+            finally:
+                self._inbox.task_done()
+
+    async def _enqueue(self, subscription: Subscription, payload: Dict[str, Any]):
+        queue = subscription.queue
+        if subscription.overflow is OverflowPolicy.BLOCK:
+            await queue.put(payload)
+            return
+        if queue.full():
+            subscription.dropped += 1
+            if subscription.overflow is OverflowPolicy.DROP_NEWEST:
+                return
+            queue.get_nowait()
+            queue.task_done()
+        queue.put_nowait(payload)
+
+    async def _consume(self, subscription: Subscription):
+        queue = subscription.queue
+        while True:
+            payload = await queue.get()
+            try:
+                await self._call(subscription.handler, payload)
+                subscription.delivered += 1
+            except Exception as e:
+                subscription.failed += 1
+                self.logger.error(f"Handler failed for {subscription.event_type}", error=str(e))
+            finally:
+                queue.task_done()
 
-        if event_type in self.subscribers:
-            for handler in self.subscribers[event_type]:
-                try:
-                    await handler(payload)
-                except Exception as e:
-                    self.logger.error(f"Handler failed for {event_type}", error=str(e))
+    @staticmethod
+    async def _call(handler: Handler, payload: Dict[str, Any]):
+        result = handler(payload)
+        if inspect.isawaitable(result):
+            await result
@@ -1,27 +1,154 @@
 # evo_core/orchestrator/orchestrator.py
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
+import asyncio
+import time
 import structlog
 from evo_core.memory.state_manager import StateManager
-from evo_core.orchestrator.message_bus import MessageBus
+from evo_core.memory.business_metrics import BusinessMetricsAggregator
+from evo_core.orchestrator.message_bus import MessageBus, DeliveryMode
 from evo_core.agents.meta_agent import MetaAgent
+from evo_core.orchestrator.resilience import CircuitBreaker, hedged
+from evo_core.telemetry import REGISTRY, timed
 
 logger = structlog.get_logger()
 
+TASK_SECONDS = REGISTRY.histogram("kelnic_task_seconds", "process_task latency")
+TASK_ERRORS = REGISTRY.counter("kelnic_task_errors", "process_task calls that raised")
+TASKS_IN_FLIGHT = REGISTRY.gauge("kelnic_tasks_in_flight", "process_task calls running")
+
 class KelnicOrchestrator:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        default_timeout: float = 30.0,
+        request_timeout: Optional[float] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
         self.state_manager = StateManager()
-        self.message_bus = MessageBus()
+        # Subscribers get their own queues so slow handlers don't delay process_task
+        self.message_bus = MessageBus(mode=DeliveryMode.QUEUED)
         self.meta_agent = MetaAgent(self)
+        # Live revenue/customer/agent metrics fed by bus events
+        self.business_metrics = BusinessMetricsAggregator(self.message_bus, self.state_manager)
         self.agents = {}
+        # Agents registered by spec and not yet imported (see register_agent_spec)
+        self.agent_specs = {}
+        self.max_concurrency = max_concurrency
+        # Per-agent call timeout unless the agent sets its own ``timeout``
+        self.default_timeout = default_timeout
+        # Deadline applied to a whole task when the caller gives none
+        self.request_timeout = request_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.agent_limits: Dict[str, asyncio.Semaphore] = {}
+        # ReportingEngine used by the financial agents; set by the application
+        self.reporting = None
+        # ResourceSampler read by MonitoringAgent/SelfHealingAgent; set by the application
+        self.resources = None
+        # Mailer used by InvoicingAgent/ContentCreatorAgent to send email; set by the application
+        self.mailer = None
+        # Shared LLMClient (cache, coalescing, token budget) for every agent; set by the application
+        self.llm = None
         self.logger = logger.bind(component="KelnicOrchestrator")
 
     def register_agent(self, name: str, agent_instance):
-        self.agents[name] = agent_instance
+        self._activate(name, agent_instance)
+        if name != self.meta_agent.name:
+            self.meta_agent.register_agent(
+                name,
+                getattr(agent_instance, "description", ""),
+                getattr(agent_instance, "keywords", None)
+            )
         self.logger.info(f"Agent registered: {name}")
 
-    async def process_task(self, task: str, session_id: str, context: Dict[str, Any], priority: int = 5):
+    def register_agent_spec(self, spec):
+        """Register an agent for routing without importing it; it is loaded on first use"""
+        self.agent_specs[spec.name] = spec
+        self.breakers.setdefault(spec.name, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        self.meta_agent.register_agent(spec.name, spec.description, spec.keywords)
+        self.logger.info(f"Agent registered: {spec.name}", lazy=True)
+
+    def get_agent(self, name: str):
+        agent = self.agents.get(name)
+        if agent is None and name in self.agent_specs:
+            started = time.perf_counter()
+            agent = self.agent_specs[name].load(self)
+            self._activate(name, agent)
+            self.logger.info(f"Agent loaded: {name}", seconds=round(time.perf_counter() - started, 4))
+        return agent
+
+    def warm_up(self, names):
+        """Load the named agents now instead of on their first task"""
+        for name in names:
+            if self.get_agent(name) is None:
+                self.logger.warning(f"Cannot warm up unknown agent: {name}")
+
+    def has_agent(self, name: str) -> bool:
+        return name in self.agents or name in self.agent_specs
+
+    def _activate(self, name: str, agent_instance):
+        self.agents[name] = agent_instance
+        self.agent_specs.pop(name, None)
+        self.breakers.setdefault(name, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        limit = getattr(agent_instance, "max_concurrency", 0)
+        if limit:
+            self.agent_limits[name] = asyncio.Semaphore(limit)
+
+    @timed(TASK_SECONDS, errors=TASK_ERRORS, in_flight=TASKS_IN_FLIGHT)
+    async def process_task(self, task: str, session_id: str, context: Dict[str, Any], priority: int = 5, timeout: Optional[float] = None):
+        context, plan = await self._route(task, session_id, context, timeout)
+
+        results = await self.execute_plan(plan, session_id, context)
+
+        # Save final result
+        await self.state_manager.set_state(session_id, "last_result", results)
+
+        return {
+            "session_id": session_id,
+            "task": task,
+            "plan": plan,
+            "results": results
+        }
+
+    async def process_task_stream(self, task: str, session_id: str, context: Dict[str, Any], priority: int = 5,
+                                  timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """``process_task`` as events: ``plan`` as soon as routing is done, a
+        ``step`` per agent result as it completes, then ``done`` carrying the
+        same result ``process_task`` returns. Closing the generator early
+        cancels the steps still running."""
+        started = time.perf_counter()
+        TASKS_IN_FLIGHT.inc()
+        try:
+            context, plan = await self._route(task, session_id, context, timeout)
+            yield {"event": "plan", "session_id": session_id, "task": task, "plan": plan}
+
+            outcomes = {}
+            async for index, outcome in self.iter_plan(plan, session_id, context):
+                outcomes[index] = outcome
+                yield {"event": "step", "index": index, **outcome}
+
+            results = [outcomes[i] for i in sorted(outcomes)]
+            await self.state_manager.set_state(session_id, "last_result", results)
+            yield {"event": "done", "result": {"session_id": session_id, "task": task, "plan": plan, "results": results}}
+        except Exception:
+            TASK_ERRORS.inc()
+            raise
+        finally:
+            TASKS_IN_FLIGHT.dec()
+            TASK_SECONDS.observe(time.perf_counter() - started)
+
+    async def _route(self, task: str, session_id: str, context: Dict[str, Any], timeout: Optional[float]):
         self.logger.info("Processing task", task=task, session_id=session_id)
 
+        # Request-level deadline (epoch seconds) travels with the context to every step
+        context = dict(context)
+        timeout = timeout or self.request_timeout
+        if timeout:
+            deadline = time.time() + timeout
+            context["deadline"] = min(context.get("deadline", deadline), deadline)
+
         # Save incoming context
         await self.state_manager.set_state(session_id, "current_task", task)
 
@@ -29,37 +156,169 @@ class KelnicOrchestrator:
         plan = await self.meta_agent.route_task(task, context)
 
         self.logger.info("Meta agent routing plan", plan=plan)
+        return context, plan
+
+    async def execute_plan(self, plan: Dict[str, Any], session_id: str, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run plan steps as a dependency graph.
 
-        results = []
+        Each step may carry an ``id`` (defaults to its agent name) and a
+        ``depends_on`` list of step ids. Steps whose dependencies are met run
+        concurrently, at most ``max_concurrency`` at a time. Results are
+        returned in plan order. Once ``context["deadline"]`` passes, running
+        steps are cancelled and remaining ones fail without being started.
+        """
+        outcomes = {index: outcome async for index, outcome in self.iter_plan(plan, session_id, context)}
+        return [outcomes[i] for i in sorted(outcomes)]
 
-        for step in plan.get("steps", []):
+    async def iter_plan(self, plan: Dict[str, Any], session_id: str, context: Dict[str, Any]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Run the plan like ``execute_plan`` but yield ``(step index, outcome)``
+        in completion order. Steps without an outcome (unknown agent) are skipped."""
+        steps = plan.get("steps", [])
+        step_ids = [step.get("id", step.get("agent")) for step in steps]
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(steps)
+
+        index_of: Dict[str, int] = {}
+        for i, step_id in enumerate(step_ids):
+            index_of.setdefault(step_id, i)
+
+        invalid = self._find_invalid_steps(steps, step_ids, index_of)
+        done = [asyncio.Event() for _ in steps]
+        finished: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_step(index: int):
+            step = steps[index]
             agent_name = step.get("agent")
             agent_task = step.get("task")
+            try:
+                if index in invalid:
+                    self.logger.error(f"Invalid plan step for {agent_name}", reason=invalid[index])
+                    outcomes[index] = {"agent": agent_name, "error": invalid[index]}
+                    return
 
-            if agent_name in self.agents:
-                agent = self.agents[agent_name]
-                try:
-                    result = await agent.execute(agent_task, context)
-                    results.append({"agent": agent_name, "result": result})
-                    
-                    # Publish event
-                    await self.message_bus.publish(f"{agent_name}.completed", {
-                        "session_id": session_id,
-                        "task": agent_task,
-                        "result": result
-                    })
-                except Exception as e:
-                    self.logger.error(f"Agent {agent_name} failed", error=str(e))
-                    results.append({"agent": agent_name, "error": str(e)})
-            else:
-                self.logger.warning(f"Agent not found: {agent_name}")
+                upstream = {}
+                for dep in step.get("depends_on", []):
+                    await done[index_of[dep]].wait()
+                    dep_outcome = outcomes[index_of[dep]]
+                    if dep_outcome is None or "error" in dep_outcome:
+                        outcomes[index] = {"agent": agent_name, "error": f"Dependency failed: {dep}"}
+                        return
+                    upstream[dep] = dep_outcome["result"]
 
-        # Save final result
-        await self.state_manager.set_state(session_id, "last_result", results)
+                if not self.has_agent(agent_name):
+                    self.logger.warning(f"Agent not found: {agent_name}")
+                    return
 
-        return {
-            "session_id": session_id,
-            "task": task,
-            "plan": plan,
-            "results": results
+                step_context = {**context, "upstream_results": upstream} if upstream else context
+                async with semaphore:
+                    outcomes[index] = await self._run_agent(agent_name, agent_task, session_id, step_context)
+            finally:
+                done[index].set()
+                finished.put_nowait(index)
+
+        tasks = [asyncio.ensure_future(run_step(i)) for i in range(len(steps))]
+        try:
+            for _ in steps:
+                index = await finished.get()
+                if outcomes[index] is not None:
+                    yield index, outcomes[index]
+            # Surface unexpected errors from the steps, as gather would
+            for task in tasks:
+                task.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _run_agent(self, agent_name: str, agent_task: str, session_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        deadline = context.get("deadline")
+        if deadline is not None and deadline <= time.time():
+            return {"agent": agent_name, "error": "Deadline exceeded"}
+
+        breaker = self.breakers[agent_name]
+        if not breaker.allow():
+            return {"agent": agent_name, "error": f"Circuit open for {agent_name}"}
+
+        try:
+            agent = self.get_agent(agent_name)
+        except Exception as e:
+            breaker.record_failure()
+            self.logger.error(f"Agent {agent_name} failed to load", error=str(e))
+            return {"agent": agent_name, "error": f"Failed to load agent: {e}"}
+
+        timeout = getattr(agent, "timeout", None) or self.default_timeout
+        if deadline is not None:
+            timeout = min(timeout, max(deadline - time.time(), 0.0))
+
+        try:
+            result = await asyncio.wait_for(self._call_agent(agent_name, agent, agent_task, context), timeout)
+            breaker.record_success()
+
+            # Publish event
+            await self.message_bus.publish(f"{agent_name}.completed", {
+                "session_id": session_id,
+                "task": agent_task,
+                "result": result
+            })
+            return {"agent": agent_name, "result": result}
+        except asyncio.CancelledError:
+            # Otherwise a cancelled half-open trial would block every later probe
+            breaker.cancel_trial()
+            raise
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            expired = deadline is not None and time.time() >= deadline
+            error = "Deadline exceeded" if expired else f"Timed out after {timeout:.1f}s"
+            self.logger.error(f"Agent {agent_name} failed", error=error)
+            return {"agent": agent_name, "error": error}
+        except Exception as e:
+            breaker.record_failure()
+            self.logger.error(f"Agent {agent_name} failed", error=str(e))
+            return {"agent": agent_name, "error": str(e)}
+
+    async def _call_agent(self, agent_name: str, agent, agent_task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        limit = self.agent_limits.get(agent_name)
+        if limit is None:
+            return await self._execute_once(agent, agent_task, context)
+        async with limit:
+            return await self._execute_once(agent, agent_task, context)
+
+    @staticmethod
+    async def _execute_once(agent, agent_task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        hedge_after = getattr(agent, "hedge_after", None)
+        if hedge_after and getattr(agent, "idempotent", False):
+            return await hedged(lambda: agent.execute(agent_task, context), hedge_after)
+        return await agent.execute(agent_task, context)
+
+    def get_agent_health(self) -> Dict[str, Any]:
+        return {name: breaker.get_status() for name, breaker in self.breakers.items()}
+
+    @staticmethod
+    def _find_invalid_steps(steps: List[Dict[str, Any]], step_ids: List[str], index_of: Dict[str, int]) -> Dict[int, str]:
+        """Return {step index: reason} for steps that can never run (duplicate ids,
+        unknown dependencies or dependency cycles)."""
+        invalid: Dict[int, str] = {}
+        for i, step_id in enumerate(step_ids):
+            if index_of[step_id] != i:
+                invalid[i] = f"Duplicate step id: {step_id}"
+
+        for i, step in enumerate(steps):
+            for dep in step.get("depends_on", []):
+                if dep not in index_of:
+                    invalid.setdefault(i, f"Unknown dependency: {dep}")
+
+        # Kahn's algorithm: whatever is never released sits on (or behind) a cycle
+        remaining = {
+            i: {index_of[d] for d in step.get("depends_on", []) if d in index_of}
+            for i, step in enumerate(steps) if i not in invalid
         }
+        changed = True
+        while changed:
+            changed = False
+            for i in [i for i, deps in remaining.items() if not deps & remaining.keys()]:
+                del remaining[i]
+                changed = True
+        for i in remaining:
+            invalid[i] = "Dependency cycle"
+
+        return invalid
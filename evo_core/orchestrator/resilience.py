@@ -0,0 +1,106 @@
+# evo_core/orchestrator/resilience.py
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+
+
+class CircuitBreaker:
+    """Per-agent breaker: opens after ``failure_threshold`` consecutive failures,
+    rejects calls for ``reset_timeout`` seconds, then lets a single trial call
+    through (half-open) whose outcome closes or re-opens it."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def cancel_trial(self):
+        """The call was cancelled before it finished: it says nothing about the
+        agent, so count nothing but let the next call probe again."""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` acquisitions per second on average, bursts of up
+    to ``burst``. ``acquire`` waits for a token; callers are served in order."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            self._refill()
+            if self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+    def get_status(self) -> Dict[str, Any]:
+        self._refill()
+        return {"rate": self.rate, "burst": self.burst, "tokens": round(self.tokens, 2)}
+
+
+async def hedged(call: Callable[[], Awaitable[Any]], hedge_after: float) -> Any:
+    """Run ``call``; if it has not finished after ``hedge_after`` seconds, start a
+    second attempt and return whichever succeeds first. Only for idempotent work."""
+    attempts = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.append(asyncio.ensure_future(call()))
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+        # Either the primary finished in time or every attempt failed
+        return attempts[0].result()
+    finally:
+        for attempt in attempts:
+            if not attempt.done():
+                attempt.cancel()
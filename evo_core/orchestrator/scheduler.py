@@ -0,0 +1,257 @@
+# evo_core/orchestrator/scheduler.py
+from typing import AsyncIterator, Dict, Any, Optional, List
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
+import math
+import time
+import structlog
+from evo_core.telemetry import REGISTRY
+
+logger = structlog.get_logger()
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler is saturated and cannot accept more work."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Task queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class ScheduledTask:
+    task: str
+    session_id: str
+    context: Dict[str, Any]
+    priority: int
+    level: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    promoted_at: float = field(default_factory=time.monotonic)
+    # Set for streamed tasks: the worker forwards process_task_stream events here
+    events: Optional[asyncio.Queue] = None
+
+
+class TaskScheduler:
+    """Multi-level priority queue in front of ``KelnicOrchestrator.process_task``.
+
+    Priorities run from 1 (most urgent) to ``levels`` (least urgent). Levels are
+    served by smooth weighted round-robin, so urgent work gets the largest
+    share without starving the rest, and tasks waiting longer than
+    ``aging_interval`` seconds are promoted one level at a time. A fixed pool of
+    ``workers`` coroutines executes tasks; once ``max_queue_depth`` tasks are
+    waiting, ``submit`` raises ``QueueFullError``.
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        workers: int = 4,
+        max_queue_depth: int = 1000,
+        levels: int = 10,
+        aging_interval: float = 5.0,
+        weights: Optional[List[int]] = None,
+    ):
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.levels = levels
+        self.aging_interval = aging_interval
+        # Level 0 (priority 1) gets the largest weight, the last level gets 1
+        self.weights = weights or [levels - i for i in range(levels)]
+        self._queues: List[deque] = [deque() for _ in range(levels)]
+        self._current_weights = [0] * levels
+        self._depth = 0
+        self._not_empty = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+        self._avg_duration = 1.0
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "promoted": 0}
+        self.logger = logger.bind(component="TaskScheduler")
+        REGISTRY.callback_gauge("kelnic_scheduler_queue_depth", "Tasks waiting in the scheduler", lambda: self._depth)
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self.logger.info("Scheduler started", workers=self.workers)
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for queue in self._queues:
+            while queue:
+                item = queue.popleft()
+                if not item.future.done():
+                    item.future.cancel()
+        self._depth = 0
+        self.logger.info("Scheduler stopped")
+
+    async def submit(self, task: str, session_id: str, context: Dict[str, Any], priority: int = 5,
+                     events: Optional[asyncio.Queue] = None) -> asyncio.Future:
+        """Queue a task and return a future resolving to the ``process_task`` result."""
+        if self._depth >= self.max_queue_depth:
+            self.stats["rejected"] += 1
+            raise QueueFullError(self.retry_after())
+
+        level = min(max(priority, 1), self.levels) - 1
+        item = ScheduledTask(
+            task=task,
+            session_id=session_id,
+            context=context,
+            priority=priority,
+            level=level,
+            future=asyncio.get_running_loop().create_future(),
+            events=events,
+        )
+        async with self._not_empty:
+            self._queues[level].append(item)
+            self._depth += 1
+            self.stats["submitted"] += 1
+            self._not_empty.notify()
+        return item.future
+
+    async def submit_stream(self, task: str, session_id: str, context: Dict[str, Any], priority: int = 5) -> AsyncIterator[Dict[str, Any]]:
+        """Queue a task like ``submit`` (raising ``QueueFullError`` right away) and
+        return an async iterator over its ``process_task_stream`` events. Closing
+        the iterator early abandons the task."""
+        events: asyncio.Queue = asyncio.Queue()
+        future = await self.submit(task, session_id, context, priority, events=events)
+        return self._relay(future, events)
+
+    @staticmethod
+    async def _relay(future: asyncio.Future, events: asyncio.Queue) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            while True:
+                if future.done() and events.empty():
+                    # Finished without a "done" event: re-raise its failure, if any
+                    future.result()
+                    return
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait({getter, future}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                event = getter.result()
+                yield event
+                if event["event"] == "done":
+                    return
+        finally:
+            if not future.done():
+                future.cancel()
+
+    async def run(self, task: str, session_id: str, context: Dict[str, Any], priority: int = 5) -> Dict[str, Any]:
+        """Submit a task and wait for its result."""
+        return await (await self.submit(task, session_id, context, priority))
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog is expected to drain."""
+        return max(1, math.ceil(self._depth * self._avg_duration / max(self.workers, 1)))
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "depth": self._depth,
+            "depth_by_priority": {i + 1: len(q) for i, q in enumerate(self._queues) if q},
+            "workers": len(self._workers),
+            "avg_task_seconds": round(self._avg_duration, 4),
+            **self.stats,
+        }
+
+    def _age(self, now: float):
+        # Queues are FIFO, so only the head of each level can be the oldest item
+        for level in range(1, self.levels):
+            queue = self._queues[level]
+            while queue and now - queue[0].promoted_at >= self.aging_interval:
+                item = queue.popleft()
+                item.level = level - 1
+                item.promoted_at = now
+                self._queues[level - 1].append(item)
+                self.stats["promoted"] += 1
+
+    def _next(self) -> ScheduledTask:
+        """Pick the next task using smooth weighted round-robin over non-empty levels."""
+        self._age(time.monotonic())
+        total = 0
+        best = None
+        for level, queue in enumerate(self._queues):
+            if not queue:
+                self._current_weights[level] = 0
+                continue
+            self._current_weights[level] += self.weights[level]
+            total += self.weights[level]
+            if best is None or self._current_weights[level] > self._current_weights[best]:
+                best = level
+        self._current_weights[best] -= total
+        self._depth -= 1
+        return self._queues[best].popleft()
+
+    async def _worker(self, worker_id: int):
+        while True:
+            async with self._not_empty:
+                await self._not_empty.wait_for(lambda: self._depth > 0)
+                item = self._next()
+
+            if item.future.cancelled():
+                continue
+
+            started = time.monotonic()
+            try:
+                if item.events is not None:
+                    result = await self._stream(item)
+                else:
+                    result = await self.orchestrator.process_task(
+                        task=item.task,
+                        session_id=item.session_id,
+                        context=item.context,
+                        priority=item.priority
+                    )
+                if not item.future.done():
+                    item.future.set_result(result)
+                self.stats["completed"] += 1
+            except asyncio.CancelledError:
+                if not item.future.done():
+                    item.future.cancel()
+                raise
+            except Exception as e:
+                self.logger.error("Scheduled task failed", worker=worker_id, error=str(e))
+                if not item.future.done():
+                    item.future.set_exception(e)
+                self.stats["failed"] += 1
+            finally:
+                # Exponentially weighted average feeds the Retry-After estimate
+                self._avg_duration = 0.9 * self._avg_duration + 0.1 * (time.monotonic() - started)
+
+    async def _stream(self, item: ScheduledTask) -> Optional[Dict[str, Any]]:
+        result = None
+
+        async def forward():
+            nonlocal result
+            stream = self.orchestrator.process_task_stream(
+                task=item.task,
+                session_id=item.session_id,
+                context=item.context,
+                priority=item.priority
+            )
+            try:
+                async for event in stream:
+                    item.events.put_nowait(event)
+                    if event["event"] == "done":
+                        result = event["result"]
+            finally:
+                await stream.aclose()
+
+        forwarding = asyncio.ensure_future(forward())
+        # The client going away cancels its future; stop the task (and its running steps) then
+        item.future.add_done_callback(lambda future: future.cancelled() and forwarding.cancel())
+        try:
+            await forwarding
+        except asyncio.CancelledError:
+            if not item.future.cancelled():
+                raise
+        return result
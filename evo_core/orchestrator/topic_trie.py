@@ -0,0 +1,112 @@
+# evo_core/orchestrator/topic_trie.py
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import fnmatch
+import re
+
+SEPARATOR = "."
+SINGLE = "*"   # exactly one segment
+MULTI = "#"    # zero or more segments
+
+
+class _Node:
+    __slots__ = ("children", "globs", "single", "multi", "values")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.globs: List[Tuple[str, re.Pattern, "_Node"]] = []
+        self.single: Optional["_Node"] = None
+        self.multi: Optional["_Node"] = None
+        self.values: List[Any] = []
+
+
+class TopicTrie:
+    """Dotted-topic pattern index.
+
+    Patterns are split on ``.``; each segment is a literal, ``*`` (one segment),
+    ``#`` (zero or more segments) or a glob such as ``Payment*``. Lookups walk
+    the trie once per topic segment, so their cost depends on the topic depth
+    and the wildcards on the path, not on how many patterns are stored.
+    Results are memoized per topic until the next ``insert``/``remove``;
+    ``key`` optionally orders them before they are cached.
+    """
+
+    def __init__(self, cache_size: int = 4096, key: Optional[Callable[[Any], Any]] = None):
+        self._root = _Node()
+        self._cache: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self.cache_size = cache_size
+        self.key = key
+
+    def insert(self, pattern: str, value: Any):
+        node = self._root
+        for segment in pattern.split(SEPARATOR):
+            node = self._child(node, segment)
+        node.values.append(value)
+        self._cache.clear()
+
+    def remove(self, pattern: str, value: Any) -> bool:
+        node = self._root
+        for segment in pattern.split(SEPARATOR):
+            node = self._child(node, segment)
+        try:
+            node.values.remove(value)
+        except ValueError:
+            return False
+        self._cache.clear()
+        return True
+
+    def match(self, topic: str) -> List[Any]:
+        """Return every value whose pattern matches ``topic``."""
+        cached = self._cache.get(topic)
+        if cached is not None:
+            self._cache.move_to_end(topic)
+            return cached
+
+        found: Dict[int, Any] = {}
+        self._walk(self._root, topic.split(SEPARATOR), 0, found)
+        result = list(found.values())
+        if self.key is not None:
+            result.sort(key=self.key)
+
+        self._cache[topic] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _child(node: _Node, segment: str) -> _Node:
+        if segment == MULTI:
+            node.multi = node.multi or _Node()
+            return node.multi
+        if segment == SINGLE:
+            node.single = node.single or _Node()
+            return node.single
+        if any(c in segment for c in "*?["):
+            for glob, _, child in node.globs:
+                if glob == segment:
+                    return child
+            child = _Node()
+            node.globs.append((segment, re.compile(fnmatch.translate(segment)), child))
+            return child
+        return node.children.setdefault(segment, _Node())
+
+    def _walk(self, node: _Node, segments: List[str], i: int, found: Dict[int, Any]):
+        if node.multi is not None:
+            for j in range(i, len(segments) + 1):
+                self._walk(node.multi, segments, j, found)
+        self._walk_exact(node, segments, i, found)
+
+    def _walk_exact(self, node: _Node, segments: List[str], i: int, found: Dict[int, Any]):
+        if i == len(segments):
+            for value in node.values:
+                found.setdefault(id(value), value)
+            return
+        segment = segments[i]
+        child = node.children.get(segment)
+        if child is not None:
+            self._walk(child, segments, i + 1, found)
+        if node.single is not None:
+            self._walk(node.single, segments, i + 1, found)
+        for _, regex, glob_child in node.globs:
+            if regex.match(segment):
+                self._walk(glob_child, segments, i + 1, found)
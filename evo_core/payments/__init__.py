@@ -0,0 +1,5 @@
+from .signatures import SignatureError, verify_stripe, verify_payfast, PayPalVerifier
+from .webhooks import WebhookIngestor
+from .bank_files import BankFileGenerator, BankFileWriter, BatchInfo, Payout, WRITERS, register_writer
+from .payout_runs import PayoutRunner, PayoutRunError
+from .invoices import InvoiceBatchRenderer, InvoiceSink, DirectorySink, ZipSink, document_name, group_line_items
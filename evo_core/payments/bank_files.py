@@ -0,0 +1,444 @@
+# evo_core/payments/bank_files.py
+"""Streaming bulk payout files.
+
+``BankFileGenerator.generate`` consumes any iterable of payouts once and
+writes them in chunks, so memory stays constant however many rows there
+are: one chunk buffer per open output file. Row count, amount total, an
+account-number hash total and a SHA-256 of every file are computed while
+writing. Output can be split per bank and/or capped at a row or byte limit
+per file, and a ``manifest.json`` lists every file with its control totals.
+
+Formats are pluggable ``BankFileWriter`` subclasses registered in
+``WRITERS``: ``csv``, ``csv_semicolon``, ``fixed_width`` and ``pain001``
+(ISO 20022 pain.001.001.03 credit transfer XML).
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Type, Union
+from xml.sax.saxutils import escape
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import unicodedata
+
+from evo_core.memory.ledger import to_cents
+
+# Bank hash totals conventionally keep the last 18 digits
+HASH_MODULUS = 10 ** 18
+
+
+class Payout(NamedTuple):
+    beneficiary: str
+    account: str
+    amount_cents: int
+    reference: str = ""
+    bank: str = "default"
+    branch_code: str = ""
+    currency: str = "ZAR"
+
+
+def to_payout(item: Union[Payout, Mapping[str, Any]]) -> Payout:
+    """Accept a ``Payout`` or a mapping with ``amount`` (major units) or ``amount_cents``."""
+    if isinstance(item, Payout):
+        return item
+    cents = item.get("amount_cents")
+    return Payout(
+        beneficiary=str(item["beneficiary"]),
+        account=str(item["account"]),
+        amount_cents=int(cents) if cents is not None else to_cents(item["amount"]),
+        reference=str(item.get("reference") or ""),
+        bank=str(item.get("bank") or "default"),
+        branch_code=str(item.get("branch_code") or ""),
+        currency=str(item.get("currency") or "ZAR"),
+    )
+
+
+@dataclass
+class BatchInfo:
+    """Debtor and batch details that go into file headers."""
+    debtor_name: str = "Kelnic"
+    debtor_account: str = ""
+    debtor_bic: str = ""
+    execution_date: date = field(default_factory=date.today)
+    message_id: str = field(default_factory=lambda: f"KELNIC-{datetime.now().strftime('%Y%m%d%H%M%S')}")
+
+
+@dataclass
+class ControlTotals:
+    rows: int = 0
+    amount_cents: int = 0
+    account_hash: int = 0
+
+    def add(self, payouts: List[Payout]):
+        self.rows += len(payouts)
+        self.amount_cents += sum(p.amount_cents for p in payouts)
+        digits = sum(int(p.account) if p.account.isdigit() else int(re.sub(r"\D", "", p.account) or 0) for p in payouts)
+        self.account_hash = (self.account_hash + digits) % HASH_MODULUS
+
+
+def _amount(cents: int) -> str:
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def short_id(base: str, suffix: str = "", limit: int = 35) -> str:
+    """``base + suffix`` in at most ``limit`` characters (35 for ISO 20022 ids).
+
+    A base too long to fit is cut and ends with a hash of the whole base, so
+    distinct bases stay distinct and the suffix (e.g. a part number) is
+    always kept."""
+    if len(base) + len(suffix) <= limit:
+        return base + suffix
+    digest = hashlib.blake2b(base.encode(), digest_size=4).hexdigest()
+    return f"{base[:max(limit - len(suffix) - 9, 0)]}-{digest}{suffix}"[-limit:]
+
+
+def _ascii(text: str) -> str:
+    """Fixed-width bank formats are ASCII; strip accents rather than fail."""
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+
+
+class BankFileWriter(ABC):
+    """Formats one output file. ``format_rows`` gets a chunk of payouts and the
+    1-based file sequence number of the first one and returns their text."""
+
+    extension = "txt"
+    # Whether the header carries totals and is rewritten once the file is complete
+    patches_header = False
+
+    def __init__(self, batch: BatchInfo):
+        self.batch = batch
+
+    def header(self, file_id: str) -> str:
+        return ""
+
+    @abstractmethod
+    def format_rows(self, payouts: List[Payout], first_sequence: int) -> str:
+        """Text of ``payouts``, numbered from ``first_sequence``."""
+
+    def trailer(self, totals: ControlTotals) -> str:
+        return ""
+
+    def final_header(self, file_id: str, totals: ControlTotals) -> str:
+        """Header with real totals; must encode to the same length as ``header``."""
+        return self.header(file_id)
+
+
+class CsvWriter(BankFileWriter):
+    extension = "csv"
+    delimiter = ","
+    columns = ["Date", "Beneficiary", "Account", "Branch", "Amount", "Currency", "Reference"]
+
+    def header(self, file_id: str) -> str:
+        return self._rows([self.columns])
+
+    def _rows(self, rows) -> str:
+        out = io.StringIO()
+        csv.writer(out, delimiter=self.delimiter, lineterminator="\n").writerows(rows)
+        return out.getvalue()
+
+    def format_rows(self, payouts: List[Payout], first_sequence: int) -> str:
+        day = self.batch.execution_date.isoformat()
+        return self._rows(
+            (day, p.beneficiary, p.account, p.branch_code, _amount(p.amount_cents), p.currency, p.reference)
+            for p in payouts
+        )
+
+
+class SemicolonCsvWriter(CsvWriter):
+    """European-style CSV: semicolon separated, decimal comma."""
+
+    delimiter = ";"
+
+    def format_rows(self, payouts: List[Payout], first_sequence: int) -> str:
+        day = self.batch.execution_date.strftime("%d.%m.%Y")
+        return self._rows(
+            (day, p.beneficiary, p.account, p.branch_code, _amount(p.amount_cents).replace(".", ","), p.currency, p.reference)
+            for p in payouts
+        )
+
+
+class FixedWidthWriter(BankFileWriter):
+    """Header/detail/trailer records of fixed width (112 characters).
+
+    H: record type, debtor account (16), execution date YYYYMMDD, batch id (35)
+    D: record type, sequence (9), branch (6), account (16), amount in cents (15),
+       beneficiary (35), reference (30)
+    T: record type, record count (9), amount total in cents (18), account hash total (18)
+    """
+
+    extension = "txt"
+    width = 112
+
+    def _line(self, text: str) -> str:
+        return text.ljust(self.width)[:self.width] + "\n"
+
+    def header(self, file_id: str) -> str:
+        b = self.batch
+        return self._line(f"H{_ascii(b.debtor_account)[:16]:<16}{b.execution_date:%Y%m%d}{_ascii(file_id)[:35]:<35}")
+
+    def format_rows(self, payouts: List[Payout], first_sequence: int) -> str:
+        width = self.width
+        return "".join(
+            f"D{seq:09d}{_ascii(p.branch_code)[:6]:<6}{_ascii(p.account)[:16]:<16}{p.amount_cents:015d}"
+            f"{_ascii(p.beneficiary)[:35]:<35}{_ascii(p.reference)[:30]:<30}".ljust(width) + "\n"
+            for seq, p in enumerate(payouts, first_sequence)
+        )
+
+    def trailer(self, totals: ControlTotals) -> str:
+        return self._line(f"T{totals.rows:09d}{totals.amount_cents:018d}{totals.account_hash:018d}")
+
+
+class Pain001Writer(BankFileWriter):
+    """ISO 20022 customer credit transfer initiation (pain.001.001.03).
+
+    NbOfTxs and CtrlSum come before the transactions, so they are written as
+    zero-padded placeholders of fixed width and patched once the file is
+    complete (leading zeros are valid in both fields).
+
+    MsgId and PmtInfId are the generator's file id, unique per output file;
+    each EndToEndId is that id plus the row's sequence in the file, so no two
+    transactions of a batch share one. The payout reference goes into the
+    remittance information.
+    """
+
+    extension = "xml"
+    patches_header = True
+
+    def __init__(self, batch: BatchInfo):
+        super().__init__(batch)
+        self.created = datetime.now().replace(microsecond=0).isoformat()
+        self.file_id = batch.message_id
+
+    def _header(self, file_id: str, rows: int, cents: int) -> str:
+        b = self.batch
+        count = f"{rows:015d}"
+        total = f"{cents // 100:015d}.{cents % 100:02d}"
+        if b.debtor_bic:
+            agent = f"<FinInstnId><BIC>{escape(b.debtor_bic)}</BIC></FinInstnId>"
+        else:
+            agent = "<FinInstnId><Othr><Id>NOTPROVIDED</Id></Othr></FinInstnId>"
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<Document xmlns="urn:iso:std:iso:20022:tech:xsd:pain.001.001.03"><CstmrCdtTrfInitn>\n'
+            f"<GrpHdr><MsgId>{escape(short_id(file_id))}</MsgId><CreDtTm>{self.created}</CreDtTm>"
+            f"<NbOfTxs>{count}</NbOfTxs><CtrlSum>{total}</CtrlSum><InitgPty><Nm>{escape(b.debtor_name[:140])}</Nm></InitgPty></GrpHdr>\n"
+            f"<PmtInf><PmtInfId>{escape(short_id(file_id))}</PmtInfId><PmtMtd>TRF</PmtMtd>"
+            f"<NbOfTxs>{count}</NbOfTxs><CtrlSum>{total}</CtrlSum>"
+            f"<ReqdExctnDt>{b.execution_date.isoformat()}</ReqdExctnDt>"
+            f"<Dbtr><Nm>{escape(b.debtor_name[:140])}</Nm></Dbtr>"
+            f"<DbtrAcct><Id><Othr><Id>{escape(b.debtor_account[:34])}</Id></Othr></Id></DbtrAcct>"
+            f"<DbtrAgt>{agent}</DbtrAgt>\n"
+        )
+
+    def header(self, file_id: str) -> str:
+        self.file_id = file_id
+        return self._header(file_id, 0, 0)
+
+    def final_header(self, file_id: str, totals: ControlTotals) -> str:
+        return self._header(file_id, totals.rows, totals.amount_cents)
+
+    def format_rows(self, payouts: List[Payout], first_sequence: int) -> str:
+        parts = []
+        for seq, p in enumerate(payouts, first_sequence):
+            end_to_end = escape(short_id(self.file_id, f"-{seq}"))
+            agent = (
+                f"<CdtrAgt><FinInstnId><ClrSysMmbId><MmbId>{escape(p.branch_code[:35])}</MmbId></ClrSysMmbId></FinInstnId></CdtrAgt>"
+                if p.branch_code else ""
+            )
+            remittance = f"<RmtInf><Ustrd>{escape(p.reference[:140])}</Ustrd></RmtInf>" if p.reference else ""
+            parts.append(
+                f"<CdtTrfTxInf><PmtId><EndToEndId>{end_to_end}</EndToEndId></PmtId>"
+                f'<Amt><InstdAmt Ccy="{escape(p.currency)}">{_amount(p.amount_cents)}</InstdAmt></Amt>'
+                f"{agent}<Cdtr><Nm>{escape(p.beneficiary[:140])}</Nm></Cdtr>"
+                f"<CdtrAcct><Id><Othr><Id>{escape(p.account[:34])}</Id></Othr></Id></CdtrAcct>"
+                f"{remittance}</CdtTrfTxInf>\n"
+            )
+        return "".join(parts)
+
+    def trailer(self, totals: ControlTotals) -> str:
+        return "</PmtInf></CstmrCdtTrfInitn></Document>\n"
+
+
+WRITERS: Dict[str, Type[BankFileWriter]] = {
+    "csv": CsvWriter,
+    "csv_semicolon": SemicolonCsvWriter,
+    "fixed_width": FixedWidthWriter,
+    "pain001": Pain001Writer,
+}
+
+
+def register_writer(name: str, writer: Type[BankFileWriter]):
+    WRITERS[name] = writer
+
+
+class _OutputFile:
+    def __init__(self, path: str, file_id: str, bank: str, writer: BankFileWriter):
+        self.path = path
+        self.file_id = file_id
+        self.bank = bank
+        self.writer = writer
+        self.totals = ControlTotals()
+        self.buffer: List[Payout] = []
+        self.sha256 = hashlib.sha256()
+        self.handle = open(path, "wb")
+        self.size = 0
+        self.header_size = self.write(writer.header(file_id))
+        self.trailer_reserve = len(writer.trailer(ControlTotals(10 ** 8, 10 ** 17, HASH_MODULUS - 1)).encode())
+
+    def write(self, text: str) -> int:
+        data = text.encode()
+        self.handle.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def close(self) -> Dict[str, Any]:
+        self.write(self.writer.trailer(self.totals))
+        digest = self.sha256.hexdigest()
+        if self.writer.patches_header:
+            header = self.writer.final_header(self.file_id, self.totals).encode()
+            if len(header) != self.header_size:
+                raise RuntimeError(f"{type(self.writer).__name__} changed header length")
+            self.handle.seek(0)
+            self.handle.write(header)
+            self.handle.flush()
+            # The digest covered the placeholder header; hash the final file again
+            digest = _file_sha256(self.path)
+        self.handle.close()
+        return {
+            "path": self.path,
+            "file_id": self.file_id,
+            "bank": self.bank,
+            "rows": self.totals.rows,
+            "total": _amount(self.totals.amount_cents),
+            "total_cents": self.totals.amount_cents,
+            "account_hash": self.totals.account_hash,
+            "bytes": self.size,
+            "sha256": digest,
+        }
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BankFileGenerator:
+    def __init__(
+        self,
+        output_dir: str,
+        fmt: str = "csv",
+        split_by_bank: bool = False,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        chunk_size: int = 5000,
+        batch: Optional[BatchInfo] = None,
+        prefix: str = "payout",
+        write_manifest: bool = True,
+    ):
+        if fmt not in WRITERS:
+            raise ValueError(f"Unknown bank file format {fmt!r}; choose from {sorted(WRITERS)}")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.split_by_bank = split_by_bank
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size if not max_rows else min(chunk_size, max_rows)
+        self.batch = batch or BatchInfo()
+        self.prefix = prefix
+        self.write_manifest = write_manifest
+
+    def generate(self, payouts: Iterable[Union[Payout, Mapping[str, Any]]]) -> Dict[str, Any]:
+        """Write every payout; returns the manifest (also saved as manifest.json unless disabled)."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        open_files: Dict[str, _OutputFile] = {}
+        parts: Dict[str, int] = {}
+        done: List[Dict[str, Any]] = []
+        try:
+            for item in payouts:
+                payout = to_payout(item)
+                if payout.amount_cents <= 0:
+                    raise ValueError(f"Payout amount must be positive: {payout}")
+                key = payout.bank if self.split_by_bank else "all"
+                output = open_files.get(key)
+                if output is None:
+                    output = open_files[key] = self._open(key, parts)
+                output.buffer.append(payout)
+                if len(output.buffer) >= self.chunk_size:
+                    open_files[key] = self._flush(output, parts, done)
+            for output in open_files.values():
+                output = self._flush(output, parts, done)
+                done.append(output.close())
+        except BaseException:
+            for output in open_files.values():
+                output.handle.close()
+            raise
+
+        manifest = {
+            "format": self.fmt,
+            "message_id": self.batch.message_id,
+            "execution_date": self.batch.execution_date.isoformat(),
+            "files": done,
+            "rows": sum(f["rows"] for f in done),
+            "total": _amount(sum(f["total_cents"] for f in done)),
+        }
+        if self.write_manifest:
+            with open(os.path.join(self.output_dir, "manifest.json"), "w") as f:
+                json.dump(manifest, f, indent=2)
+        return manifest
+
+    def _open(self, key: str, parts: Dict[str, int]) -> _OutputFile:
+        part = parts[key] = parts.get(key, 0) + 1
+        name = f"{self.prefix}_{self.batch.execution_date:%Y%m%d}"
+        if self.split_by_bank:
+            name += f"_{re.sub(r'[^A-Za-z0-9]+', '-', key)}"
+        file_id = short_id(self.batch.message_id, f"-{self._bank_tag(key) if self.split_by_bank else 'ALL'}-{part}")
+        writer = WRITERS[self.fmt](self.batch)
+        return _OutputFile(os.path.join(self.output_dir, f"{name}_{part:03d}.{writer.extension}"), file_id, key, writer)
+
+    @staticmethod
+    def _bank_tag(bank: str) -> str:
+        # The bank code itself when short and plain, else a hash of it: distinct banks get distinct ids
+        if re.fullmatch(r"[A-Za-z0-9]{1,8}", bank):
+            return bank
+        return hashlib.blake2b(bank.encode(), digest_size=3).hexdigest()
+
+    def _flush(self, output: _OutputFile, parts: Dict[str, int], done: List[Dict[str, Any]]) -> _OutputFile:
+        """Write the buffered chunk, rolling over to new files at the row/byte limits."""
+        pending, output.buffer = output.buffer, []
+        while pending:
+            if self.max_rows and output.totals.rows >= self.max_rows:
+                output = self._roll(output, parts, done)
+            room = self.max_rows - output.totals.rows if self.max_rows else len(pending)
+            chunk, pending = pending[:room], pending[room:]
+            text = output.writer.format_rows(chunk, output.totals.rows + 1)
+            if self.max_bytes and output.size + len(text.encode()) + output.trailer_reserve > self.max_bytes:
+                # Over the byte limit: take only the rows that still fit, one at a time
+                fitted = 0
+                for payout in chunk:
+                    row = output.writer.format_rows([payout], output.totals.rows + 1)
+                    if output.totals.rows and output.size + len(row.encode()) + output.trailer_reserve > self.max_bytes:
+                        break
+                    output.write(row)
+                    output.totals.add([payout])
+                    fitted += 1
+                pending = chunk[fitted:] + pending
+                if pending:
+                    output = self._roll(output, parts, done)
+                continue
+            output.write(text)
+            output.totals.add(chunk)
+        return output
+
+    def _roll(self, output: _OutputFile, parts: Dict[str, int], done: List[Dict[str, Any]]) -> _OutputFile:
+        done.append(output.close())
+        return self._open(output.bank, parts)
@@ -0,0 +1,431 @@
+# evo_core/payments/invoices.py
+"""Bulk invoice rendering.
+
+``InvoiceBatchRenderer.run`` streams invoice records (any iterable, e.g.
+``group_line_items`` over a line-item export) in chunks to a process pool
+that renders HTML and PDF documents, and hands finished documents to a
+pluggable ``InvoiceSink`` as chunks complete. At most ``max_in_flight``
+chunks are outstanding, so memory is bounded however many invoices there
+are. A failing invoice is reported and skipped without affecting the rest
+of its chunk. If a worker process dies, the pool is replaced once and the
+chunks that were in flight are submitted again; a chunk that crashes a
+second time is rendered one invoice at a time in a pool of its own, so
+only the invoice that kills its worker fails.
+
+Templates use ``{{ field }}`` placeholders and are compiled once per
+process into ``str.format_map`` calls (cached by path and mtime), so
+rendering an invoice is a few C-level string formats. Values are
+HTML-escaped unless the field name ends in ``_html``. The PDF writer is a
+small built-in one (text and rules, Helvetica) with no extra dependencies.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from html import escape
+from itertools import groupby, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import asyncio
+import os
+import re
+import time
+import zipfile
+
+import structlog
+
+from evo_core.memory.ledger import from_cents, to_cents
+
+logger = structlog.get_logger()
+
+INVOICE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Invoice {{invoice_id}}</title>
+<style>body{font-family:Helvetica,Arial,sans-serif;margin:40px}table{width:100%;border-collapse:collapse}
+td,th{padding:6px;border-bottom:1px solid #ddd;text-align:left}.num{text-align:right}</style></head>
+<body>
+<h1>{{seller_name}}</h1>
+<p>Invoice <strong>{{invoice_id}}</strong><br>Issued {{issue_date}} &middot; Due {{due_date}}</p>
+<p>Bill to:<br>{{customer_name}}<br>{{customer_email}}<br>{{customer_address}}</p>
+<table><thead><tr><th>Description</th><th class="num">Qty</th><th class="num">Unit price</th><th class="num">Amount</th></tr></thead>
+<tbody>
+{{lines_html}}
+</tbody></table>
+<p class="num">Subtotal {{currency}} {{subtotal}}<br>Tax ({{tax_percent}}%) {{currency}} {{tax}}<br><strong>Total {{currency}} {{total}}</strong></p>
+</body></html>
+"""
+
+LINE_TEMPLATE = (
+    '<tr><td>{{description}}</td><td class="num">{{quantity}}</td>'
+    '<td class="num">{{unit_price}}</td><td class="num">{{amount}}</td></tr>'
+)
+
+BUILTIN_TEMPLATES = {"invoice": INVOICE_TEMPLATE, "invoice_line": LINE_TEMPLATE}
+
+
+class CompiledTemplate:
+    PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+    def __init__(self, source: str):
+        parts, fields, last = [], [], 0
+        for match in self.PLACEHOLDER.finditer(source):
+            # Literal braces (CSS) must survive str.format
+            parts.append(source[last:match.start()].replace("{", "{{").replace("}", "}}"))
+            parts.append("{" + match.group(1) + "}")
+            fields.append(match.group(1))
+            last = match.end()
+        parts.append(source[last:].replace("{", "{{").replace("}", "}}"))
+        self.fields = tuple(dict.fromkeys(fields))
+        self._raw = {f for f in self.fields if f.endswith("_html")}
+        self._format = "".join(parts).format_map
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        return self._format({
+            f: (values.get(f, "") if f in self._raw else escape(str(values.get(f, ""))))
+            for f in self.fields
+        })
+
+
+_TEMPLATES: Dict[Tuple[Optional[str], str], Tuple[float, CompiledTemplate]] = {}
+
+
+def get_template(name: str, template_dir: Optional[str] = None) -> CompiledTemplate:
+    """``<template_dir>/<name>.html`` if it exists, else the built-in template;
+    compiled once per process and recompiled only when the file changes."""
+    path = os.path.join(template_dir, f"{name}.html") if template_dir else None
+    mtime = os.path.getmtime(path) if path and os.path.exists(path) else 0.0
+    cached = _TEMPLATES.get((template_dir, name))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    if mtime:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    else:
+        source = BUILTIN_TEMPLATES[name]
+    template = CompiledTemplate(source)
+    _TEMPLATES[(template_dir, name)] = (mtime, template)
+    return template
+
+
+def group_line_items(rows: Iterable[Mapping[str, Any]], key: str = "invoice_id") -> Iterator[Dict[str, Any]]:
+    """Turn a stream of line-item rows sorted by ``key`` into invoices: the first
+    row of each group supplies the invoice fields, every row one line."""
+    for invoice_id, group in groupby(rows, key=lambda row: row[key]):
+        first = next(group)
+        invoice = {k: v for k, v in first.items() if k not in ("description", "quantity", "unit_price")}
+        invoice["lines"] = [first, *group]
+        yield invoice
+
+
+def _money(cents: int) -> str:
+    return f"{from_cents(cents):,.2f}"
+
+
+def prepare_invoice(invoice: Mapping[str, Any]) -> Dict[str, Any]:
+    """Line amounts and totals (in cents) plus every template field."""
+    issue = invoice.get("issue_date") or date.today()
+    if isinstance(issue, str):
+        issue = datetime.strptime(issue[:10], "%Y-%m-%d").date()
+    due = issue + timedelta(days=int(invoice.get("due_days", 30)))
+    tax_rate = Decimal(str(invoice.get("tax_rate", 0)))
+
+    lines, subtotal = [], 0
+    for line in invoice["lines"]:
+        quantity = Decimal(str(line.get("quantity", 1)))
+        unit = to_cents(line["unit_price"])
+        amount = int((quantity * unit).to_integral_value())
+        subtotal += amount
+        lines.append({
+            "description": line.get("description", ""),
+            "quantity": f"{quantity.normalize():f}",
+            "unit_price": _money(unit),
+            "amount": _money(amount),
+        })
+    tax = int((subtotal * tax_rate).to_integral_value())
+    customer = invoice.get("customer") or {}
+    return {
+        "invoice_id": str(invoice["invoice_id"]),
+        "seller_name": invoice.get("seller_name") or os.getenv("INVOICE_SELLER_NAME", "Kelnic"),
+        "customer_name": customer.get("name") or invoice.get("customer_name", ""),
+        "customer_email": customer.get("email") or invoice.get("customer_email", ""),
+        "customer_address": customer.get("address") or invoice.get("customer_address", ""),
+        "currency": invoice.get("currency", "ZAR"),
+        "issue_date": issue.isoformat(),
+        "due_date": due.isoformat(),
+        "tax_percent": f"{(tax_rate * 100).normalize():f}",
+        "subtotal": _money(subtotal),
+        "tax": _money(tax),
+        "total": _money(subtotal + tax),
+        "total_cents": subtotal + tax,
+        "lines": lines,
+    }
+
+
+def render_html(prepared: Mapping[str, Any], template_dir: Optional[str] = None) -> str:
+    line = get_template("invoice_line", template_dir)
+    return get_template("invoice", template_dir).render(
+        {**prepared, "lines_html": "\n".join(line.render(l) for l in prepared["lines"])}
+    )
+
+
+def _pdf_text(text: str) -> str:
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(prepared: Mapping[str, Any], lines_per_page: int = 40) -> bytes:
+    """A4 text-only PDF: header on every page, line items, totals on the last."""
+    pages = []
+    items = prepared["lines"] or [{"description": "", "quantity": "", "unit_price": "", "amount": ""}]
+    chunks = [items[i:i + lines_per_page] for i in range(0, len(items), lines_per_page)]
+    for number, chunk in enumerate(chunks, 1):
+        ops = ["BT /F2 16 Tf 50 790 Td (" + _pdf_text(prepared["seller_name"]) + ") Tj ET"]
+        header = [
+            f"Invoice {prepared['invoice_id']}    Issued {prepared['issue_date']}    Due {prepared['due_date']}",
+            f"Bill to: {prepared['customer_name']}  {prepared['customer_email']}",
+            prepared["customer_address"],
+        ]
+        y = 765
+        for text in header:
+            ops.append(f"BT /F1 10 Tf 50 {y} Td ({_pdf_text(str(text))}) Tj ET")
+            y -= 14
+        y -= 10
+        ops.append(f"BT /F2 10 Tf 50 {y} Td (Description) Tj 300 0 Td (Qty) Tj 60 0 Td (Unit) Tj 80 0 Td (Amount) Tj ET")
+        ops.append(f"50 {y - 4} m 545 {y - 4} l S")
+        y -= 18
+        for line in chunk:
+            ops.append(
+                f"BT /F1 10 Tf 50 {y} Td ({_pdf_text(str(line['description'])[:55])}) Tj "
+                f"300 0 Td ({_pdf_text(line['quantity'])}) Tj 60 0 Td ({_pdf_text(line['unit_price'])}) Tj "
+                f"80 0 Td ({_pdf_text(line['amount'])}) Tj ET"
+            )
+            y -= 15
+        if number == len(chunks):
+            y -= 10
+            for label, value, font in (("Subtotal", prepared["subtotal"], "F1"),
+                                       (f"Tax ({prepared['tax_percent']}%)", prepared["tax"], "F1"),
+                                       ("Total", prepared["total"], "F2")):
+                ops.append(f"BT /{font} 10 Tf 360 {y} Td ({_pdf_text(label)}) Tj 130 0 Td "
+                           f"({_pdf_text(prepared['currency'] + ' ' + value)}) Tj ET")
+                y -= 15
+        ops.append(f"BT /F1 8 Tf 50 40 Td (Page {number} of {len(chunks)}) Tj ET")
+        pages.append("\n".join(ops).encode("latin-1"))
+
+    # Objects: 1 catalog, 2 pages, 3-4 fonts, then a page and a content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for content in pages:
+        page_id = len(objects) + 1
+        kids.append(f"{page_id} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {page_id + 1} 0 R "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+RenderResult = Tuple[str, Optional[Dict[str, bytes]], Optional[str], int]
+
+
+def render_invoices(invoices: List[Mapping[str, Any]], formats: Tuple[str, ...], template_dir: Optional[str] = None) -> List[RenderResult]:
+    """Render a chunk; runs in pool workers. Each invoice succeeds or fails on its own:
+    ``(invoice_id, {format: bytes} or None, error or None, total_cents)``."""
+    results = []
+    for invoice in invoices:
+        invoice_id = str(invoice.get("invoice_id", "?"))
+        try:
+            prepared = prepare_invoice(invoice)
+            documents = {}
+            if "html" in formats:
+                documents["html"] = render_html(prepared, template_dir).encode()
+            if "pdf" in formats:
+                documents["pdf"] = render_pdf(prepared)
+            results.append((invoice_id, documents, None, prepared["total_cents"]))
+        except Exception as e:
+            results.append((invoice_id, None, f"{type(e).__name__}: {e}", 0))
+    return results
+
+
+def document_name(invoice_id: str) -> str:
+    """File name stem for an invoice's documents: the id made safe for paths and archives."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", invoice_id)
+
+
+class InvoiceSink(ABC):
+    """Destination for rendered invoices. ``write`` runs in a worker thread."""
+
+    @abstractmethod
+    def write(self, invoice_id: str, documents: Dict[str, bytes]):
+        """Store ``documents`` (``{format: bytes}``) for ``invoice_id``."""
+
+    def close(self):
+        pass
+
+
+class DirectorySink(InvoiceSink):
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, invoice_id: str, fmt: str) -> str:
+        return os.path.join(self.directory, f"{document_name(invoice_id)}.{fmt}")
+
+    def write(self, invoice_id: str, documents: Dict[str, bytes]):
+        for fmt, data in documents.items():
+            with open(self.path(invoice_id, fmt), "wb") as f:
+                f.write(data)
+
+
+class ZipSink(InvoiceSink):
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, invoice_id: str, documents: Dict[str, bytes]):
+        name = document_name(invoice_id)
+        for fmt, data in documents.items():
+            self._zip.writestr(f"{name}.{fmt}", data)
+
+    def close(self):
+        self._zip.close()
+
+
+class InvoiceBatchRenderer:
+    def __init__(
+        self,
+        sink: InvoiceSink,
+        formats: Tuple[str, ...] = ("html", "pdf"),
+        workers: Optional[int] = None,
+        chunk_size: int = 100,
+        max_in_flight: Optional[int] = None,
+        template_dir: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        max_failures_reported: int = 100,
+    ):
+        """``workers`` processes render chunks of ``chunk_size`` invoices (0 renders
+        in a thread of this process). ``on_progress`` is called with the running
+        counts after every chunk."""
+        unknown = set(formats) - {"html", "pdf"}
+        if unknown:
+            raise ValueError(f"Unsupported invoice formats: {sorted(unknown)}")
+        self.sink = sink
+        self.formats = tuple(formats)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or max(self.workers, 1) * 2
+        self.template_dir = template_dir if template_dir is not None else os.getenv("INVOICE_TEMPLATE_DIR")
+        self.on_progress = on_progress
+        self.max_failures_reported = max_failures_reported
+        self.logger = logger.bind(component="InvoiceBatchRenderer")
+
+    async def run(self, invoices: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        generation = 0
+        progress = {"rendered": 0, "failed": 0, "total_cents": 0}
+        failures: List[Dict[str, str]] = []
+        slots = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+        started = time.perf_counter()
+
+        async def render(chunk: List[Mapping[str, Any]], retried: bool = False) -> List[RenderResult]:
+            nonlocal pool, generation
+            submitted = generation
+            try:
+                return await loop.run_in_executor(pool, render_invoices, chunk, self.formats, self.template_dir)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory). Every chunk in flight on the
+                # broken pool ends up here; only the first one replaces it.
+                if submitted == generation:
+                    self.logger.error("Invoice worker pool broke", error=str(e))
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(self.workers)
+                    generation += 1
+            if not retried:
+                return await render(chunk, retried=True)
+            self.logger.warning("Invoice chunk crashed twice, isolating its invoices", invoices=len(chunk))
+            return await self._render_isolated(chunk)
+
+        async def process(chunk: List[Mapping[str, Any]]):
+            try:
+                results = await render(chunk)
+                done = [(invoice_id, documents) for invoice_id, documents, error, _ in results if error is None]
+                await asyncio.to_thread(self._write, done)
+                for invoice_id, documents, error, cents in results:
+                    if error is None:
+                        progress["rendered"] += 1
+                        progress["total_cents"] += cents
+                    else:
+                        progress["failed"] += 1
+                        if len(failures) < self.max_failures_reported:
+                            failures.append({"invoice_id": invoice_id, "error": error})
+                if self.on_progress is not None:
+                    outcome = self.on_progress(dict(progress))
+                    if asyncio.iscoroutine(outcome):
+                        await outcome
+            finally:
+                slots.release()
+
+        try:
+            source = iter(invoices)
+            while True:
+                chunk = list(islice(source, self.chunk_size))
+                if not chunk:
+                    break
+                await slots.acquire()
+                task = asyncio.ensure_future(process(chunk))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+            await asyncio.to_thread(self.sink.close)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "rendered": progress["rendered"],
+            "failed": progress["failed"],
+            "total_amount": float(from_cents(progress["total_cents"])),
+            "failures": failures,
+            "elapsed_seconds": round(elapsed, 3),
+            "invoices_per_second": round((progress["rendered"] + progress["failed"]) / elapsed, 1) if elapsed else None,
+        }
+
+    async def _render_isolated(self, chunk: List[Mapping[str, Any]]) -> List[RenderResult]:
+        """One invoice at a time in a single-worker pool: a crash fails only the invoice that caused it."""
+        loop = asyncio.get_running_loop()
+        results: List[RenderResult] = []
+        pool = ProcessPoolExecutor(1)
+        try:
+            for invoice in chunk:
+                try:
+                    results += await loop.run_in_executor(pool, render_invoices, [invoice], self.formats, self.template_dir)
+                except BrokenProcessPool as e:
+                    results.append((str(invoice.get("invoice_id", "?")), None, f"Worker crashed: {e}", 0))
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(1)
+        finally:
+            pool.shutdown(wait=False)
+        return results
+
+    def _write(self, done: List[Tuple[str, Dict[str, bytes]]]):
+        for invoice_id, documents in done:
+            self.sink.write(invoice_id, documents)
@@ -0,0 +1,119 @@
+# evo_core/payments/signatures.py
+"""Webhook signature checks for Stripe, PayPal and PayFast.
+
+Stripe and PayFast are verified locally with their shared secrets (an HMAC
+and an MD5 digest), in microseconds. PayPal signs with an RSA certificate
+that is downloaded from PayPal once per certificate URL and cached, so only
+the first webhook after a certificate rotation waits on the network.
+"""
+from typing import Dict, Mapping, Optional
+from urllib.parse import parse_qsl, quote_plus, urlparse
+import base64
+import hashlib
+import hmac
+import time
+import zlib
+
+import httpx
+
+
+class SignatureError(ValueError):
+    pass
+
+
+def verify_stripe(payload: bytes, header: Optional[str], secret: Optional[str], tolerance: int = 300):
+    """Check a ``Stripe-Signature`` header (``t=...,v1=...``) against ``payload``."""
+    if not secret:
+        raise SignatureError("STRIPE_WEBHOOK_SECRET is not configured")
+    if not header:
+        raise SignatureError("Missing Stripe-Signature header")
+    timestamp, signatures = None, []
+    for part in header.split(","):
+        key, _, value = part.strip().partition("=")
+        if key == "t":
+            timestamp = value
+        elif key == "v1":
+            signatures.append(value)
+    if timestamp is None or not signatures:
+        raise SignatureError("Malformed Stripe-Signature header")
+    try:
+        age = abs(time.time() - int(timestamp))
+    except ValueError:
+        raise SignatureError("Malformed Stripe-Signature timestamp")
+    if age > tolerance:
+        raise SignatureError("Stripe signature timestamp outside tolerance")
+    expected = hmac.new(secret.encode(), timestamp.encode() + b"." + payload, hashlib.sha256).hexdigest()
+    if not any(hmac.compare_digest(expected, signature) for signature in signatures):
+        raise SignatureError("Stripe signature mismatch")
+
+
+def verify_payfast(payload: bytes, passphrase: Optional[str]) -> Dict[str, str]:
+    """Check the ``signature`` field of a PayFast ITN post and return its fields.
+
+    The signature is the MD5 of every other field, URL-encoded in the order
+    received, followed by the merchant passphrase when one is set.
+    """
+    fields = parse_qsl(payload.decode(), keep_blank_values=True)
+    received = dict(fields).get("signature")
+    if not received:
+        raise SignatureError("Missing PayFast signature")
+    pairs = [f"{key}={quote_plus(value.strip())}" for key, value in fields if key != "signature"]
+    if passphrase:
+        pairs.append(f"passphrase={quote_plus(passphrase.strip())}")
+    expected = hashlib.md5("&".join(pairs).encode()).hexdigest()
+    if not hmac.compare_digest(expected, received):
+        raise SignatureError("PayFast signature mismatch")
+    return dict(fields)
+
+
+class PayPalVerifier:
+    """Offline PayPal webhook verification.
+
+    PayPal signs ``transmission_id|transmission_time|webhook_id|crc32(body)``
+    with SHA256withRSA; the certificate comes from ``paypal-cert-url``, which
+    must be an https URL on a paypal.com host.
+    """
+
+    def __init__(self, webhook_id: Optional[str]):
+        self.webhook_id = webhook_id
+        self._certificates: Dict[str, object] = {}
+
+    async def _public_key(self, cert_url: str):
+        key = self._certificates.get(cert_url)
+        if key is not None:
+            return key
+        parsed = urlparse(cert_url)
+        host = parsed.hostname or ""
+        if parsed.scheme != "https" or not (host == "paypal.com" or host.endswith(".paypal.com")):
+            raise SignatureError(f"Untrusted PayPal certificate URL: {cert_url}")
+        from cryptography import x509
+
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(cert_url)
+            response.raise_for_status()
+        certificate = x509.load_pem_x509_certificate(response.content)
+        key = self._certificates[cert_url] = certificate.public_key()
+        return key
+
+    async def verify(self, payload: bytes, headers: Mapping[str, str]):
+        if not self.webhook_id:
+            raise SignatureError("PAYPAL_WEBHOOK_ID is not configured")
+        transmission_id = headers.get("paypal-transmission-id")
+        transmission_time = headers.get("paypal-transmission-time")
+        signature = headers.get("paypal-transmission-sig")
+        cert_url = headers.get("paypal-cert-url")
+        if not (transmission_id and transmission_time and signature and cert_url):
+            raise SignatureError("Missing PayPal transmission headers")
+        if headers.get("paypal-auth-algo", "SHA256withRSA") != "SHA256withRSA":
+            raise SignatureError("Unsupported PayPal signature algorithm")
+
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        message = f"{transmission_id}|{transmission_time}|{self.webhook_id}|{zlib.crc32(payload)}".encode()
+        key = await self._public_key(cert_url)
+        try:
+            key.verify(base64.b64decode(signature), message, padding.PKCS1v15(), hashes.SHA256())
+        except (InvalidSignature, ValueError):
+            raise SignatureError("PayPal signature mismatch")
@@ -0,0 +1,206 @@
+# evo_core/payments/webhooks.py
+"""Fast-ack ingestion of payment-provider webhooks.
+
+``WebhookIngestor.ingest`` does only what must happen before answering the
+provider: verify the signature, pull out the provider's event id and append
+the raw body to a durable ``WebhookQueue`` (which drops duplicate ids).
+A consumer task reads the queue in batches, normalizes completed payments
+into ``payment_success`` MessageBus events (for BookkeeperAgent and the
+business metrics) and acknowledges the batch once the bus has handled it
+and, with a ``ledger``, the resulting journal entries are committed.
+
+Delivery to the bus is at-least-once: a crash between publishing a batch
+and acknowledging it re-publishes that batch on restart. BookkeeperAgent
+books each provider event id once, so the ledger does not double-count.
+"""
+from decimal import Decimal
+from typing import Any, Callable, Dict, Mapping, Optional
+from urllib.parse import parse_qsl
+import asyncio
+import json
+import os
+
+import structlog
+
+from evo_core.memory.webhook_queue import WebhookQueue, create_webhook_queue, make_record
+from evo_core.payments.signatures import PayPalVerifier, SignatureError, verify_payfast, verify_stripe
+from evo_core.telemetry import REGISTRY, timed
+
+logger = structlog.get_logger()
+
+WEBHOOKS = REGISTRY.counter("kelnic_webhooks", "Webhooks received", ("provider", "outcome"))
+INGEST_SECONDS = REGISTRY.histogram("kelnic_webhook_ingest_seconds", "Webhook verify-and-append latency")
+PAYMENTS_PUBLISHED = REGISTRY.counter("kelnic_webhook_payments", "payment_success events published from webhooks", ("provider",))
+
+# Stripe amounts are in the smallest currency unit, which is the whole unit for these
+ZERO_DECIMAL_CURRENCIES = {
+    "bif", "clp", "djf", "gnf", "jpy", "kmf", "krw", "mga", "pyg", "rwf", "ugx", "vnd", "vuv", "xaf", "xof", "xpf",
+}
+
+
+def normalize_stripe(body: str) -> Optional[Dict[str, Any]]:
+    event = json.loads(body)
+    # Checkout also emits checkout.session.completed for the same payment; count the intent only
+    if event.get("type") != "payment_intent.succeeded":
+        return None
+    intent = event["data"]["object"]
+    currency = (intent.get("currency") or "usd").lower()
+    cents = intent.get("amount_received") or intent.get("amount") or 0
+    amount = Decimal(cents) if currency in ZERO_DECIMAL_CURRENCIES else Decimal(cents) / 100
+    return {
+        "amount": float(amount),
+        "currency": currency.upper(),
+        "email": intent.get("receipt_email"),
+        "customer_id": intent.get("customer"),
+    }
+
+
+def normalize_paypal(body: str) -> Optional[Dict[str, Any]]:
+    event = json.loads(body)
+    if event.get("event_type") != "PAYMENT.CAPTURE.COMPLETED":
+        return None
+    resource = event["resource"]
+    payee = resource.get("payee") or {}
+    return {
+        "amount": float(resource["amount"]["value"]),
+        "currency": resource["amount"].get("currency_code", "USD"),
+        "email": (resource.get("payer") or {}).get("email_address"),
+        "customer_id": resource.get("custom_id") or payee.get("merchant_id"),
+    }
+
+
+def normalize_payfast(body: str) -> Optional[Dict[str, Any]]:
+    fields = dict(parse_qsl(body, keep_blank_values=True))
+    if fields.get("payment_status") != "COMPLETE":
+        return None
+    return {
+        "amount": float(fields["amount_gross"]),
+        "currency": "ZAR",
+        "email": fields.get("email_address") or None,
+        "customer_id": fields.get("m_payment_id") or None,
+    }
+
+
+NORMALIZERS: Dict[str, Callable[[str], Optional[Dict[str, Any]]]] = {
+    "stripe": normalize_stripe,
+    "paypal": normalize_paypal,
+    "payfast": normalize_payfast,
+}
+
+
+class WebhookIngestor:
+    def __init__(
+        self,
+        bus,
+        queue: Optional[WebhookQueue] = None,
+        batch_size: int = 500,
+        stripe_secret: Optional[str] = None,
+        paypal_webhook_id: Optional[str] = None,
+        payfast_passphrase: Optional[str] = None,
+        ledger=None,
+    ):
+        """``queue`` defaults to ``WEBHOOK_QUEUE_URL`` (a local log file if unset);
+        secrets default to the matching environment variables. With ``ledger``
+        set, batches are acknowledged only after the ledger's pending entries commit."""
+        self.bus = bus
+        self.ledger = ledger
+        self.queue = queue or create_webhook_queue(os.getenv("WEBHOOK_QUEUE_URL") or "file:///./kelnic_webhooks.log")
+        self.batch_size = batch_size
+        self.stripe_secret = stripe_secret or os.getenv("STRIPE_WEBHOOK_SECRET")
+        self.paypal = PayPalVerifier(paypal_webhook_id or os.getenv("PAYPAL_WEBHOOK_ID"))
+        self.payfast_passphrase = payfast_passphrase or os.getenv("PAYFAST_PASSPHRASE")
+        self._consumer: Optional[asyncio.Task] = None
+        self.logger = logger.bind(component="WebhookIngestor")
+
+    @timed(INGEST_SECONDS)
+    async def ingest(self, provider: str, body: bytes, headers: Mapping[str, str]) -> bool:
+        """Verify and durably queue one webhook. Returns False for a duplicate;
+        raises ``SignatureError`` if the webhook is not authentic."""
+        try:
+            event_id = await self._verify(provider, body, headers)
+        except SignatureError:
+            WEBHOOKS.labels(provider, "rejected").inc()
+            raise
+        accepted = await self.queue.append(make_record(provider, event_id, body))
+        WEBHOOKS.labels(provider, "accepted" if accepted else "duplicate").inc()
+        return accepted
+
+    async def _verify(self, provider: str, body: bytes, headers: Mapping[str, str]) -> str:
+        if provider == "stripe":
+            verify_stripe(body, headers.get("stripe-signature"), self.stripe_secret)
+            return self._json_id(body)
+        if provider == "paypal":
+            await self.paypal.verify(body, headers)
+            return self._json_id(body)
+        if provider == "payfast":
+            event_id = verify_payfast(body, self.payfast_passphrase).get("pf_payment_id")
+            if not event_id:
+                raise SignatureError("PayFast notification without pf_payment_id")
+            return event_id
+        raise ValueError(f"Unknown webhook provider: {provider}")
+
+    @staticmethod
+    def _json_id(body: bytes) -> str:
+        try:
+            event_id = json.loads(body).get("id")
+        except (ValueError, AttributeError):
+            event_id = None
+        if not event_id:
+            raise SignatureError("Webhook body has no event id")
+        return str(event_id)
+
+    # -- consumer ---------------------------------------------------------
+
+    def start(self):
+        if self._consumer is None:
+            self._consumer = asyncio.ensure_future(self._consume_loop())
+
+    async def _consume_loop(self):
+        while True:
+            try:
+                await self.consume_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Webhook batch failed, retrying", error=str(e))
+                await asyncio.sleep(1.0)
+                await self.queue.rewind()
+
+    async def consume_batch(self, timeout: float = 1.0) -> int:
+        """Normalize and publish one batch from the queue; returns the number of payments."""
+        batch = await self.queue.read(self.batch_size, timeout)
+        if not batch:
+            return 0
+        payments = []
+        for _, record in batch:
+            provider = record["provider"]
+            try:
+                payment = NORMALIZERS[provider](record["body"])
+            except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                # Authentic but unreadable: log it and move on rather than block the queue
+                self.logger.error("Skipping malformed webhook", provider=provider, event_id=record["event_id"], error=str(e))
+                continue
+            if payment is not None and payment["amount"] > 0:
+                payment.update(provider=provider, event_id=record["event_id"], received_at=record["received_at"])
+                payments.append(payment)
+        for payment in payments:
+            await self.bus.publish("payment_success", payment)
+            PAYMENTS_PUBLISHED.labels(payment["provider"]).inc()
+        # A queued bus only enqueues on publish: wait for the handlers, and for the
+        # ledger entries they queued, before the batch may be dropped from the queue
+        if payments:
+            await self.bus.flush()
+            if self.ledger is not None:
+                await self.ledger.flush()
+        await self.queue.ack([position for position, _ in batch])
+        return len(payments)
+
+    async def close(self):
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+        await self.queue.close()
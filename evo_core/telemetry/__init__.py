@@ -0,0 +1,3 @@
+from .metrics import REGISTRY, Registry, Counter, Gauge, CallbackGauge, Histogram, timed
+from .asgi import MetricsMiddleware
+from .resources import ResourceSampler
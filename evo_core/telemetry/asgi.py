@@ -0,0 +1,60 @@
+# evo_core/telemetry/asgi.py
+import time
+
+from evo_core.telemetry.metrics import REGISTRY, Registry
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route, e.g. ``/api/books/balances/{account}``."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Some FastAPI versions keep include_router prefixes out of route.path;
+    # recover the prefix from the request path
+    try:
+        concrete = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    if path.endswith(concrete) and len(path) > len(concrete):
+        return path[:-len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting HTTP requests by method, route template
+    and status, with latency and in-flight tracking. Route templates
+    (``/api/books/balances/{account}``) keep label cardinality bounded."""
+
+    def __init__(self, app, registry: Registry = REGISTRY):
+        self.app = app
+        self.requests = registry.counter("kelnic_http_requests", "HTTP requests served", ("method", "route", "status"))
+        self.latency = registry.histogram("kelnic_http_request_seconds", "HTTP request latency", ("method", "route"))
+        self.in_flight = registry.gauge("kelnic_http_requests_in_flight", "HTTP requests being served")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = self.in_flight._default
+        in_flight.value += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.value -= 1
+            route = _route_template(scope)
+            method = scope["method"]
+            self.latency.labels(method, route).observe(elapsed)
+            self.requests.labels(method, route, str(status)).inc()
@@ -0,0 +1,253 @@
+# evo_core/telemetry/resources.py
+"""Background sampler of process and host resources.
+
+``ResourceSampler`` wakes every ``interval`` seconds on the event loop,
+records one sample into fixed-size NumPy ring buffers and refreshes
+``latest``, so readers (the /api/resources route, MonitoringAgent,
+SelfHealingAgent, the metrics endpoint) only read precomputed values.
+psutil is used when installed; otherwise values come from /proc and the
+``resource`` module, and fields a platform cannot provide are None.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import os
+import threading
+import time
+import warnings
+
+import numpy as np
+import structlog
+
+from evo_core.telemetry.metrics import REGISTRY
+
+try:
+    import psutil
+except ImportError:  # optional
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = structlog.get_logger()
+
+FIELDS = (
+    "timestamp",
+    "process_cpu_percent",
+    "host_cpu_percent",
+    "rss_bytes",
+    "host_memory_percent",
+    "open_fds",
+    "threads",
+    "loop_lag_ms",
+    "asyncio_tasks",
+)
+
+
+def _read_proc_stat() -> Optional[Tuple[float, float]]:
+    """(busy, total) jiffies across all CPUs from /proc/stat."""
+    try:
+        with open("/proc/stat") as f:
+            values = [float(v) for v in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = values[3] + (values[4] if len(values) > 4 else 0.0)
+    total = sum(values[:8])
+    return total - idle, total
+
+
+def _read_rss() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return float(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return float(peak if os.uname().sysname == "Darwin" else peak * 1024)
+    return None
+
+
+def _read_host_memory_percent() -> Optional[float]:
+    try:
+        info = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                info[key] = float(value.split()[0])
+        return round(100.0 * (1 - info["MemAvailable"] / info["MemTotal"]), 2)
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        return None
+
+
+def _count_fds() -> Optional[float]:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return float(len(os.listdir(path)))
+        except OSError:
+            continue
+    return None
+
+
+def fd_limit() -> Optional[int]:
+    if resource is None:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return None if soft == resource.RLIM_INFINITY else soft
+
+
+class ResourceSampler:
+    def __init__(self, interval: float = 1.0, capacity: int = 3600):
+        """Keeps the last ``capacity`` samples (an hour at the default 1s interval)."""
+        self.interval = interval
+        self.capacity = capacity
+        self.buffer = {name: np.full(capacity, np.nan) for name in FIELDS}
+        self.count = 0
+        self.latest: Dict[str, Any] = {}
+        self.source = "psutil" if psutil is not None else "procfs"
+        self._process = psutil.Process() if psutil is not None else None
+        self._last_wall: Optional[float] = None
+        self._last_cpu_time: Optional[float] = None
+        self._last_host: Optional[Tuple[float, float]] = None
+        # Downsampled histories for the current sample count, dropped on each new sample
+        self._history_cache: Dict[Tuple[int, Optional[float]], Dict[str, List]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.logger = logger.bind(component="ResourceSampler")
+        for name in FIELDS[1:]:
+            REGISTRY.callback_gauge(f"kelnic_{name}", f"Latest sampled {name.replace('_', ' ')}", self._gauge(name))
+
+    def _gauge(self, name: str):
+        def read():
+            value = self.latest.get(name)
+            if value is None:
+                raise LookupError(name)
+            return value
+        return read
+
+    def start(self):
+        if self._task is None:
+            self.sample(0.0)
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            # How late the loop woke us is the lag every other coroutine saw too
+            lag = max(loop.time() - expected, 0.0)
+            try:
+                self.sample(lag * 1000)
+            except Exception as e:
+                self.logger.error("Resource sample failed", error=str(e))
+
+    def sample(self, loop_lag_ms: float):
+        now = time.time()
+        values = {
+            "timestamp": now,
+            "process_cpu_percent": self._process_cpu(now),
+            "host_cpu_percent": self._host_cpu(),
+            "rss_bytes": None,
+            "host_memory_percent": None,
+            "open_fds": None,
+            "threads": float(threading.active_count()),
+            "loop_lag_ms": round(loop_lag_ms, 3),
+            "asyncio_tasks": float(len(asyncio.all_tasks())) if _loop_running() else None,
+        }
+        if self._process is not None:
+            with self._process.oneshot():
+                values["rss_bytes"] = float(self._process.memory_info().rss)
+                values["threads"] = float(self._process.num_threads())
+                if hasattr(self._process, "num_fds"):
+                    values["open_fds"] = float(self._process.num_fds())
+            values["host_memory_percent"] = psutil.virtual_memory().percent
+        else:
+            values["rss_bytes"] = _read_rss()
+            values["host_memory_percent"] = _read_host_memory_percent()
+            values["open_fds"] = _count_fds()
+
+        slot = self.count % self.capacity
+        for name, value in values.items():
+            self.buffer[name][slot] = np.nan if value is None else value
+        self.count += 1
+        self.latest = values
+        self._history_cache = {}
+
+    def _process_cpu(self, now: float) -> Optional[float]:
+        cpu_time = time.process_time()
+        last_wall, last_cpu = self._last_wall, self._last_cpu_time
+        self._last_wall, self._last_cpu_time = now, cpu_time
+        if last_wall is None or now <= last_wall:
+            return None
+        return round(100.0 * (cpu_time - last_cpu) / (now - last_wall), 2)
+
+    def _host_cpu(self) -> Optional[float]:
+        if psutil is not None:
+            # Since the previous call; the first call returns 0.0
+            return psutil.cpu_percent(interval=None)
+        current = _read_proc_stat()
+        last, self._last_host = self._last_host, current
+        if current is None or last is None or current[1] <= last[1]:
+            return None
+        return round(100.0 * (current[0] - last[0]) / (current[1] - last[1]), 2)
+
+    def history(self, points: int = 60, seconds: Optional[float] = None) -> Dict[str, List]:
+        """The last ``seconds`` of samples (default: the whole buffer), averaged
+        down to at most ``points`` values per field. Cached until the next sample."""
+        key = (points, seconds)
+        cached = self._history_cache.get(key)
+        if cached is not None:
+            return cached
+
+        available = min(self.count, self.capacity)
+        if seconds is not None:
+            available = min(available, max(int(seconds / self.interval), 1))
+        # Oldest to newest
+        order = (np.arange(self.count - available, self.count) % self.capacity) if available else np.arange(0)
+        step = max(-(-available // points), 1) if available else 1
+        usable = (available // step) * step
+        order = order[available - usable:]
+
+        result = {}
+        for name in FIELDS:
+            column = self.buffer[name][order]
+            if usable:
+                blocks = column.reshape(-1, step)
+                with warnings.catch_warnings():
+                    # "Mean of empty slice" for blocks where a field was never available
+                    warnings.simplefilter("ignore", RuntimeWarning)
+                    column = blocks[:, -1] if name == "timestamp" else np.nanmean(blocks, axis=1)
+            result[name] = [None if np.isnan(v) else round(float(v), 3) for v in column]
+        result["step_seconds"] = step * self.interval
+        self._history_cache[key] = result
+        return result
+
+    def snapshot(self, points: int = 60) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "interval": self.interval,
+            "samples": min(self.count, self.capacity),
+            "current": self.latest,
+            "fd_limit": fd_limit(),
+            "history": self.history(points),
+        }
+
+
+def _loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
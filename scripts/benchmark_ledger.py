@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Measure journal ingest throughput with group commit.
+
+Usage: python scripts/benchmark_ledger.py [--entries 50000] [--url sqlite:////tmp/ledger_bench.db]
+The default database is a fresh SQLite file in a temporary directory.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.memory.ledger import Ledger  # noqa: E402
+
+ACCOUNTS = [("cash", "revenue"), ("owner_equity", "cash"), ("operating_expense", "cash")]
+
+
+async def run(url: str, entries: int, max_batch: int):
+    ledger = Ledger(url, max_batch=max_batch)
+    await ledger.start()
+    started = time.perf_counter()
+    futures = []
+    for i in range(entries):
+        debit, credit = ACCOUNTS[i % len(ACCOUNTS)]
+        futures.append(ledger.record(debit, credit, round(random.uniform(1, 500), 2), "benchmark", {"n": i}))
+        # Yield now and then, as event handlers would, so the writer interleaves with producers
+        if i % 1000 == 999:
+            await asyncio.sleep(0)
+    await asyncio.gather(*futures)
+    elapsed = time.perf_counter() - started
+
+    lookups = 100000
+    lookup_started = time.perf_counter()
+    for _ in range(lookups):
+        await ledger.get_balance("cash")
+    lookup_elapsed = time.perf_counter() - lookup_started
+
+    trial = await ledger.get_trial_balance()
+    stats = dict(ledger.stats)
+    await ledger.close()
+
+    print(f"{entries} entries in {elapsed:.2f}s: {entries / elapsed:,.0f} entries/sec, "
+          f"{stats['commits']} commits (avg {stats['entries'] / max(stats['commits'], 1):.0f} entries/commit)")
+    print(f"balance lookup: {lookup_elapsed / lookups * 1e6:.2f} us")
+    print(f"trial balance total: {trial['total']} (should be 0.00)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--max-batch", type=int, default=5000)
+    parser.add_argument("--url")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'ledger_bench.db')}"
+        asyncio.run(run(url, args.entries, args.max_batch))
+
+
+if __name__ == "__main__":
+    main()
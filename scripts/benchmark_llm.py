@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Measure LLMClient throughput: uncached, cached, coalesced and micro-batched.
+
+Usage: python scripts/benchmark_llm.py [--requests 500] [--latency 0.05] [--concurrency 8] [--url http://host:port/v1]
+Without --url the fake model server from scripts/fake_llm_server.py runs
+in-process on a free port, so no network or API key is needed.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.llm import LLMClient, OpenAICompatibleBackend, PromptCache  # noqa: E402
+from scripts.fake_llm_server import create_app  # noqa: E402
+
+
+async def measure(label: str, client: LLMClient, calls):
+    started = time.perf_counter()
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - started
+    status = client.get_status()
+    print(f"{label:<12} {len(calls):>6} requests in {elapsed:6.2f}s: {len(calls) / elapsed:>9,.0f} req/s "
+          f"(backend calls {status['backend_calls']}, cache hits {status['cache_hits']}, coalesced {status['coalesced']})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake server seconds per call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(create_app(args.latency, 1000), port=port, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        url = f"http://127.0.0.1:{port}/v1"
+
+    n = args.requests
+    with tempfile.TemporaryDirectory() as tmp:
+        def client(batch: bool = False) -> LLMClient:
+            return LLMClient(OpenAICompatibleBackend(url, batch=batch), model="fake",
+                             cache=PromptCache(os.path.join(tmp, "cache.db")), max_concurrency=args.concurrency)
+
+        llm = client()
+        await measure("uncached", llm, [llm.complete(f"Write a tagline for product {i}") for i in range(n)])
+        await measure("cached", llm, [llm.complete(f"Write a tagline for product {i}") for i in range(n)])
+        await llm.close()
+
+        llm = client()
+        await measure("coalesced", llm, [llm.complete(f"Summarise campaign {i % 10}", max_tokens=64) for i in range(n)])
+        await llm.close()
+
+        llm = client(batch=True)
+        await measure("batched", llm, [llm.complete(f"Classify lead {i}", raw=True) for i in range(n)])
+        await llm.close()
+
+    if server is not None:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
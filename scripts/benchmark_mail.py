@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Measure outbound mail throughput through the pooled Mailer.
+
+Usage: python scripts/benchmark_mail.py [--messages 5000] [--pool-size 4] [--domains 50] [--url smtp://host:port]
+Without --url a local aiosmtpd server (pip install aiosmtpd) that accepts and
+discards everything is started on a free port.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.mail import Mailer, build_message  # noqa: E402
+
+
+class DiscardHandler:
+    async def handle_DATA(self, server, session, envelope):
+        return "250 OK"
+
+
+def start_local_server():
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        sys.exit("aiosmtpd is not installed: pip install aiosmtpd, or pass --url")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    controller = Controller(DiscardHandler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, f"smtp://127.0.0.1:{port}"
+
+
+async def run(args, url: str):
+    with tempfile.TemporaryDirectory() as spool:
+        mailer = Mailer(
+            url, pool_size=args.pool_size, domain_concurrency=args.domain_concurrency,
+            domain_rate=args.domain_rate, spool_dir=spool, starttls=False,
+        )
+        messages = (
+            build_message("Kelnic <billing@kelnic.local>", [f"customer{n}@domain{n % args.domains}.example"],
+                          f"Invoice INV-{n:07d}", "Your invoice is attached.\n" * 20)
+            for n in range(args.messages)
+        )
+        started = time.perf_counter()
+        totals = await mailer.send_many(messages, concurrency=args.concurrency)
+        elapsed = time.perf_counter() - started
+        status = mailer.get_status()
+        await mailer.close()
+    print(f"{totals['messages']} messages in {elapsed:.2f}s: {totals['messages'] / elapsed:,.0f} msg/s "
+          f"({totals['delivered']} delivered, {totals['deferred']} deferred, {totals['failed']} failed, "
+          f"{status['connections_opened']} connections opened)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--domain-concurrency", type=int, default=8)
+    parser.add_argument("--domain-rate", type=float, default=1e6, help="messages/s per domain")
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    controller = None
+    url = args.url
+    if url is None:
+        controller, url = start_local_server()
+    try:
+        asyncio.run(run(args, url))
+    finally:
+        if controller is not None:
+            controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Measure per-call overhead of the metrics instrumentation.
+
+Usage: python scripts/benchmark_metrics.py [--calls 200000]
+Compares a bare coroutine with the same coroutine wrapped by ``timed`` and
+by the BaseAgent execute instrumentation, and times raw metric updates.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.telemetry import Registry, timed  # noqa: E402
+from evo_core.agents.base_agent import BaseAgent  # noqa: E402
+
+
+class NoopAgent(BaseAgent):
+    def __init__(self):
+        super().__init__(name="NoopAgent", description="benchmark")
+
+    async def execute(self, task, context):
+        return {}
+
+
+def per_call_us(fn, calls: int) -> float:
+    started = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def await_loop(coro_fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        await coro_fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def main(calls: int):
+    registry = Registry()
+    counter = registry.counter("bench", "bench", ("op",)).labels("x")
+    histogram = registry.histogram("bench_seconds", "bench", ("op",)).labels("x")
+
+    def count(n):
+        for _ in range(n):
+            counter.inc()
+
+    def observe(n):
+        for _ in range(n):
+            histogram.observe(0.0123)
+
+    print(f"counter.inc          {per_call_us(count, calls):6.3f} us")
+    print(f"histogram.observe    {per_call_us(observe, calls):6.3f} us")
+
+    async def bare():
+        return None
+
+    wrapped = timed(
+        registry.histogram("bench_call_seconds", "bench"),
+        errors=registry.counter("bench_errors", "bench"),
+        in_flight=registry.gauge("bench_in_flight", "bench"),
+    )(bare)
+    base = await await_loop(bare, calls)
+    print(f"bare coroutine       {base:6.3f} us")
+    decorated = await await_loop(wrapped, calls)
+    print(f"timed coroutine      {decorated:6.3f} us  (overhead {decorated - base:.3f} us)")
+
+    agent = NoopAgent()
+    undecorated = NoopAgent.execute.__wrapped__.__wrapped__
+    plain = await await_loop(lambda: undecorated(agent, "t", {}), calls)
+    instrumented = await await_loop(lambda: agent.execute("t", {}), calls)
+    print(f"agent.execute        {instrumented:6.3f} us  (overhead {instrumented - plain:.3f} us)")
+
+    started = time.perf_counter()
+    text = registry.to_openmetrics()
+    print(f"openmetrics render   {(time.perf_counter() - started) * 1000:6.3f} ms ({len(text)} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    asyncio.run(main(parser.parse_args().calls))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Measure report latency of the columnar journal at scale.
+
+Usage: python scripts/benchmark_reporting.py [--entries 10000000] [--snapshot-dir /tmp/kelnic_reports]
+Entries are synthetic and appended in memory; the ledger database is not involved.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.memory.reporting import ColumnarJournal  # noqa: E402
+
+PAIRS = [("cash", "revenue"), ("owner_equity", "cash"), ("operating_expense", "cash"), ("cash", "refund_revenue")]
+SOURCES = ["stripe", "paypal", "payfast", "bank", None]
+
+
+def build(entries: int, chunk: int = 1_000_000) -> ColumnarJournal:
+    journal = ColumnarJournal()
+    rng = np.random.default_rng(7)
+    first_day = date(2022, 1, 1)
+    dates = [first_day + timedelta(days=i) for i in range(365 * 4)]
+    for start in range(0, entries, chunk):
+        n = min(chunk, entries - start)
+        pairs = rng.integers(0, len(PAIRS), n)
+        days = np.sort(rng.integers(0, len(dates), n))
+        amounts = rng.integers(100, 50_000, n)
+        sources = rng.integers(0, len(SOURCES), n)
+        journal.append([
+            (start + i + 1, dates[days[i]], PAIRS[pairs[i]][0], PAIRS[pairs[i]][1], int(amounts[i]), SOURCES[sources[i]])
+            for i in range(n)
+        ])
+    return journal
+
+
+def timed(label: str, fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<40} {best * 1000:>8.1f} ms")
+
+
+def run_reports(journal: ColumnarJournal):
+    timed("P&L by month, all time", lambda: journal.profit_and_loss("month"))
+    timed("P&L by quarter, 2024", lambda: journal.profit_and_loss("quarter", date(2024, 1, 1), date(2025, 1, 1)))
+    timed("cash flow by day", lambda: journal.cash_flow("day"))
+    timed("revenue by source", lambda: journal.revenue_by_source())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10_000_000)
+    parser.add_argument("--snapshot-dir")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    journal = build(args.entries)
+    print(f"built {journal.size:,} entries in {time.perf_counter() - started:.1f}s")
+    print("in memory:")
+    run_reports(journal)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.snapshot_dir or tmp
+        started = time.perf_counter()
+        journal.save(directory)
+        print(f"snapshot saved in {time.perf_counter() - started:.2f}s")
+        started = time.perf_counter()
+        loaded = ColumnarJournal.load(directory)
+        print(f"snapshot loaded (memory-mapped) in {(time.perf_counter() - started) * 1000:.1f} ms")
+        print("memory-mapped:")
+        run_reports(loaded)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Measure backend startup: time to the first /health response and import cost per module.
+
+Usage: python scripts/benchmark_startup.py [--runs 3] [--port 8765] [--modules backend.main ...]
+Each run starts a fresh uvicorn process, so import caches in this process do not skew it.
+The ledger database, webhook log and mail spool go to a temporary directory per run.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "backend.main",
+    "evo_core.agents",
+    "evo_core.agents.agent_registry",
+    "evo_core.orchestrator",
+    "evo_core.orchestrator.agents",
+]
+
+
+def time_to_health(port: int, timeout: float) -> float:
+    """Seconds from spawning uvicorn until GET /health answers 200."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "PYTHONPATH": ROOT,
+            # Keep the files the app creates on startup out of the checkout
+            "LEDGER_URL": f"sqlite:///{os.path.join(tmp, 'kelnic.db')}",
+            "WEBHOOK_QUEUE_URL": f"file:///{os.path.join(tmp, 'kelnic_webhooks.log')}",
+            "MAIL_SPOOL_DIR": os.path.join(tmp, "mail_spool"),
+        }
+        return _serve_until_healthy(port, timeout, env)
+
+
+def _serve_until_healthy(port: int, timeout: float, env: dict) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"/health did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time (seconds) per module from ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            times[match.group(2)] = int(match.group(1)) / 1e6
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to list under backend.main")
+    args = parser.parse_args()
+
+    print(f"{'module':<40} {'import (ms)':>12}")
+    for module in args.modules:
+        try:
+            cost = import_times(module).get(module)
+            print(f"{module:<40} {cost * 1000:>12.1f}")
+        except RuntimeError as e:
+            print(f"{module:<40} {'failed':>12}  {e}")
+
+    try:
+        heaviest = sorted(import_times("backend.main").items(), key=lambda item: -item[1])[:args.top]
+        print("\nHeaviest imports under backend.main (cumulative):")
+        for module, cost in heaviest:
+            print(f"  {module:<50} {cost * 1000:>8.1f} ms")
+    except RuntimeError as e:
+        print(f"\nbackend.main failed to import: {e}")
+        return
+
+    samples = [time_to_health(args.port, args.timeout) for _ in range(args.runs)]
+    print(f"\nTime to first /health: median {statistics.median(samples) * 1000:.0f} ms "
+          f"(min {min(samples) * 1000:.0f}, max {max(samples) * 1000:.0f}, runs {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compare StateManager codecs and compression on process_task-shaped results.
+
+Usage: python scripts/benchmark_state_codecs.py [--sessions 1000]
+Codecs or compressors whose packages are not installed are skipped.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.agents import (  # noqa: E402
+    MarketingEngineAgent, FinancialAgent, InvoicingAgent, PayoutAgent, ContentCreatorAgent,
+)
+from evo_core.memory.codecs import CODECS, COMPRESSIONS, ValueSerializer  # noqa: E402
+
+
+async def sample_results(multiplier: int):
+    """Build a ``last_result`` list like process_task stores for a multi-agent task."""
+    agents = [MarketingEngineAgent(), FinancialAgent(), InvoicingAgent(), PayoutAgent(), ContentCreatorAgent()]
+    task = "Promote the spring campaign, write the email, invoice and pay the affiliate"
+    results = []
+    for i in range(multiplier):
+        for agent in agents:
+            result = await agent.execute(task, {"recipient": f"affiliate-{i}"})
+            results.append({"agent": agent.name, "result": result})
+    return {"value": results, "timestamp": "2026-04-29T12:00:00"}
+
+
+def bench(serializer: ValueSerializer, payload, rounds: int):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encoded = serializer.encode("last_result", payload)
+    encode_us = (time.perf_counter() - start) / rounds * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        serializer.decode(encoded)
+    decode_us = (time.perf_counter() - start) / rounds * 1e6
+    return encode_us, decode_us, len(encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000, help="encode/decode rounds per case")
+    args = parser.parse_args()
+
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+    for label, multiplier in (("single task (5 agents)", 1), ("large session (50x)", 50)):
+        payload = asyncio.run(sample_results(multiplier))
+        print(f"\n{label}")
+        print(f"{'codec':<10}{'compression':<13}{'encode us':>11}{'decode us':>11}{'bytes':>9}")
+        for codec in CODECS.values():
+            if not codec.available:
+                continue
+            for compression in COMPRESSIONS.values():
+                if not compression.available:
+                    continue
+                serializer = ValueSerializer(codec.name, compression.name, compress_threshold=256)
+                encode_us, decode_us, size = bench(serializer, payload, args.sessions)
+                print(f"{codec.name:<10}{compression.name:<13}{encode_us:>11.1f}{decode_us:>11.1f}{size:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Measure webhook ingest (verify + durable append) and consumer throughput.
+
+Usage: python scripts/benchmark_webhooks.py [--webhooks 20000] [--duplicates 0.1] [--queue-url redis://localhost:6379/15]
+The default queue is a fresh append-only log in a temporary directory.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.memory.webhook_queue import create_webhook_queue  # noqa: E402
+from evo_core.orchestrator.message_bus import MessageBus  # noqa: E402
+from evo_core.payments import WebhookIngestor  # noqa: E402
+
+SECRET = "whsec_benchmark"
+
+
+def stripe_webhook(n: int):
+    body = json.dumps({
+        "id": f"evt_bench_{n}",
+        "type": "payment_intent.succeeded",
+        "data": {"object": {"amount_received": random.randint(500, 50000), "currency": "usd", "receipt_email": f"c{n}@example.com"}},
+    }).encode()
+    timestamp = str(int(time.time()))
+    signature = hmac.new(SECRET.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return body, {"stripe-signature": f"t={timestamp},v1={signature}"}
+
+
+async def run(queue_url: str, webhooks: int, duplicates: float, concurrency: int):
+    bus = MessageBus()
+    published = []
+    bus.subscribe("payment_success", published.append)
+    ingestor = WebhookIngestor(bus, create_webhook_queue(queue_url), stripe_secret=SECRET)
+
+    unique = int(webhooks * (1 - duplicates))
+    requests = [stripe_webhook(n) for n in range(unique)]
+    # Provider retries: re-deliveries of already accepted events
+    requests += random.choices(requests, k=webhooks - unique)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def deliver(body, headers):
+        async with semaphore:
+            started = time.perf_counter()
+            accepted = await ingestor.ingest("stripe", body, headers)
+            latencies.append(time.perf_counter() - started)
+            return accepted
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(deliver(body, headers) for body, headers in requests))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    consume_started = time.perf_counter()
+    while len(published) < unique:
+        await ingestor.consume_batch(timeout=0.1)
+    consume_elapsed = time.perf_counter() - consume_started
+    await ingestor.close()
+
+    print(f"{webhooks} webhooks in {elapsed:.2f}s: {webhooks / elapsed:,.0f}/sec "
+          f"({sum(results)} accepted, {webhooks - sum(results)} duplicates dropped)")
+    print(f"ack latency p50 {latencies[len(latencies) // 2] * 1e3:.2f}ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f}ms at concurrency {concurrency}")
+    print(f"consumer: {len(published)} payment_success events in {consume_elapsed:.2f}s: "
+          f"{len(published) / consume_elapsed:,.0f}/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--webhooks", type=int, default=20000)
+    parser.add_argument("--duplicates", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--queue-url")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.queue_url or f"file:///{os.path.join(tmp, 'webhooks.log')}"
+        asyncio.run(run(url, args.webhooks, args.duplicates, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Offline stand-in for an OpenAI-compatible model server.
+
+Usage: python scripts/fake_llm_server.py [--port 8088] [--latency 0.2] [--tokens-per-second 200]
+Then: LLM_BASE_URL=http://127.0.0.1:8088/v1 LLM_BATCH=true
+
+Answers /v1/chat/completions and /v1/completions (including a list of
+prompts, and ``stream: true`` as server-sent events) with deterministic
+text derived from the prompt, after ``latency`` seconds per call.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import uvicorn
+
+WORDS = ("growth", "launch", "customers", "campaign", "pricing", "retention", "funnel", "offer",
+         "audience", "content", "email", "referral", "partners", "upsell", "trial", "reviews")
+
+
+def fake_answer(prompt: str, max_tokens: int) -> str:
+    digest = hashlib.sha256(prompt.encode()).digest()
+    count = min(max_tokens, 12 + digest[0] % 24)
+    return " ".join(WORDS[digest[i % len(digest)] % len(WORDS)] for i in range(count))
+
+
+def create_app(latency: float, tokens_per_second: float) -> FastAPI:
+    app = FastAPI(title="fake-llm")
+    app.state.calls = 0
+
+    def usage(prompt: str, text: str):
+        return {"prompt_tokens": len(prompt) // 4 + 1, "completion_tokens": len(text.split())}
+
+    async def respond(body, prompts, chat: bool):
+        app.state.calls += 1
+        await asyncio.sleep(latency)
+        max_tokens = int(body.get("max_tokens") or 256)
+        answers = [fake_answer(p, max_tokens) for p in prompts]
+        choices = [
+            {"index": i, "finish_reason": "stop", **({"message": {"role": "assistant", "content": a}} if chat else {"text": a})}
+            for i, a in enumerate(answers)
+        ]
+        totals = [usage(p, a) for p, a in zip(prompts, answers)]
+        return {
+            "id": f"fake-{app.state.calls}",
+            "object": "chat.completion" if chat else "text_completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": choices,
+            "usage": {k: sum(u[k] for u in totals) for k in ("prompt_tokens", "completion_tokens")},
+        }
+
+    async def stream(body, prompt: str, chat: bool):
+        app.state.calls += 1
+        await asyncio.sleep(latency)
+        for word in fake_answer(prompt, int(body.get("max_tokens") or 256)).split():
+            choice = {"index": 0, "delta": {"content": word + " "}} if chat else {"index": 0, "text": word + " "}
+            yield f"data: {json.dumps({'choices': [choice]})}\n\n"
+            await asyncio.sleep(1 / tokens_per_second)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = "\n".join(f"{m['role']}: {m['content']}" for m in body["messages"])
+        if body.get("stream"):
+            return StreamingResponse(stream(body, prompt, True), media_type="text/event-stream")
+        return await respond(body, [prompt], True)
+
+    @app.post("/v1/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+        if body.get("stream"):
+            return StreamingResponse(stream(body, prompts[0], False), media_type="text/event-stream")
+        return await respond(body, prompts, False)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per call")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="streaming speed")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.tokens_per_second), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
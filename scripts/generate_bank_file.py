@@ -1,10 +1,95 @@
 #!/usr/bin/env python3
+"""Generate bulk payout files for the bank from a CSV or JSON-lines payout list.
+
+Usage:
+  python scripts/generate_bank_file.py payouts.csv --format pain001 --out payouts/ --split-by-bank
+  python scripts/generate_bank_file.py --benchmark 1000000 --format fixed_width
+
+Input columns/keys: beneficiary, account, amount (or amount_cents), reference,
+bank, branch_code, currency. ``-`` reads from stdin. Files are streamed in
+chunks; control totals and checksums are written to manifest.json.
+"""
+import argparse
 import csv
+import json
+import os
+import sys
+import tempfile
+import time
 from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evo_core.payments.bank_files import WRITERS, BankFileGenerator, BatchInfo, Payout  # noqa: E402
+
+
 def generate_csv(amount, bank):
-    filename = f"payout_{bank}_{datetime.now().strftime('%Y%m%d')}.csv"
-    with open(filename, 'w') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Date', 'Beneficiary', 'Account', 'Amount', 'Reference'])
-        writer.writerow([datetime.now().strftime('%Y-%m-%d'), 'Owner', '123456', amount, f'Kelnic Payout'])
-    return filename
+    """Single owner payout to ``bank`` as a CSV file in the current directory."""
+    generator = BankFileGenerator(".", "csv", prefix=f"payout_{bank}", write_manifest=False)
+    manifest = generator.generate([{"beneficiary": "Owner", "account": "123456", "amount": amount,
+                                    "reference": "Kelnic Payout", "bank": bank}])
+    return manifest["files"][0]["path"]
+
+
+def read_payouts(path: str):
+    handle = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        first = handle.readline()
+        if first.lstrip().startswith("{"):
+            yield json.loads(first)
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            reader = csv.DictReader(handle, fieldnames=next(csv.reader([first])))
+            yield from reader
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def synthetic_payouts(count: int):
+    banks = ["FNB", "ABSA", "Standard Bank", "Nedbank", "Capitec"]
+    for n in range(count):
+        yield Payout(f"Affiliate {n}", f"{62000000000 + n}", 1000 + (n * 7919) % 500000, f"KEL-{n:08d}",
+                     banks[n % len(banks)], f"{250655 + n % 7:06d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", default="-", help="CSV or JSON-lines payouts, - for stdin")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--out", default="payouts")
+    parser.add_argument("--split-by-bank", action="store_true")
+    parser.add_argument("--max-rows", type=int)
+    parser.add_argument("--max-bytes", type=int)
+    parser.add_argument("--debtor-name", default=os.getenv("PAYOUT_DEBTOR_NAME", "Kelnic"))
+    parser.add_argument("--debtor-account", default=os.getenv("PAYOUT_DEBTOR_ACCOUNT", ""))
+    parser.add_argument("--debtor-bic", default=os.getenv("PAYOUT_DEBTOR_BIC", ""))
+    parser.add_argument("--execution-date", help="YYYY-MM-DD, default today")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", help="write ROWS synthetic payouts to a temp dir and report throughput")
+    args = parser.parse_args()
+
+    batch = BatchInfo(args.debtor_name, args.debtor_account, args.debtor_bic)
+    if args.execution_date:
+        batch.execution_date = datetime.strptime(args.execution_date, "%Y-%m-%d").date()
+
+    if args.benchmark:
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = BankFileGenerator(tmp, args.format, args.split_by_bank, args.max_rows, args.max_bytes, batch=batch)
+            started = time.perf_counter()
+            manifest = generator.generate(synthetic_payouts(args.benchmark))
+            elapsed = time.perf_counter() - started
+        print(f"{manifest['rows']} rows in {elapsed:.2f}s: {manifest['rows'] / elapsed * 60:,.0f} rows/min "
+              f"({args.format}, {len(manifest['files'])} files, total {manifest['total']})")
+        return
+
+    generator = BankFileGenerator(args.out, args.format, args.split_by_bank, args.max_rows, args.max_bytes, batch=batch)
+    manifest = generator.generate(read_payouts(args.input))
+    for f in manifest["files"]:
+        print(f"{f['path']}: {f['rows']} rows, total {f['total']}, sha256 {f['sha256']}")
+    print(f"{manifest['rows']} payouts, total {manifest['total']}")
+
+
+if __name__ == "__main__":
+    main()
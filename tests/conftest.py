@@ -0,0 +1,24 @@
+# tests/conftest.py
+import asyncio
+import inspect
+import os
+import sys
+
+import pytest
+import structlog
+
+# Tests import evo_core/backend from the repository root without installing it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep test output readable: warnings and errors only
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(30))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run ``async def`` tests in a fresh event loop (no pytest-asyncio needed)."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
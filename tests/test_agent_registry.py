@@ -0,0 +1,10 @@
+# tests/test_agent_registry.py
+from evo_core.agents.agent_registry import AGENT_SPECS
+
+
+def test_agents_take_their_routing_metadata_from_the_spec():
+    for spec in AGENT_SPECS:
+        agent = spec.load(None)
+        assert agent.name == spec.name
+        assert agent.description == spec.description
+        assert agent.keywords == spec.keywords
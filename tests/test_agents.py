@@ -0,0 +1,16 @@
+# tests/test_agents.py
+from evo_core.agents.monitoring_agent import MonitoringAgent
+from evo_core.agents.self_healing_agent import SelfHealingAgent
+
+
+class NoResources:
+    resources = None
+
+
+async def test_missing_sampler_is_logged_as_failed_and_not_cached():
+    for agent in (MonitoringAgent(NoResources()), SelfHealingAgent(NoResources())):
+        result = await agent.execute("status", {})
+        assert result["status"] == "error"
+        assert agent.last_execution["status"] == "failed"
+        if agent._result_cache is not None:
+            assert agent._result_cache.get(agent.cache_key("status", {})) is None
@@ -0,0 +1,35 @@
+# tests/test_codecs.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+from evo_core.memory.codecs import CODECS, COMPRESSIONS, ValueSerializer
+
+VALUE = {"agent": "InvoicingAgent", "result": {"status": "success", "lines": ["x" * 40] * 100}}
+
+
+@pytest.mark.parametrize("codec", list(CODECS))
+@pytest.mark.parametrize("compression", list(COMPRESSIONS))
+def test_round_trip(codec, compression):
+    if not CODECS[codec].available or not COMPRESSIONS[compression].available:
+        with pytest.raises(ValueError, match="package to be installed"):
+            ValueSerializer(codec, compression)
+        return
+    serializer = ValueSerializer(codec, compression, compress_threshold=64)
+    encoded = serializer.encode("last_result", VALUE)
+    assert encoded[1] == CODECS[codec].id
+    assert ValueSerializer.decode(encoded) == VALUE
+
+
+def test_optional_packages_are_imported_on_first_use():
+    script = (
+        "import sys\n"
+        "from evo_core.memory.codecs import ValueSerializer\n"
+        "optional = {'orjson', 'msgpack', 'zstandard', 'lz4'}\n"
+        "assert not optional & set(sys.modules), optional & set(sys.modules)\n"
+        "ValueSerializer('json').encode('k', {'a': 1})\n"
+        "assert not optional & set(sys.modules), optional & set(sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,43 @@
+# tests/test_invoices.py
+"""Bulk invoice rendering when a worker process dies, and document naming."""
+import os
+
+from evo_core.agents.invoicing_agent import InvoicingAgent
+from evo_core.payments.invoices import DirectorySink, InvoiceBatchRenderer
+
+
+class KillsWorker:
+    """A unit price whose formatting terminates the rendering process."""
+
+    def __str__(self):
+        os._exit(1)
+
+
+def invoice(n, price="10.00"):
+    return {"invoice_id": f"INV-{n}", "lines": [{"description": "Item", "quantity": 1, "unit_price": price}]}
+
+
+async def test_worker_crash_fails_only_the_crashing_invoice(tmp_path):
+    invoices = [invoice(n) for n in range(12)]
+    invoices[5] = invoice(5, KillsWorker())
+    renderer = InvoiceBatchRenderer(DirectorySink(str(tmp_path)), formats=("html",), workers=2, chunk_size=2)
+
+    summary = await renderer.run(invoices)
+
+    assert summary["rendered"] == 11 and summary["failed"] == 1
+    assert [f["invoice_id"] for f in summary["failures"]] == ["INV-5"]
+    assert summary["failures"][0]["error"].startswith("Worker crashed")
+    assert sorted(os.listdir(tmp_path)) == sorted(f"INV-{n}.html" for n in range(12) if n != 5)
+
+
+async def test_single_invoice_paths_match_written_files(tmp_path):
+    agent = InvoicingAgent()
+    result = await agent._single({
+        "invoice_id": "INV 2024/07#1",
+        "lines": [{"description": "Consulting", "quantity": 2, "unit_price": "50.00"}],
+        "output_dir": str(tmp_path),
+    })
+
+    assert result["status"] == "success" and result["amount"] == 100.0
+    assert sorted(result["documents"]) == [str(tmp_path / "INV_2024_07_1.html"), str(tmp_path / "INV_2024_07_1.pdf")]
+    assert all(os.path.exists(path) for path in result["documents"])
@@ -0,0 +1,71 @@
+# tests/test_ledger.py
+"""Group-commit failure handling in ``Ledger``."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from evo_core.memory.ledger import Ledger
+
+
+def failing(ledger, error, times):
+    """Make the next ``times`` commits raise ``error``."""
+    commit = ledger._commit
+    calls = []
+
+    async def flaky(rows):
+        calls.append(len(rows))
+        if len(calls) <= times:
+            raise error
+        return await commit(rows)
+
+    ledger._commit = flaky
+    return calls
+
+
+async def test_transient_failure_is_retried(tmp_path):
+    ledger = Ledger(f"sqlite:///{tmp_path / 'ledger.db'}", retry_base=0.01)
+    await ledger.start()
+    calls = failing(ledger, OperationalError("INSERT", {}, Exception("database is locked")), 2)
+    try:
+        futures = [ledger.record("cash", "revenue", "10.00", "sale") for _ in range(3)]
+        futures.append(ledger.record("cash", "revenue", "10.00", "sale", idempotency_key="sale:1"))
+        await ledger.flush()
+        # Nothing failed: the same batch went out again until it committed
+        assert all(f.done() and f.exception() is None for f in futures)
+        assert calls == [4, 4, 4]
+        assert ledger.stats["retries"] == 2 and ledger.stats["failed"] == 0
+        assert await ledger.get_balance("cash") == Decimal("40.00")
+    finally:
+        await ledger.close()
+
+    # The balances were committed, not only mirrored in memory
+    reopened = Ledger(f"sqlite:///{tmp_path / 'ledger.db'}")
+    try:
+        assert await reopened.get_balance("revenue") == Decimal("-40.00")
+    finally:
+        await reopened.close()
+
+
+async def test_bad_entry_fails_alone(tmp_path):
+    ledger = Ledger(f"sqlite:///{tmp_path / 'ledger.db'}")
+    await ledger.start()
+    commit = ledger._commit
+
+    async def reject_refunds(rows):
+        if any(row["entry_type"] == "refund" for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("constraint failed"))
+        return await commit(rows)
+
+    ledger._commit = reject_refunds
+    try:
+        good = [ledger.record("cash", "revenue", "5.00", "sale") for _ in range(2)]
+        bad = ledger.record("revenue", "cash", "5.00", "refund")
+        await ledger.flush()
+        assert all(f.exception() is None for f in good)
+        with pytest.raises(IntegrityError):
+            bad.result()
+        assert ledger.stats["failed"] == 1 and ledger.stats["entries"] == 2
+        assert await ledger.get_balance("cash") == Decimal("10.00")
+    finally:
+        await ledger.close()
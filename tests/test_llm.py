@@ -0,0 +1,70 @@
+# tests/test_llm.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+
+from evo_core.llm.backends import LLMBackend, LLMError, OpenAICompatibleBackend, retry_after
+from evo_core.llm.client import LLMClient
+
+COMPLETION = {"model": "m", "choices": [{"message": {"content": "hi"}, "finish_reason": "stop"}], "usage": {}}
+
+
+def backend_with(handler):
+    backend = OpenAICompatibleBackend("http://llm.test/v1")
+    backend.client = httpx.AsyncClient(base_url="http://llm.test/v1", transport=httpx.MockTransport(handler))
+    return backend
+
+
+def test_retry_after_forms():
+    assert retry_after("2", 9.0) == 2.0
+    assert retry_after(None, 9.0) == 9.0
+    assert retry_after("soon", 9.0) == 9.0
+    assert retry_after("Wed, 21 Oct 2015 07:28:00 GMT", 9.0) == 0.0
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < retry_after(later, 9.0) <= 30
+
+
+async def test_http_date_retry_after_is_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        return httpx.Response(200, json=COMPLETION)
+
+    backend = backend_with(handler)
+    try:
+        response = await backend.complete({"model": "m", "messages": []})
+    finally:
+        await backend.close()
+    assert response["text"] == "hi" and len(calls) == 2
+
+
+class ShortBatchBackend(LLMBackend):
+    supports_batch = True
+
+    async def complete(self, request):
+        raise AssertionError("requests should be batched")
+
+    def stream(self, request):
+        raise NotImplementedError
+
+    async def complete_batch(self, requests):
+        # One completion short
+        return [{"text": r["prompt"], "model": "m", "usage": {}, "finish_reason": "stop"} for r in requests[:-1]]
+
+
+async def test_short_batch_fails_the_unanswered_requests():
+    client = LLMClient(ShortBatchBackend(), model="m", batch_window=0.01)
+    try:
+        a, b, c = await asyncio.wait_for(
+            asyncio.gather(*(client.text(p, raw=True, cache=False) for p in ("a", "b", "c")), return_exceptions=True),
+            timeout=2,
+        )
+    finally:
+        await client.close()
+    assert (a, b) == ("a", "b")
+    assert isinstance(c, LLMError)
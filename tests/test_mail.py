@@ -0,0 +1,155 @@
+# tests/test_mail.py
+"""SMTPConnection and Mailer against a local aiosmtpd server.
+
+The server accepts every recipient except ``bad@...`` (550, permanent) and
+``tempfail@...`` (451, transient); ``flaky@...`` is refused with 451 once and
+accepted after that.
+"""
+import asyncio
+import os
+import socket
+import time
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from evo_core.mail import Mailer, build_message  # noqa: E402
+from evo_core.mail.smtp import SMTPConnection, SMTPError  # noqa: E402
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.flaky_seen = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        if not any("PIPELINING" in line for line in responses):
+            responses.insert(1, "250-PIPELINING")
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        local = address.partition("@")[0]
+        if local == "bad":
+            return "550 5.1.1 No such user"
+        if local == "tempfail":
+            return "451 4.3.0 Try again later"
+        if local == "flaky" and address not in self.flaky_seen:
+            self.flaky_seen.add(address)
+            return "451 4.3.0 Greylisted"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.mail_from, list(envelope.rcpt_tos), envelope.content))
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtpd():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        yield controller, handler
+    finally:
+        controller.stop()
+
+
+async def test_pipelined_transaction(smtpd):
+    controller, handler = smtpd
+    conn = SMTPConnection("127.0.0.1", controller.port, starttls=False)
+    await conn.connect()
+    assert "pipelining" in conn.extensions
+    writes = []
+    write = conn._write
+    conn._write = lambda data: (writes.append(data), write(data))[1]
+    try:
+        refused = await conn.send("app@kelnic.test", ["a@x.test", "bad@x.test", "b@x.test"], b"Subject: hi\r\n\r\nbody\r\n")
+        # MAIL FROM, every RCPT TO and DATA went out in one write
+        assert writes[0].count(b"\r\n") == 5 and writes[0].endswith(b"DATA\r\n")
+        assert set(refused) == {"bad@x.test"} and refused["bad@x.test"][0] == 550
+
+        # Nobody accepted: the pipelined DATA is aborted and the connection stays usable
+        with pytest.raises(SMTPError) as error:
+            await conn.send("app@kelnic.test", ["bad@x.test"], b"Subject: no\r\n\r\nbody\r\n")
+        assert error.value.code == 550 and not error.value.transient
+        await conn.send("app@kelnic.test", ["c@x.test"], b"Subject: again\r\n\r\nbody\r\n")
+    finally:
+        await conn.close()
+
+    assert [rcpts for _, rcpts, _ in handler.messages] == [["a@x.test", "b@x.test"], ["c@x.test"]]
+
+
+async def test_per_domain_outcomes(smtpd, tmp_path):
+    controller, handler = smtpd
+    mailer = Mailer(
+        f"smtp://127.0.0.1:{controller.port}", spool_dir=str(tmp_path / "spool"),
+        domain_rate=1000, starttls=False, retry_interval=3600,
+    )
+    await mailer.start()
+    try:
+        message = build_message(
+            "Kelnic <app@kelnic.test>",
+            ["ok@a.test", "bad@a.test", "tempfail@b.test", "ok@b.test", "bad@c.test"],
+            "Report", "Hello",
+        )
+        result = await mailer.send(message)
+        status = mailer.get_status()
+    finally:
+        await mailer.close()
+
+    assert sorted(result["delivered"]) == ["ok@a.test", "ok@b.test"]
+    assert result["deferred"] == ["tempfail@b.test"]
+    assert set(result["failed"]) == {"bad@a.test", "bad@c.test"}
+    assert result["failed"]["bad@a.test"].startswith("550")
+    # One message per domain group with accepted recipients
+    assert sorted(rcpts for _, rcpts, _ in handler.messages) == [["ok@a.test"], ["ok@b.test"]]
+    assert status["deferred_messages"] == 1
+    assert len(os.listdir(tmp_path / "spool")) >= 1
+
+
+async def test_spool_retry_delivers_deferred_recipients(smtpd, tmp_path):
+    controller, handler = smtpd
+    spool = str(tmp_path / "spool")
+    settings = dict(spool_dir=spool, domain_rate=1000, starttls=False, retry_base=0.05, retry_interval=0.05)
+
+    mailer = Mailer(f"smtp://127.0.0.1:{controller.port}", **settings)
+    await mailer.start()
+    try:
+        result = await mailer.send(build_message("app@kelnic.test", ["flaky@d.test", "ok@d.test"], "Hi", "Body"))
+    finally:
+        # Closed before the retry is due: the deferred recipient survives in the spool
+        await mailer.close()
+    assert result["delivered"] == ["ok@d.test"] and result["deferred"] == ["flaky@d.test"]
+
+    # After a restart the spooled recipient is retried
+    mailer = Mailer(f"smtp://127.0.0.1:{controller.port}", **settings)
+    await mailer.start()
+    try:
+        assert mailer.get_status()["deferred_messages"] == 1
+        started = time.monotonic()
+        while mailer.get_status()["deferred_messages"]:
+            assert time.monotonic() - started < 5, "deferred mail was never retried"
+            await asyncio.sleep(0.05)
+    finally:
+        await mailer.close()
+    assert [rcpts for _, rcpts, _ in handler.messages] == [["ok@d.test"], ["flaky@d.test"]]
+    assert not [name for name in os.listdir(spool) if name.endswith(".json")]
+
+
+async def test_auth_refused_without_tls(smtpd):
+    controller, handler = smtpd
+    conn = SMTPConnection("127.0.0.1", controller.port, username="app", password="secret")
+    with pytest.raises(SMTPError) as error:
+        await conn.connect()
+    assert error.value.code == 530 and not error.value.transient
+    assert not conn.is_connected
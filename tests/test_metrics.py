@@ -0,0 +1,58 @@
+# tests/test_metrics.py
+import enum
+
+import pytest
+
+from evo_core.telemetry.metrics import Registry
+
+
+class Outcome(enum.Enum):
+    OK = "ok"
+
+
+def test_counter_labels_accumulate():
+    counter = Registry().counter("requests", "Requests", ("status",))
+    counter.labels("200").inc()
+    counter.labels("200").inc(2)
+    counter.labels(500).inc()
+    counter.labels(500).inc()
+    counter.labels("500").inc()
+    assert {labels["status"]: value for _, labels, value in counter.samples()} == {"200": 3.0, "500": 3.0}
+
+
+def test_non_str_labels_share_one_child():
+    counter = Registry().counter("outcomes", "Outcomes", ("outcome", "code"))
+    assert counter.labels(Outcome.OK, 1) is counter.labels(Outcome.OK, 1) is counter.labels("Outcome.OK", "1")
+    assert len(counter._children) == 1
+
+
+def test_wrong_label_count_raises():
+    counter = Registry().counter("requests", "Requests", ("status",))
+    with pytest.raises(ValueError):
+        counter.labels("200", "extra")
+
+
+def test_histogram_buckets_and_openmetrics():
+    registry = Registry()
+    histogram = registry.histogram("latency", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.labels("/health").observe(value)
+    assert registry.to_json()["latency"] == [
+        {"labels": {"route": "/health"}, "count": 4, "sum": 6.05, "p50": 1.0, "p99": float("inf")}
+    ]
+    text = registry.to_openmetrics()
+    assert 'latency_bucket{route="/health",le="0.1"} 1' in text
+    assert 'latency_bucket{route="/health",le="1.0"} 3' in text
+    assert 'latency_bucket{route="/health",le="+Inf"} 4' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_gauge_and_callback_gauge():
+    registry = Registry()
+    gauge = registry.gauge("in_flight", "In flight")
+    gauge.inc(3)
+    gauge.dec()
+    registry.callback_gauge("queue_depth", "Queue depth", lambda: {"jobs": 7}, ("queue",))
+    values = registry.to_json()
+    assert values["in_flight"] == [{"labels": {}, "value": 2.0}]
+    assert values["queue_depth"] == [{"labels": {"queue": "jobs"}, "value": 7.0}]
@@ -0,0 +1,121 @@
+# tests/test_payout_runs.py
+"""Commission netting and resumable payout runs, on ``memory://`` state."""
+import numpy as np
+import pytest
+
+from evo_core.memory.state_manager import StateManager
+from evo_core.payments.payout_runs import PayoutRunError, PayoutRunner, net_commissions
+
+
+class RecordingBus:
+    """Records published events; raises on the ``fail_at``-th ``payout_executed``."""
+
+    def __init__(self, fail_at=None):
+        self.events = []
+        self.fail_at = fail_at
+
+    async def publish(self, topic, payload):
+        if topic == "payout_executed" and self.fail_at is not None:
+            if sum(1 for t, _ in self.events if t == topic) + 1 == self.fail_at:
+                raise ConnectionError("bus unavailable")
+        self.events.append((topic, payload))
+
+    def payouts(self):
+        return [payload for topic, payload in self.events if topic == "payout_executed"]
+
+
+def commissions(amounts):
+    return [{"recipient": recipient, "amount": amount} for recipient, amount in amounts]
+
+
+def test_reversal_netting_below_minimum_carries_forward():
+    netted = net_commissions(
+        np.array(["a", "b", "a"]), np.array([6000.0, 8000.0, -2000.0]), min_payout_cents=5000,
+    )
+    assert list(netted["recipients"]) == ["a", "b"]
+    assert list(netted["balance"]) == [4000, 8000]
+    assert list(netted["events"]) == [2, 1]
+    assert list(netted["paid"]) == [False, True]
+    assert list(netted["net"]) == [0, 8000]
+    assert list(netted["carry"]) == [4000, 0]
+
+
+def test_fee_that_leaves_nothing_carries_the_balance():
+    netted = net_commissions(
+        np.array(["a", "b", "c"]), np.array([5000.0, 20000.0, -100.0]), min_payout_cents=5000,
+        fee_fixed_cents=5000, fee_rate=0.01,
+    )
+    # a: 50.00 minus a 50.50 fee is not paid; b: 200.00 minus 52.00; c: a negative balance is carried
+    assert list(netted["paid"]) == [False, True, False]
+    assert list(netted["fee"]) == [0, 5200, 0]
+    assert list(netted["net"]) == [0, 14800, 0]
+    assert list(netted["carry"]) == [5000, 0, -100]
+
+
+async def test_carried_balances_join_the_next_run():
+    state = StateManager("memory://")
+    bus = RecordingBus()
+    runner = PayoutRunner(bus, state, min_payout=50, fee_fixed=0, fee_rate=0)
+    try:
+        first = await runner.run("2026-09", commissions([("a", 60), ("a", -20), ("b", 80)]))
+        second = await runner.run("2026-10", commissions([("a", 15)]))
+        carry = await state.get_state("payouts", "carry", strict=True)
+    finally:
+        await state.close()
+
+    payouts = bus.payouts()
+    assert (first["paid"], first["carried_forward"], first["carried_amount"]) == (1, 1, 40.0)
+    assert (second["paid"], second["net"]) == (1, 55.0)
+    assert [(p["run_id"], p["recipient"], p["amount"]) for p in payouts] == [("2026-09", "b", 80.0), ("2026-10", "a", 55.0)]
+    assert carry == {}
+
+
+async def test_interrupted_run_resumes_from_checkpoint_without_replanning():
+    state = StateManager("memory://")
+    amounts = [(f"r{n}", 100 + n) for n in range(5)]
+    try:
+        runner = PayoutRunner(RecordingBus(fail_at=3), state, min_payout=50, fee_fixed=0, fee_rate=0, chunk_size=2)
+        with pytest.raises(ConnectionError):
+            await runner.run("2026-09", commissions(amounts))
+        plan = await state.get_state("payout_run:2026-09", "plan", strict=True)
+        assert await state.get_state("payout_run:2026-09", "cursor", strict=True) == 2
+
+        # Another run can't start from the same carried balances in the meantime
+        with pytest.raises(PayoutRunError, match="unfinished"):
+            await PayoutRunner(RecordingBus(), state, min_payout=50).run("2026-10", commissions(amounts))
+
+        bus = RecordingBus()
+        resumed = PayoutRunner(bus, state, min_payout=50, fee_fixed=0, fee_rate=0, chunk_size=2)
+        # No commissions: the stored plan is the only source of payees
+        summary = await resumed.run("2026-09")
+        assert await state.get_state("payout_run:2026-09", "plan", strict=True) == plan
+        assert await state.get_state("payouts", "active_run", strict=True) is None
+    finally:
+        await state.close()
+
+    assert [p["recipient"] for p in bus.payouts()] == ["r2", "r3", "r4"]
+    assert summary["status"] == "completed" and summary["paid"] == 5 and summary["net"] == 510.0
+
+
+async def test_completed_run_returns_its_stored_summary():
+    state = StateManager("memory://")
+    bus = RecordingBus()
+    runner = PayoutRunner(bus, state, min_payout=50, fee_fixed=0, fee_rate=0)
+    try:
+        first = await runner.run("2026-09", commissions([("a", 75)]))
+        published = len(bus.events)
+        again = await runner.run("2026-09", commissions([("a", 999), ("b", 999)]))
+        assert len(bus.events) == published
+    finally:
+        await state.close()
+
+    assert again == first and again["net"] == 75.0
+
+
+async def test_unknown_run_without_commissions_is_refused():
+    state = StateManager("memory://")
+    try:
+        with pytest.raises(PayoutRunError, match="Unknown payout run"):
+            await PayoutRunner(RecordingBus(), state).run("nope")
+    finally:
+        await state.close()
@@ -0,0 +1,163 @@
+# tests/test_state_backends.py
+"""The StateBackend contract, run against every backend ``create_backend`` knows.
+
+Redis tests use ``TEST_REDIS_URL`` (default: local Redis, database 15, which
+is flushed) and are skipped when no server answers.
+"""
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+
+from evo_core.memory.backends import create_backend
+from evo_core.memory.state_manager import StateManager
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def _redis_available() -> bool:
+    import redis
+    try:
+        redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping()
+    except redis.RedisError:
+        return False
+    return True
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def state_url(request, tmp_path):
+    if request.param == "memory":
+        return "memory://"
+    if request.param == "sqlite":
+        return f"sqlite:///{tmp_path / 'state.db'}"
+    if not _redis_available():
+        pytest.skip(f"no Redis at {REDIS_URL}")
+    import redis
+    redis.Redis.from_url(REDIS_URL).flushdb()
+    return REDIS_URL
+
+
+def key() -> str:
+    # Unique per test so Redis runs cannot see each other's data
+    return f"test:{uuid.uuid4().hex}"
+
+
+async def test_write_and_read(state_url):
+    backend = create_backend(state_url)
+    a, b = key(), key()
+    try:
+        await backend.write([(a, {"x": b"1", "y": b"2"}, 60), (b, {"x": b"3"}, 60)])
+        assert await backend.get(a, "x") == b"1"
+        assert await backend.get(a, "missing") is None
+        assert await backend.get_fields(a, ["y", "missing", "x"]) == [b"2", None, b"1"]
+        assert await backend.get_many([a, key(), b], "x") == [b"1", None, b"3"]
+        assert await backend.get_all(a) == {"x": b"1", "y": b"2"}
+        assert await backend.get_all(key()) == {}
+    finally:
+        await backend.close()
+
+
+async def test_overwrite_keeps_other_fields(state_url):
+    backend = create_backend(state_url)
+    a = key()
+    try:
+        await backend.write([(a, {"x": b"1", "y": b"2"}, 60)])
+        await backend.write([(a, {"x": b"new"}, 60)])
+        assert await backend.get_all(a) == {"x": b"new", "y": b"2"}
+    finally:
+        await backend.close()
+
+
+async def test_delete(state_url):
+    backend = create_backend(state_url)
+    a, b = key(), key()
+    try:
+        await backend.write([(a, {"x": b"1"}, 60), (b, {"x": b"2"}, 60)])
+        await backend.delete(a)
+        assert await backend.get(a, "x") is None
+        assert await backend.get_all(a) == {}
+        assert await backend.get(b, "x") == b"2"
+    finally:
+        await backend.close()
+
+
+async def test_ttl_expiry(state_url):
+    backend = create_backend(state_url)
+    a, b = key(), key()
+    try:
+        await backend.write([(a, {"x": b"1"}, 1), (b, {"x": b"2"}, 60)])
+        assert await backend.get(a, "x") == b"1"
+        await asyncio.sleep(2.1)
+        assert await backend.get(a, "x") is None
+        assert await backend.get_all(a) == {}
+        assert await backend.get_many([a, b], "x") == [None, b"2"]
+    finally:
+        await backend.close()
+
+
+async def test_write_refreshes_ttl_of_whole_key(state_url):
+    backend = create_backend(state_url)
+    a = key()
+    try:
+        await backend.write([(a, {"x": b"1"}, 1)])
+        await backend.write([(a, {"y": b"2"}, 60)])
+        await asyncio.sleep(2.1)
+        assert await backend.get_all(a) == {"x": b"1", "y": b"2"}
+    finally:
+        await backend.close()
+
+
+async def test_state_manager_round_trip(state_url):
+    state = StateManager(state_url)
+    session = uuid.uuid4().hex
+    try:
+        await state.set_state(session, "plan", {"steps": [1, 2]}, strict=True)
+        await state.set_many({session: {"cursor": 3}, "other-" + session: {"cursor": 4}}, strict=True)
+        assert await state.get_state(session, "plan", strict=True) == {"steps": [1, 2]}
+        assert await state.get_many([session, "other-" + session], "cursor") == {session: 3, "other-" + session: 4}
+        assert await state.get_full_session(session) == {"plan": {"steps": [1, 2]}, "cursor": 3}
+        await state.clear_session(session)
+        assert await state.get_full_session(session) == {}
+    finally:
+        await state.close()
+
+
+async def test_write_behind_flush(state_url):
+    state = StateManager(state_url, write_behind=0.05)
+    session = uuid.uuid4().hex
+    try:
+        await state.set_state(session, "a", 1)
+        await state.set_state(session, "a", 2)
+        # Buffered writes are visible before they reach the backend
+        assert await state.get_state(session, "a") == 2
+        assert await state.backend.get(state._key(session), "a") is None
+        started = time.monotonic()
+        while await state.backend.get(state._key(session), "a") is None:
+            assert time.monotonic() - started < 2, "write-behind never flushed"
+            await asyncio.sleep(0.02)
+        assert await state.get_state(session, "a") == 2
+    finally:
+        await state.close()
+
+
+async def test_close_waits_for_in_flight_flush(state_url):
+    state = StateManager(state_url, write_behind=0.01)
+    write = state.backend.write
+    written = []
+
+    async def slow_write(items, *args, **kwargs):
+        await asyncio.sleep(0.2)
+        await write(items, *args, **kwargs)
+        written.extend(items)
+
+    state.backend.write = slow_write
+    session = uuid.uuid4().hex
+    await state.set_state(session, "a", 1)
+    await asyncio.sleep(0.05)
+    # The write-behind flush is now inside backend.write
+    assert state._flushing and not written
+    await state.set_state(session, "b", 2)
+    await state.close()
+    assert [fields.keys() for _, fields, _ in written] == [{"a"}, {"b"}]
@@ -0,0 +1,35 @@
+# tests/test_streaming.py
+"""Request validation on the ``WS /run/stream`` route."""
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from backend.routes.marketing import TaskRequest
+from backend.routes.streaming import add_stream_routes
+
+
+@pytest.fixture
+def client():
+    router = APIRouter()
+    add_stream_routes(router, TaskRequest)
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("payload", [[1, 2], "run it", 42, None, {"task": "report"}])
+def test_invalid_request_gets_error_event(client, payload):
+    with client.websocket_connect("/run/stream") as websocket:
+        websocket.send_json(payload)
+        event = websocket.receive_json()
+        assert event["event"] == "error" and event["error"]
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1003
+
+
+def test_malformed_json_gets_error_event(client):
+    with client.websocket_connect("/run/stream") as websocket:
+        websocket.send_text("{not json")
+        assert websocket.receive_json()["event"] == "error"